@@ -0,0 +1,160 @@
+import os
+import sys
+import queue
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Storage.storage import Storage
+
+_STOP = ("stop",)
+
+
+class AsyncStorage(Storage):
+    """
+    Runs a Storage backend's writes on a background writer thread fed through a bounded queue, so extraction
+    carries on while earlier results are being written and a document takes about max(extract, store) instead
+    of their sum.
+
+    Backends with streams_batches (SQLStorage, SQLiteStorage) receive each stage page by page through
+    store_batch() while the following pages are still being extracted; the others receive every stage's complete
+    output through store_<stage>() as usual. When the writer falls max_pending items behind, the producer waits
+    rather than buffering the whole document in memory.
+
+    Errors raised by the backend are re-raised in the producer by the next call or by flush(); the rest of that
+    document's writes are dropped and a streamed stage is rolled back.
+    """
+
+    streams_batches = True
+
+    def __init__(self, sink, max_pending=64):
+        """
+        Args:
+            sink (Storage): The backend to write to. Only the writer thread uses it from now on.
+            max_pending (int): Queued writes after which the producer blocks.
+        """
+        self.sink = sink
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._open_stage = None  # Stage currently streamed into the sink; only touched by the writer thread
+        self._thread = threading.Thread(target=self._run, name=f"{type(sink).__name__}-writer", daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name):
+        # Everything else (connection, search(), ...) is the wrapped backend's
+        if "sink" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__["sink"], name)
+
+    def _put(self, *item):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(item)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item == _STOP:
+                    return
+                if self._error is None or item[0] == "abort":
+                    self._write(*item)
+            except BaseException as e:
+                self._error = e
+                try:
+                    self._abort_stage()
+                except BaseException:
+                    pass  # The original error is the one worth reporting
+            finally:
+                self._queue.task_done()
+
+    def _write(self, kind, *args):
+        if kind == "begin":
+            self.sink.begin_document(*args)
+        elif kind == "batch":
+            stage, records, file_type = args
+            if self._open_stage != stage:
+                self._abort_stage()
+                self.sink.begin_stage(stage, file_type)
+                self._open_stage = stage
+            self.sink.store_batch(stage, records, file_type)
+        elif kind == "end":
+            stage, data, file_type = args
+            if self._open_stage == stage:
+                self._open_stage = None
+                self.sink.end_stage(stage, file_type)
+            else:
+                getattr(self.sink, f"store_{stage}")(data, file_type)
+        elif kind == "flush":
+            if hasattr(self.sink, "flush"):
+                self.sink.flush()
+        elif kind == "abort":
+            self._abort_stage()
+            self._error = None
+            if hasattr(self.sink, "abort"):
+                self.sink.abort()
+
+    def _abort_stage(self):
+        if self._open_stage is not None:
+            self._open_stage = None
+            self.sink.abort_stage()
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        self._put("begin", content_hash, name, file_type, page_count)
+
+    def store_batch(self, stage, records, file_type):
+        """
+        Queues one page's records of a stage. Ignored for backends that only take complete stages.
+        """
+        if self.sink.streams_batches:
+            self._put("batch", stage, records, file_type)
+
+    def _store(self, stage, data, file_type):
+        # Completes a stage: a streamed stage is committed, otherwise the backend gets the whole output
+        self._put("end", stage, data, file_type)
+
+    def store_text(self, text_data, file_type):
+        self._store("text", text_data, file_type)
+
+    def store_links(self, links_data, file_type):
+        self._store("links", links_data, file_type)
+
+    def store_images(self, images_data, file_type):
+        self._store("images", images_data, file_type)
+
+    def store_tables(self, tables_data, file_type):
+        self._store("tables", tables_data, file_type)
+
+    def store_fonts(self, fonts_data, file_type):
+        self._store("fonts", fonts_data, file_type)
+
+    def flush(self):
+        """
+        Waits until every queued write has reached the backend, and flushes the backend if it buffers writes.
+        Raises:
+            Exception: The first error the backend raised since the last flush.
+        """
+        if self._error is None:
+            self._queue.put(("flush",))
+        self._queue.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def abort(self):
+        """
+        Discards the current document after a failed extraction: rolls back a streamed stage and clears any
+        pending error, so the next document starts cleanly.
+        """
+        self._queue.put(("abort",))
+        self._queue.join()
+
+    def close(self):
+        """
+        Flushes the queue, stops the writer thread and closes the backend if it can be closed.
+        """
+        try:
+            self.flush()
+        finally:
+            self._queue.put(_STOP)
+            self._thread.join()
+            if hasattr(self.sink, "close"):
+                self.sink.close()
@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Storage.storage import Storage
+from Storage.serializers import COMPRESSIONS, write_json, write_jsonl
+from Storage.output_layout import AtomicFile, document_dir
+
+
+def save_to_file(data, filename, compression=None, indent=False):
+    """
+    Serializes data to a JSON file.
+    Args:
+        data: Data to be serialized.
+        filename (str): Path to the output JSON file.
+        compression (str, optional): 'gzip' or 'zstd' to compress the file.
+        indent (bool): Pretty-print the JSON instead of writing it compactly.
+    """
+    write_json(data, filename, compression, indent)
+
+
+def save_to_jsonl(records, filename, compression=None):
+    """
+    Writes one JSON document per line (JSON Lines), so consumers can stream the file record by record.
+    Args:
+        records (list): Records to be serialized.
+        filename (str): Path to the output .jsonl file.
+        compression (str, optional): 'gzip' or 'zstd' to compress the file.
+    """
+    write_jsonl(records, filename, compression)
+
+
+class JSONFileStorage(Storage):
+    """
+    Writes each stage's output to output_folder/<stage>/<file_format>/<file_format>_<stage>.json (or .jsonl),
+    as compact JSON, optionally compressed (.json.gz, .jsonl.zst, ...). Files are replaced atomically.
+    Span font metadata is kept columnar, as fonts/<file_format>/<file_format>_fonts.npz (see SpanColumns.load).
+    With per_document=True the same layout is nested in a directory per document, output_folder/<document key>/,
+    next to a document.json manifest, so documents processed concurrently never write to the same path.
+    """
+
+    def __init__(self, output_folder="output", lines=False, per_document=False, compression=None, indent=False):
+        """
+        Args:
+            output_folder (str): Root folder for the output files.
+            lines (bool): Write JSON Lines (one record per line) instead of a single JSON array.
+            per_document (bool): Write below a directory per document, keyed by its content hash.
+            compression (str, optional): 'gzip' or 'zstd' to compress the output files.
+            indent (bool): Pretty-print single-document JSON files.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}. Choose from gzip, zstd")
+        self.output_folder = output_folder
+        self.lines = lines
+        self.per_document = per_document
+        self.compression = compression
+        self.indent = indent
+        self.document_folder = output_folder
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        """
+        Selects the folder for the document's files and, in per-document mode, writes its manifest.
+        Returns:
+            str: The folder the document's stage files are written to.
+        """
+        if not self.per_document:
+            self.document_folder = self.output_folder
+            return self.document_folder
+        self.document_folder = document_dir(self.output_folder, content_hash)
+        os.makedirs(self.document_folder, exist_ok=True)
+        manifest = {"content_hash": content_hash, "name": None if name is None else str(name),
+                    "file_type": file_type, "page_count": page_count}
+        save_to_file(manifest, os.path.join(self.document_folder, "document.json"), indent=True)
+        return self.document_folder
+
+    def _store(self, stage, data, file_type):
+        if not data:
+            print(f"No {stage} data extracted.")
+            return
+        folder = os.path.join(self.document_folder, stage, file_type)
+        os.makedirs(folder, exist_ok=True)
+        suffix = COMPRESSIONS[self.compression]
+        if self.lines:
+            save_to_jsonl(data, os.path.join(folder, f"{file_type}_{stage}.jsonl{suffix}"), self.compression)
+        else:
+            save_to_file(data, os.path.join(folder, f"{file_type}_{stage}.json{suffix}"), self.compression, self.indent)
+        print(f"{stage.capitalize()} extraction completed and saved.")
+
+    def store_text(self, text_data, file_type):
+        self._store("text", text_data, file_type)
+        if getattr(text_data, "boilerplate", None):  # Deduplicated headers and footers, written once
+            self._store("boilerplate", text_data.boilerplate_records(), file_type)
+
+    def store_links(self, links_data, file_type):
+        self._store("links", links_data, file_type)
+
+    def store_images(self, images_data, file_type):
+        self._store("images", images_data, file_type)
+
+    def store_tables(self, tables_data, file_type):
+        self._store("tables", tables_data, file_type)
+
+    def store_fonts(self, fonts_data, file_type):
+        if not len(fonts_data):
+            print("No fonts data extracted.")
+            return
+        folder = os.path.join(self.document_folder, "fonts", file_type)
+        os.makedirs(folder, exist_ok=True)
+        with AtomicFile(os.path.join(folder, f"{file_type}_fonts.npz")) as file:
+            fonts_data.save(file)
+        print("Fonts extraction completed and saved.")
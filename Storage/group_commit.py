@@ -0,0 +1,203 @@
+import os
+import sys
+import time
+import queue
+import itertools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Storage.storage import Storage
+
+# Sinks the writer process can own: the database backends, whose transactions it groups
+DATABASE_SINKS = ("sqlite", "mysql")
+
+
+class GroupCommitWriter:
+    """
+    Writes the documents sent by many extraction workers through one database connection, committing them
+    in groups: a group is closed when it holds max_documents documents or max_records records, or when
+    max_delay seconds have passed since its first document arrived. One commit then covers the whole group,
+    instead of every worker committing small batches and contending for the same locks.
+
+    Each document is acknowledged to the worker that sent it once its group has been committed. If a group
+    fails, it is rolled back and its documents are retried one by one, so only the faulty document is
+    reported as failed.
+    """
+
+    def __init__(self, storage, requests, acks, max_documents=64, max_records=50000, max_delay=0.05):
+        """
+        Args:
+            storage (SQLStorage | SQLiteStorage): The database backend. Put into group_commit mode.
+            requests (queue): Receives (worker, ticket, document, stages) messages from GroupCommitSink,
+                or None to stop.
+            acks (dict): Worker id -> queue that receives (ticket, error) once the ticket's document is durable.
+            max_documents (int): Documents after which a group is committed.
+            max_records (int): Extracted records after which a group is committed.
+            max_delay (float): Seconds a document may wait for its group to fill up.
+        """
+        self.storage = storage
+        self.storage.group_commit = True
+        self.requests = requests
+        self.acks = acks
+        self.max_documents = max_documents
+        self.max_records = max_records
+        self.max_delay = max_delay
+        self.commits = 0
+
+    def _collect(self):
+        """
+        Waits for a document and gathers more until a size or time threshold is reached.
+        Returns:
+            tuple: (list of messages, whether the writer was asked to stop).
+        """
+        message = self.requests.get()
+        if message is None:
+            return [], True
+        group, records = [message], _record_count(message)
+        deadline = time.monotonic() + self.max_delay
+        while len(group) < self.max_documents and records < self.max_records:
+            try:
+                message = self.requests.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if message is None:
+                return group, True
+            group.append(message)
+            records += _record_count(message)
+        return group, False
+
+    def _write(self, message):
+        _, _, document, stages = message
+        self.storage.begin_document(*document)
+        for stage, data, file_type in stages:
+            getattr(self.storage, f"store_{stage}")(data, file_type)
+
+    def _ack(self, message, error=None):
+        worker, ticket = message[:2]
+        self.acks[worker].put((ticket, error))
+
+    def commit_group(self, group):
+        """
+        Writes a group of documents in one transaction and acknowledges them.
+        """
+        try:
+            for message in group:
+                self._write(message)
+            self.storage.commit()
+        except Exception as e:
+            self.storage.rollback()
+            print(f"Group of {len(group)} documents failed ({e}); retrying them one by one.")
+            for message in group:
+                try:
+                    self._write(message)
+                    self.storage.commit()
+                except Exception as e:
+                    self.storage.rollback()
+                    self._ack(message, str(e) or type(e).__name__)
+                else:
+                    self._ack(message)
+                self.commits += 1
+            return
+        self.commits += 1
+        for message in group:
+            self._ack(message)
+
+    def run(self):
+        """
+        Commits groups until a None message asks the writer to stop.
+        """
+        stop = False
+        while not stop:
+            group, stop = self._collect()
+            if group:
+                self.commit_group(group)
+
+
+def _record_count(message):
+    return sum(len(data) for _, data, _ in message[3])
+
+
+def writer_process(sink_options, requests, acks, max_documents=64, max_records=50000, max_delay=0.05):
+    """
+    Entry point of the writer process: builds the single database backend and runs a GroupCommitWriter.
+    Args:
+        sink_options (dict): build_sinks() arguments; 'names' must select exactly one of DATABASE_SINKS.
+    """
+    from pipeline import build_sinks
+
+    storage, = build_sinks(**sink_options)
+    if hasattr(storage, "create_schema"):
+        storage.create_schema()  # DDL commits implicitly in MySQL, so it must not run inside a group
+    GroupCommitWriter(storage, requests, acks, max_documents, max_records, max_delay).run()
+    if hasattr(storage, "close"):
+        storage.close()
+
+
+class GroupCommitSink(Storage):
+    """
+    The worker side of the group-commit writer: collects a document's stage outputs and, on flush(), sends
+    them to the writer process as one message, then waits until the writer reports them committed.
+    A Pipeline flushes its sinks at the end of run(), so a job only completes once its rows are durable.
+    """
+
+    _tickets = itertools.count(1)
+
+    def __init__(self, requests, acks, worker, timeout=300):
+        """
+        Args:
+            requests (queue): The writer's request queue.
+            acks (queue): This worker's acknowledgement queue.
+            worker: Key of acks in the writer's acknowledgement map.
+            timeout (float): Seconds to wait for an acknowledgement before giving up.
+        """
+        self.requests = requests
+        self.acks = acks
+        self.worker = worker
+        self.timeout = timeout
+        self._document = None
+        self._stages = []
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        self._document = (content_hash, None if name is None else str(name), file_type, page_count)
+        self._stages = []
+
+    def _store(self, stage, data, file_type):
+        self._stages.append((stage, data, file_type))
+
+    def store_text(self, text_data, file_type):
+        self._store("text", text_data, file_type)
+
+    def store_links(self, links_data, file_type):
+        self._store("links", links_data, file_type)
+
+    def store_images(self, images_data, file_type):
+        self._store("images", images_data, file_type)
+
+    def store_tables(self, tables_data, file_type):
+        self._store("tables", tables_data, file_type)
+
+    def flush(self):
+        """
+        Sends the current document to the writer and blocks until it has been committed.
+        Raises:
+            RuntimeError: The writer could not store the document, or did not answer in time.
+        """
+        if self._document is None:
+            return
+        ticket = next(self._tickets)
+        message = (self.worker, ticket, self._document, self._stages)
+        self._document, self._stages = None, []
+        self.requests.put(message)
+        deadline = time.monotonic() + self.timeout
+        acknowledged = None
+        while acknowledged != ticket:  # Skips late answers for documents that already timed out
+            try:
+                acknowledged, error = self.acks.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise RuntimeError(f"No acknowledgement from the database writer within {self.timeout}s") from None
+        if error is not None:
+            raise RuntimeError(f"Database writer failed to store the document: {error}")
+
+    def abort(self):
+        """
+        Drops the current document after a failed extraction.
+        """
+        self._document, self._stages = None, []
@@ -0,0 +1,25 @@
+import sys
+import os
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Storage.sql_storage import SQLStorage
+from dotenv import load_dotenv
+
+
+def main():
+    """
+    Migrates the old text_data/links_data/images_data/tables_data tables to the normalized schema,
+    using the same config.env credentials as main1.py.
+    """
+    parser = argparse.ArgumentParser(description="Migrate extraction tables to the normalized, indexed schema.")
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop the renamed *_legacy tables after copying")
+    args = parser.parse_args()
+
+    load_dotenv("config.env")
+    storage = SQLStorage(host=os.getenv("DB_HOST"), user=os.getenv("DB_USERNAME"),
+                         password=os.getenv("PASSWORD"), database=os.getenv("DATABASE"))
+    storage.migrate_legacy_tables(drop_legacy=args.drop_legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import uuid
+
+
+def document_key(content_hash):
+    """
+    Returns the directory name used for a document: the first 16 hex digits of its SHA-256 content hash.
+    The same content always maps to the same directory, so reprocessing a document replaces its files.
+    """
+    return content_hash[:16]
+
+
+def document_dir(output_root, content_hash):
+    """
+    Returns the per-document output directory under output_root, e.g. output/3f2a9c0d1e4b5a67.
+    Each document's images, tables and JSON files live below it, so concurrent workers never share a path.
+    Args:
+        output_root (str): The shared output folder.
+        content_hash (str): The document's SHA-256 (see loaders.file_loader.content_hash).
+    Returns:
+        str: The directory path.
+    """
+    return os.path.join(output_root, document_key(content_hash))
+
+
+class AtomicFile:
+    """
+    Writes a file through a uniquely named temporary file in the same directory, then renames it over the
+    destination. Readers and concurrent writers only ever see a missing or a complete file, never a partial one.
+
+    Use it as a context manager (the file is committed on success and discarded on error), or call commit()
+    and discard() directly when the file outlives a single block.
+    """
+
+    def __init__(self, path, mode="wb", **open_kwargs):
+        """
+        Args:
+            path (str): Final path of the file.
+            mode (str): 'w' or 'wb', optionally with other open() flags such as 't'.
+            **open_kwargs: Passed to open(), e.g. newline='' and encoding='utf-8' for CSV files.
+        """
+        self.path = path
+        self.temp_path = f"{path}.{uuid.uuid4().hex[:12]}.tmp"
+        self.file = open(self.temp_path, mode.replace("w", "x"), **open_kwargs)
+
+    def commit(self):
+        """
+        Closes the temporary file and atomically moves it into place.
+        """
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        """
+        Closes and removes the temporary file, leaving any existing destination untouched.
+        """
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
@@ -0,0 +1,206 @@
+import sys
+import os
+import time
+import sqlite3
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Storage.storage import Storage, iter_text_lines
+
+
+class SearchIndex(Storage):
+    """
+    A full-text index over extracted text, stored in SQLite using FTS5.
+
+    Each indexed line keeps its document, page/slide number, position on the page and style, so hits can be
+    reported with page numbers and filtered by style (e.g. headings only). Documents are keyed by content hash,
+    like in every other sink: identical content is indexed once, whatever its path, and a renamed document
+    replaces its old entry. The name is kept for display and may be missing. Only the text stage is indexed;
+    the other store_* methods accept their data and ignore it so the index can be used wherever a Storage is.
+    """
+
+    def __init__(self, db_path="search_index.db"):
+        """
+        Args:
+            db_path (str): Path to the SQLite database that holds the index.
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.content_hash = None
+        self.document = None
+        self._create_tables()
+
+    def _create_tables(self):
+        self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            content_hash TEXT UNIQUE,
+            name TEXT,
+            file_type TEXT,
+            indexed_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS text_lines (
+            id INTEGER PRIMARY KEY,
+            document_id INTEGER NOT NULL REFERENCES documents(id),
+            page_number INTEGER,
+            position INTEGER NOT NULL,
+            style TEXT,
+            text TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_text_lines_document ON text_lines (document_id, page_number);
+        CREATE VIRTUAL TABLE IF NOT EXISTS text_fts USING fts5(
+            text, content='text_lines', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        );
+        """)
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        """
+        Remembers the document that following store_text() calls index their lines under.
+        """
+        self.content_hash = content_hash
+        self.document = None if name is None else str(name)
+
+    def store_text(self, text_data, file_type, document=None):
+        """
+        Indexes the text of one document, replacing anything previously indexed for the same content hash.
+        Without begin_document(), the text is keyed by the given document name instead.
+        Args:
+            text_data (list): Output of DataExtractor.extract_text().
+            file_type (str): The type of file from which the text was extracted.
+            document (str, optional): Name that identifies the document in search results (usually its path).
+                Defaults to the name given to begin_document().
+        Raises:
+            ValueError: If the document has neither a content hash nor a name.
+        """
+        document = document or self.document
+        if self.content_hash is None and document is None:
+            raise ValueError("SearchIndex.store_text needs begin_document() or a document name")
+        lines = list(iter_text_lines(text_data))
+
+        with self.connection:
+            self._delete(self.content_hash, document)
+            cursor = self.connection.execute(
+                "INSERT INTO documents (content_hash, name, file_type, indexed_at) VALUES (?, ?, ?, ?)",
+                (self.content_hash, document, file_type, time.time()))
+            document_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO text_lines (document_id, page_number, position, style, text) VALUES (?, ?, ?, ?, ?)",
+                ((document_id, page, position, style, text) for page, position, style, text in lines))
+            self.connection.execute(
+                "INSERT INTO text_fts (rowid, text) SELECT id, text FROM text_lines WHERE document_id = ?", (document_id,))
+        print(f"Indexed {len(lines)} lines of {document or self.content_hash[:16]}.")
+
+    def _delete(self, content_hash, name=None):
+        if content_hash is not None:
+            rows = self.connection.execute("SELECT id FROM documents WHERE content_hash = ?", (content_hash,)).fetchall()
+        else:
+            rows = self.connection.execute(
+                "SELECT id FROM documents WHERE content_hash IS NULL AND name = ?", (name,)).fetchall()
+        for row in rows:
+            # External-content FTS tables need the old values to remove their postings
+            self.connection.execute(
+                "INSERT INTO text_fts (text_fts, rowid, text) SELECT 'delete', id, text FROM text_lines WHERE document_id = ?",
+                row)
+            self.connection.execute("DELETE FROM text_lines WHERE document_id = ?", row)
+            self.connection.execute("DELETE FROM documents WHERE id = ?", row)
+
+    def remove(self, content_hash=None, name=None):
+        """
+        Removes a document from the index.
+        Args:
+            content_hash (str, optional): The document's content hash.
+            name (str, optional): The name of a document indexed without begin_document().
+        """
+        with self.connection:
+            self._delete(content_hash, name)
+
+    def store_links(self, links_data, file_type, document=None):
+        pass
+
+    def store_images(self, images_data, file_type, document=None):
+        pass
+
+    def store_tables(self, tables_data, file_type, document=None):
+        pass
+
+    @staticmethod
+    def _quote(query):
+        """
+        Turns free text into an FTS5 query that matches all words, so punctuation never causes syntax errors.
+        """
+        return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+    def search(self, query, limit=20, style=None, document=None, raw=False):
+        """
+        Searches the index and returns ranked hits (best first, by BM25).
+        Args:
+            query (str): Words to search for. With raw=True, an FTS5 query ("a NEAR b", "prefix*", "x OR y").
+            limit (int): Maximum number of hits.
+            style (str, optional): Only return lines with this style (e.g. 'Heading').
+            document (str, optional): Only search within this document, given by name or content hash.
+            raw (bool): Pass the query to FTS5 unchanged.
+        Returns:
+            list: Dictionaries with document (its name, or None), content_hash, file_type, page_number, position,
+                style, snippet and score.
+        """
+        match = query if raw else self._quote(query)
+        if not match:
+            return []
+        sql = """
+        SELECT d.name, d.content_hash, d.file_type, l.page_number, l.position, l.style,
+               snippet(text_fts, 0, '[', ']', '...', 12), bm25(text_fts)
+        FROM text_fts
+        JOIN text_lines l ON l.id = text_fts.rowid
+        JOIN documents d ON d.id = l.document_id
+        WHERE text_fts MATCH ?
+        """
+        params = [match]
+        if style is not None:
+            sql += " AND l.style = ?"
+            params.append(style)
+        if document is not None:
+            sql += " AND (d.name = ? OR d.content_hash = ?)"
+            params += [document, document]
+        sql += " ORDER BY bm25(text_fts) LIMIT ?"
+        params.append(limit)
+        return [
+            {"document": name, "content_hash": content_hash, "file_type": file_type, "page_number": page_number, "position": position,
+             "style": line_style, "snippet": snippet, "score": -score}
+            for name, content_hash, file_type, page_number, position, line_style, snippet, score
+            in self.connection.execute(sql, params)
+        ]
+
+    def optimize(self):
+        """
+        Merges the FTS5 index segments; worth running after large bulk loads.
+        """
+        with self.connection:
+            self.connection.execute("INSERT INTO text_fts (text_fts) VALUES ('optimize')")
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search text indexed during extraction.")
+    parser.add_argument("query")
+    parser.add_argument("--index", default="search_index.db", help="Path to the search index database")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--style", help="Only match lines with this style, e.g. Heading")
+    parser.add_argument("--raw", action="store_true", help="Treat the query as FTS5 syntax")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index)
+    started = time.perf_counter()
+    hits = index.search(args.query, limit=args.limit, style=args.style, raw=args.raw)
+    elapsed = (time.perf_counter() - started) * 1000
+    for hit in hits:
+        page = f"page {hit['page_number']}" if hit["page_number"] is not None else f"paragraph {hit['position'] + 1}"
+        document = hit["document"] or hit["content_hash"][:16]
+        print(f"{hit['score']:8.3f}  {document} ({page}, {hit['style']}): {hit['snippet']}")
+    print(f"{len(hits)} hits in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
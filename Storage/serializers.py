@@ -0,0 +1,141 @@
+import io
+import os
+import sys
+import gzip
+import json
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Storage.output_layout import AtomicFile
+
+try:
+    import orjson  # Optional: several times faster than the json module, and always emits compact UTF-8
+except ImportError:
+    orjson = None
+
+# Supported output compressions and the file name suffix each one adds
+COMPRESSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _default(value):
+    # Compact result containers such as TextColumns are written in their list-of-records shape
+    if hasattr(value, "to_records"):
+        return value.to_records()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data, indent=False):
+    """
+    Serializes data to UTF-8 JSON bytes: compact by default, with orjson when it is installed.
+    Args:
+        data: JSON-serializable data.
+        indent (bool): Pretty-print the output for reading by eye.
+    Returns:
+        bytes: The encoded document.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_default, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass  # E.g. integers beyond 64 bits or non-string keys; the json module handles those
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2, default=_default).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def _zstd():
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs the 'zstandard' package (pip install zstandard)") from None
+
+
+def compression_of(filename):
+    """
+    Infers the compression of a file from its name (.gz or .zst), or None for plain files.
+    """
+    for compression, suffix in COMPRESSIONS.items():
+        if compression and str(filename).endswith(suffix):
+            return compression
+    return None
+
+
+def compressed_writer(file, compression=None):
+    """
+    Wraps a binary file opened for writing so that data is compressed transparently with gzip or zstd.
+    Closing the wrapper finishes the compressed stream but leaves the underlying file open.
+    Args:
+        file: A writable binary file object.
+        compression (str, optional): 'gzip', 'zstd' or None to write through unchanged.
+    Returns:
+        A writable binary file object.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(filename="", mode="wb", fileobj=file, compresslevel=6)
+    if compression == "zstd":
+        zstd = _zstd()
+        if hasattr(zstd, "ZstdCompressor") and hasattr(zstd.ZstdCompressor, "stream_writer"):
+            return zstd.ZstdCompressor().stream_writer(file, closefd=False)
+        return zstd.ZstdFile(file, "wb")
+    if compression is not None:
+        raise ValueError(f"Unknown compression: {compression}. Choose from gzip, zstd")
+    return contextlib.nullcontext(file)
+
+
+def open_input(filename):
+    """
+    Opens a file written by write_json() or write_jsonl() for binary reading, detecting the compression from its name.
+    """
+    compression = compression_of(filename)
+    if compression == "gzip":
+        return gzip.open(filename, "rb")
+    if compression == "zstd":
+        zstd = _zstd()
+        if hasattr(zstd, "ZstdDecompressor") and hasattr(zstd.ZstdDecompressor, "stream_reader"):
+            return io.BufferedReader(zstd.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True))
+        return zstd.open(filename, "rb")
+    return open(filename, "rb")
+
+
+def write_json(data, filename, compression=None, indent=False):
+    """
+    Writes data as a single JSON document. The file is replaced atomically once it is complete.
+    Args:
+        data: JSON-serializable data.
+        filename (str): Path to the output file.
+        compression (str, optional): 'gzip', 'zstd' or None.
+        indent (bool): Pretty-print the output.
+    """
+    with AtomicFile(filename) as raw, compressed_writer(raw, compression) as file:
+        file.write(dumps(data, indent))
+
+
+def write_jsonl(records, filename, compression=None):
+    """
+    Writes one compact JSON document per line (JSON Lines), so consumers can stream the file record by record.
+    The file is replaced atomically once it is complete.
+    Args:
+        records (iterable): Records to be serialized.
+        filename (str): Path to the output file.
+        compression (str, optional): 'gzip', 'zstd' or None.
+    """
+    with AtomicFile(filename) as raw, compressed_writer(raw, compression) as file:
+        for record in records:
+            file.write(dumps(record) + b"\n")
+
+
+def read_json(filename):
+    """
+    Reads a JSON or JSON Lines file written by write_json() or write_jsonl(), compressed or not.
+    Returns:
+        The decoded document, or the list of records for .jsonl files.
+    """
+    with open_input(filename) as file:
+        if str(filename).endswith((".jsonl", ".jsonl.gz", ".jsonl.zst")):
+            return [json.loads(line) for line in file if line.strip()]
+        return json.loads(file.read())
@@ -1,20 +1,131 @@
 import sys
 import os
+import json
+import hashlib
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from .storage import Storage
+from .storage import Storage, STAGE_COLUMNS, RowsDigest, stage_rows
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
 load_dotenv()
 
+# Normalized schema: every row references the document it was extracted from, and the columns used
+# by per-document lookups are indexed. Tables are created in dependency order.
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        content_hash CHAR(64) NOT NULL,
+        name VARCHAR(1024),
+        file_type VARCHAR(16) NOT NULL,
+        page_count INT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_documents_content_hash (content_hash),
+        KEY idx_documents_file_type (file_type)
+    ) ENGINE=InnoDB;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS text_data (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        document_id INT NOT NULL,
+        page_number INT,
+        position INT NOT NULL,
+        style VARCHAR(255),
+        text MEDIUMTEXT NOT NULL,
+        KEY idx_text_document_page (document_id, page_number, position),
+        FULLTEXT KEY ft_text (text),
+        CONSTRAINT fk_text_document FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS links_data (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        document_id INT NOT NULL,
+        page_number INT,
+        linked_text TEXT,
+        link TEXT NOT NULL,
+        KEY idx_links_document_page (document_id, page_number),
+        CONSTRAINT fk_links_document FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS images_data (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        document_id INT NOT NULL,
+        page_number INT,
+        image_filename VARCHAR(255),
+        image_format VARCHAR(50),
+        image_path VARCHAR(1024),
+        KEY idx_images_document_page (document_id, page_number),
+        CONSTRAINT fk_images_document FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tables_data (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        document_id INT NOT NULL,
+        page_number INT,
+        table_index INT,
+        csv_filename VARCHAR(255),
+        csv_path VARCHAR(1024),
+        KEY idx_tables_document_page (document_id, page_number),
+        CONSTRAINT fk_tables_document FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS boilerplate_data (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        document_id INT NOT NULL,
+        page_number INT,
+        boilerplate_id INT NOT NULL,
+        region VARCHAR(16),
+        style VARCHAR(255),
+        text MEDIUMTEXT NOT NULL,
+        pages MEDIUMTEXT NOT NULL,
+        KEY idx_boilerplate_document (document_id, boilerplate_id),
+        CONSTRAINT fk_boilerplate_document FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS document_stages (
+        document_id INT NOT NULL,
+        stage VARCHAR(16) NOT NULL,
+        rows_hash CHAR(64) NOT NULL,
+        row_count INT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (document_id, stage),
+        CONSTRAINT fk_stages_document FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB;
+    """
+]
+
+# Tables written by earlier versions (keyed only by file_type), and how their rows map onto the new schema
+LEGACY_TABLES = {
+    "text_data": ("text_data (document_id, page_number, position, text)",
+                  "l.page_number, 0, l.text", "l.text IS NOT NULL"),
+    "links_data": ("links_data (document_id, page_number, linked_text, link)",
+                   "l.page_number, l.linked_text, l.link", "l.link IS NOT NULL"),
+    "images_data": ("images_data (document_id, page_number, image_filename, image_format)",
+                    "l.page_number, l.image_filename, l.image_format", "1 = 1"),
+    "tables_data": ("tables_data (document_id, page_number, csv_filename)",
+                    "l.page_number, l.csv_filename", "1 = 1")
+}
+
+
 class SQLStorage(Storage):
 
+    streams_batches = True  # See begin_stage(), store_batch() and end_stage()
+
     def __init__(self, host, user, password, database):
         self.host = host
         self.user = user
         self.password = password
         self.database = database
         self.connection = None
+        self.document_id = None
+        self._stage = None  # (stage, document_id, stored rows hash, RowsDigest) while a stage is being streamed
+        self.group_commit = False  # Leave commits to the caller, which commits groups of documents at once
+        self._schema_ready = False
         self._connect()
 
     def _connect(self):
@@ -42,105 +153,306 @@ class SQLStorage(Storage):
         finally:
             cursor.close()
 
-    def store_text(self, text_data, file_type):
+    def _replace_rows(self, stage, table, query, rows, document_id):
+        """
+        Makes `table` hold exactly `rows` for one document, atomically and idempotently.
+        A digest of the rows is kept per (document, stage): if it matches, the write is skipped; otherwise the
+        document's old rows are deleted and the new ones inserted in the same transaction, so re-ingesting a
+        document never appends duplicates.
+        Returns:
+            bool: True if rows were written, False if the stored rows were already identical.
         """
-        Stores extracted text data into a MySQL database.
+        rows_hash = hashlib.sha256(json.dumps(rows, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT rows_hash FROM document_stages WHERE document_id = %s AND stage = %s FOR UPDATE",
+                           (document_id, stage))
+            stored = cursor.fetchone()
+            if stored is not None and stored[0] == rows_hash:
+                if not self.group_commit:
+                    self.connection.rollback()  # Release the row lock
+                return False
+            cursor.execute(f"DELETE FROM {table} WHERE document_id = %s", (document_id,))
+            if rows:
+                cursor.executemany(query, rows)
+            cursor.execute(
+                "INSERT INTO document_stages (document_id, stage, rows_hash, row_count) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE rows_hash = VALUES(rows_hash), row_count = VALUES(row_count)",
+                (document_id, stage, rows_hash, len(rows)))
+            if not self.group_commit:
+                self.connection.commit()
+            return True
+        except Error as e:
+            if self.group_commit:
+                raise  # The group's other documents are rolled back with it; the caller retries them
+            self.connection.rollback()
+            print(f"Error executing query: {e}")
+            return False
+        finally:
+            cursor.close()
+
+    def begin_stage(self, stage, file_type, document_id=None):
+        """
+        Starts replacing one stage's rows for a document with rows that arrive in batches (see store_batch).
+        The old rows are deleted inside a transaction that stays open, holding the stage's row lock, until
+        end_stage() commits it or rolls it back because the rows turned out to be unchanged.
         Args:
-            text_data (list of dicts): The text data to store, each item contains page number and text content.
-            file_type (str): The type of file from which the text is extracted.
+            stage (str): 'text', 'links', 'images' or 'tables'.
+            file_type (str): The type of file the rows are extracted from.
+            document_id (int, optional): The owning document. Defaults to the one given to begin_document().
+        """
+        document_id = self._document(document_id)
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT rows_hash FROM document_stages WHERE document_id = %s AND stage = %s FOR UPDATE",
+                           (document_id, stage))
+            stored = cursor.fetchone()
+            cursor.execute(f"DELETE FROM {stage}_data WHERE document_id = %s", (document_id,))
+            self._stage = (stage, document_id, stored[0] if stored else None, RowsDigest())
+        except Error as e:
+            self.connection.rollback()
+            self._stage = None
+            print(f"Error executing query: {e}")
+        finally:
+            cursor.close()
+
+    def store_batch(self, stage, records, file_type):
+        """
+        Inserts one page's records into the stage opened by begin_stage(), without committing.
+        Args:
+            stage (str): The stage being streamed.
+            records (list): Records of that stage, as produced by DataExtractor for one page.
+            file_type (str): The type of file the rows are extracted from.
+        """
+        if self._stage is None:
+            return  # The stage could not be started; the error has been reported
+        _, document_id, _, digest = self._stage
+        columns = STAGE_COLUMNS[stage]
+        rows = [(document_id,) + row for row in stage_rows(stage, records)]
+        digest.update(rows)
+        cursor = self.connection.cursor()
+        try:
+            if rows:
+                cursor.executemany(f"INSERT INTO {stage}_data (document_id, {', '.join(columns)}) "
+                                   f"VALUES ({', '.join(['%s'] * (len(columns) + 1))})", rows)
+        except Error as e:
+            self.abort_stage()
+            print(f"Error executing query: {e}")
+        finally:
+            cursor.close()
+
+    def end_stage(self, stage, file_type):
+        """
+        Finishes a streamed stage: records the digest of its rows and commits, or rolls back if they match
+        the rows already stored.
+        Returns:
+            bool: True if rows were written, False if they were unchanged or the stage failed.
+        """
+        if self._stage is None:
+            return False
+        _, document_id, stored, digest = self._stage
+        self._stage = None
+        rows_hash = digest.hexdigest()
+        if rows_hash == stored:
+            self.connection.rollback()
+            print(f"{stage.capitalize()} data for {file_type} is already up to date in the database.")
+            return False
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO document_stages (document_id, stage, rows_hash, row_count) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE rows_hash = VALUES(rows_hash), row_count = VALUES(row_count)",
+                (document_id, stage, rows_hash, digest.count))
+            self.connection.commit()
+        except Error as e:
+            self.connection.rollback()
+            print(f"Error executing query: {e}")
+            return False
+        finally:
+            cursor.close()
+        print(f"{stage.capitalize()} data stored in the database for {file_type}.")
+        return True
+
+    def abort_stage(self):
         """
-        query = """
-        CREATE TABLE IF NOT EXISTS text_data (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            file_type VARCHAR(255),
-            page_number INT,
-            text TEXT
-        );
+        Rolls back a streamed stage, leaving the previously stored rows in place.
         """
-        self._execute_query(query)
+        self._stage = None
+        self.connection.rollback()
 
-        insert_query = "INSERT INTO text_data (file_type, page_number, text) VALUES (%s, %s, %s)"
-        for item in text_data:
-            self._execute_query(insert_query, (file_type, item.get('page_number'), item.get('text')))
-        print(f"Text data inserted into the database for {file_type}.")
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def _fetch_all(self, query, data=None):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, data)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def create_schema(self):
+        """
+        Creates the documents table and the per-document content tables with their indexes, if they do not exist.
+        Tables left over from the old, unkeyed layout are migrated first (see migrate_legacy_tables).
+        """
+        if self._schema_ready:
+            return
+        if self._legacy_tables():
+            self.migrate_legacy_tables()  # Also creates the new tables
+            return
+        for query in SCHEMA:
+            self._execute_query(query)
+        self._schema_ready = True
+
+    def _legacy_tables(self):
+        """
+        Lists the existing content tables that still use the old layout (a file_type column and no document_id).
+        """
+        rows = self._fetch_all(
+            "SELECT table_name, GROUP_CONCAT(column_name) FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name IN ('text_data', 'links_data', 'images_data', 'tables_data') "
+            "GROUP BY table_name")
+        return [table for table, columns in rows if "document_id" not in columns.split(",")]
+
+    def migrate_legacy_tables(self, drop_legacy=False):
+        """
+        Moves data from the old tables (text_data, links_data, images_data, tables_data keyed only by file_type)
+        into the normalized schema. The old tables are renamed to <name>_legacy; their rows are attached to one
+        placeholder document per file type, since the old layout never recorded which document a row came from.
+        Args:
+            drop_legacy (bool): Drop the renamed tables once their rows have been copied.
+        """
+        legacy = self._legacy_tables()
+        if not legacy:
+            print("No legacy tables found.")
+        for table in legacy:
+            self._execute_query(f"RENAME TABLE {table} TO {table}_legacy")
+        for query in SCHEMA:
+            self._execute_query(query)
+
+        for table in legacy:
+            # One placeholder document per file type, identified by a deterministic hash
+            self._execute_query(
+                f"INSERT IGNORE INTO documents (content_hash, name, file_type) "
+                f"SELECT DISTINCT SHA2(CONCAT('legacy:', file_type), 256), CONCAT('legacy ', file_type, ' rows'), "
+                f"file_type FROM {table}_legacy WHERE file_type IS NOT NULL")
+            target, columns, condition = LEGACY_TABLES[table]
+            self._execute_query(
+                f"INSERT INTO {target} SELECT d.id, {columns} FROM {table}_legacy l "
+                f"JOIN documents d ON d.content_hash = SHA2(CONCAT('legacy:', l.file_type), 256) WHERE {condition}")
+            if drop_legacy:
+                self._execute_query(f"DROP TABLE {table}_legacy")
+            print(f"Migrated {table} to the normalized schema.")
+        self._schema_ready = True
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        """
+        Registers a document (or finds it by content hash) and makes it the target of following store_* calls.
+        Args:
+            content_hash (str): SHA-256 of the document content.
+            name (str): A human-readable name, usually the file path.
+            file_type (str): 'pdf', 'docx' or 'pptx'.
+            page_count (int, optional): Number of pages or slides.
+        Returns:
+            int: The document id.
+        """
+        self.create_schema()
+        cursor = self.connection.cursor()
+        try:
+            # LAST_INSERT_ID(id) makes lastrowid return the existing row's id when the hash is already known
+            cursor.execute(
+                "INSERT INTO documents (content_hash, name, file_type, page_count) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id), name = VALUES(name), "
+                "page_count = COALESCE(VALUES(page_count), page_count)",
+                (content_hash, name, file_type, page_count))
+            if not self.group_commit:
+                self.connection.commit()
+            self.document_id = cursor.lastrowid
+        finally:
+            cursor.close()
+        return self.document_id
+
+    def _document(self, document_id):
+        document_id = document_id or self.document_id
+        if document_id is None:
+            raise ValueError("No document registered; call begin_document() before storing data")
+        self.create_schema()
+        return document_id
+
+    def store_text(self, text_data, file_type, document_id=None):
+        """
+        Stores extracted text data into a MySQL database, one row per line (PDF/PPTX) or paragraph (DOCX).
+        Storing the same document again replaces its rows instead of appending (see _replace_rows).
+        Deduplicated running headers and footers (TextColumns.boilerplate) go to boilerplate_data, once each.
+        Args:
+            text_data (list of dicts): The text data to store, as returned by DataExtractor.extract_text().
+            file_type (str): The type of file from which the text is extracted.
+            document_id (int, optional): The owning document. Defaults to the one given to begin_document().
+        """
+        document_id = self._document(document_id)
+        insert_query = "INSERT INTO text_data (document_id, page_number, position, style, text) VALUES (%s, %s, %s, %s, %s)"
+        rows = [(document_id,) + row for row in stage_rows("text", text_data)]
+        if self._replace_rows("text", "text_data", insert_query, rows, document_id):
+            print(f"Text data stored in the database for {file_type}.")
+        else:
+            print(f"Text data for {file_type} is already up to date in the database.")
+        if getattr(text_data, "boilerplate", None) is not None:
+            insert_query = ("INSERT INTO boilerplate_data (document_id, page_number, boilerplate_id, region, style, "
+                            "text, pages) VALUES (%s, %s, %s, %s, %s, %s, %s)")
+            rows = [(document_id,) + row for row in stage_rows("boilerplate", text_data.boilerplate_records())]
+            self._replace_rows("boilerplate", "boilerplate_data", insert_query, rows, document_id)
     
-    def store_links(self, links_data, file_type):
+    def store_links(self, links_data, file_type, document_id=None):
         """
         Stores extracted hyperlink data into the MySQL database.
-        This includes creating a table for links if it does not already exist and inserting the hyperlink data.
 
         Args:
             links_data (list of dicts): The hyperlink data to store, each item contains page number, linked text, and the hyperlink.
             file_type (str): The type of file from which the links are extracted.
-
-        Each link is stored with its file type, page number, the text of the link, and the URL.
-        """
-        query = """
-        CREATE TABLE IF NOT EXISTS links_data (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            file_type VARCHAR(255),
-            page_number INT,
-            linked_text TEXT,
-            link TEXT
-        );
+            document_id (int, optional): The owning document. Defaults to the one given to begin_document().
         """
-        self._execute_query(query)
+        document_id = self._document(document_id)
+        insert_query = "INSERT INTO links_data (document_id, page_number, linked_text, link) VALUES (%s, %s, %s, %s)"
+        rows = [(document_id,) + row for row in stage_rows("links", links_data)]
+        if self._replace_rows("links", "links_data", insert_query, rows, document_id):
+            print(f"Links data stored in the database for {file_type}.")
+        else:
+            print(f"Links data for {file_type} is already up to date in the database.")
 
-        insert_query = "INSERT INTO links_data (file_type, page_number, linked_text, link) VALUES (%s, %s, %s, %s)"
-        for item in links_data:
-            self._execute_query(insert_query, (file_type, item.get('page_number'), item.get('linked_text'), item.get('link')))
-        print(f"Links data inserted into the database for {file_type}.")
-
-    def store_images(self, images_data, file_type):
+    def store_images(self, images_data, file_type, document_id=None):
         """
         Stores extracted image metadata into the MySQL database.
-        This involves creating a table for images if it does not exist and inserting metadata about each image.
 
         Args:
             images_data (list of dicts): The image data to store, each item contains page number, image filename, and image format.
             file_type (str): The type of file from which the images are extracted.
-
-        Each image's metadata includes the file type, page number, filename, and format.
+            document_id (int, optional): The owning document. Defaults to the one given to begin_document().
         """
-        query = """
-        CREATE TABLE IF NOT EXISTS images_data (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            file_type VARCHAR(255),
-            page_number INT,
-            image_filename VARCHAR(255),
-            image_format VARCHAR(50)
-        );
-        """
-        self._execute_query(query)
-
-        insert_query = "INSERT INTO images_data (file_type, page_number, image_filename, image_format) VALUES (%s, %s, %s, %s)"
-        for item in images_data:
-            self._execute_query(insert_query, (file_type, item.get('page_number'), item.get('image_filename'), item.get('image_format')))
-        print(f"Image data inserted into the database for {file_type}.")
+        document_id = self._document(document_id)
+        insert_query = "INSERT INTO images_data (document_id, page_number, image_filename, image_format, image_path) VALUES (%s, %s, %s, %s, %s)"
+        rows = [(document_id,) + row for row in stage_rows("images", images_data)]
+        if self._replace_rows("images", "images_data", insert_query, rows, document_id):
+            print(f"Image data stored in the database for {file_type}.")
+        else:
+            print(f"Image data for {file_type} is already up to date in the database.")
 
-    def store_tables(self, tables_data, file_type):
+    def store_tables(self, tables_data, file_type, document_id=None):
         """
         Stores extracted tables metadata into the MySQL database.
-        This includes creating a table for storing tables data if it does not already exist and inserting the table data.
 
         Args:
             tables_data (list of dicts): The table data to store, each item contains page number and the filename of the CSV representing the table.
             file_type (str): The type of file from which the tables are extracted.
-
-        Each table's metadata is stored with its file type, page number, and the CSV filename that stores the table's actual data.
+            document_id (int, optional): The owning document. Defaults to the one given to begin_document().
         """
-        query = """
-        CREATE TABLE IF NOT EXISTS tables_data (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            file_type VARCHAR(255),
-            page_number INT,
-            csv_filename VARCHAR(255)
-        );
-        """
-        self._execute_query(query)
-
-        insert_query = "INSERT INTO tables_data (file_type, page_number, csv_filename) VALUES (%s, %s, %s)"
-        for item in tables_data:
-            self._execute_query(insert_query, (file_type, item.get('page_number'), item.get('csv_filename')))
-        print(f"Table data inserted into the database for {file_type}.")
-        
\ No newline at end of file
+        document_id = self._document(document_id)
+        insert_query = "INSERT INTO tables_data (document_id, page_number, table_index, csv_filename, csv_path) VALUES (%s, %s, %s, %s, %s)"
+        rows = [(document_id,) + row for row in stage_rows("tables", tables_data)]
+        if self._replace_rows("tables", "tables_data", insert_query, rows, document_id):
+            print(f"Table data stored in the database for {file_type}.")
+        else:
+            print(f"Table data for {file_type} is already up to date in the database.")
@@ -0,0 +1,217 @@
+import sys
+import os
+import json
+import hashlib
+import sqlite3
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Storage.storage import Storage, STAGE_COLUMNS, RowsDigest, stage_rows
+
+# Same normalized layout as SQLStorage, for local runs that do not need a MySQL server
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    name TEXT,
+    file_type TEXT NOT NULL,
+    page_count INTEGER,
+    created_at REAL DEFAULT (strftime('%s', 'now'))
+);
+CREATE TABLE IF NOT EXISTS text_data (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    position INTEGER NOT NULL,
+    style TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_text_document_page ON text_data (document_id, page_number, position);
+CREATE TABLE IF NOT EXISTS links_data (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    linked_text TEXT,
+    link TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_links_document_page ON links_data (document_id, page_number);
+CREATE TABLE IF NOT EXISTS images_data (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    image_filename TEXT,
+    image_format TEXT,
+    image_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_images_document_page ON images_data (document_id, page_number);
+CREATE TABLE IF NOT EXISTS tables_data (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    table_index INTEGER,
+    csv_filename TEXT,
+    csv_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tables_document_page ON tables_data (document_id, page_number);
+CREATE TABLE IF NOT EXISTS boilerplate_data (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    boilerplate_id INTEGER NOT NULL,
+    region TEXT,
+    style TEXT,
+    text TEXT NOT NULL,
+    pages TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_boilerplate_document ON boilerplate_data (document_id, boilerplate_id);
+CREATE TABLE IF NOT EXISTS document_stages (
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    rows_hash TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (document_id, stage)
+);
+"""
+
+
+class SQLiteStorage(Storage):
+    """
+    Stores extracted data in a local SQLite database using the same normalized, document-keyed schema as
+    SQLStorage. Writes are idempotent: storing a document again replaces its rows, or is skipped if unchanged.
+    A stage can also be written page by page through begin_stage(), store_batch() and end_stage().
+    With group_commit set, begin_document() and store_*() leave their changes uncommitted, so a writer that
+    collects many documents can commit them together (see Storage.group_commit).
+    """
+
+    streams_batches = True
+
+    def __init__(self, db_path="extracted_data.db"):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+        self.document_id = None
+        self._stage = None  # (stage, document_id, stored rows hash, RowsDigest) while a stage is being streamed
+        self.group_commit = False
+
+    def _transaction(self):
+        # One transaction per call, or none at all when the caller commits groups of documents itself
+        return contextlib.nullcontext() if self.group_commit else self.connection
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        """
+        Registers a document (or finds it by content hash) and makes it the target of following store_* calls.
+        Returns:
+            int: The document id.
+        """
+        with self._transaction():
+            self.connection.execute(
+                "INSERT INTO documents (content_hash, name, file_type, page_count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (content_hash) DO UPDATE SET name = excluded.name, "
+                "page_count = COALESCE(excluded.page_count, page_count)",
+                (content_hash, name, file_type, page_count))
+            self.document_id = self.connection.execute(
+                "SELECT id FROM documents WHERE content_hash = ?", (content_hash,)).fetchone()[0]
+        return self.document_id
+
+    def _store(self, stage, data, file_type, document_id):
+        """
+        Replaces one stage's rows for a document in a single transaction, skipping the write if they are unchanged.
+        """
+        document_id = document_id or self.document_id
+        if document_id is None:
+            raise ValueError("No document registered; call begin_document() before storing data")
+        table, columns = f"{stage}_data", STAGE_COLUMNS[stage]
+        rows = [(document_id,) + row for row in stage_rows(stage, data)]
+        rows_hash = hashlib.sha256(json.dumps(rows, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+        with self._transaction():
+            stored = self.connection.execute(
+                "SELECT rows_hash FROM document_stages WHERE document_id = ? AND stage = ?", (document_id, stage)).fetchone()
+            if stored is not None and stored[0] == rows_hash:
+                print(f"{stage.capitalize()} data for {file_type} is already up to date in {self.db_path}.")
+                return
+            self.connection.execute(f"DELETE FROM {table} WHERE document_id = ?", (document_id,))
+            self.connection.executemany(
+                f"INSERT INTO {table} (document_id, {', '.join(columns)}) VALUES ({', '.join('?' * (len(columns) + 1))})",
+                rows)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO document_stages (document_id, stage, rows_hash, row_count) VALUES (?, ?, ?, ?)",
+                (document_id, stage, rows_hash, len(rows)))
+        print(f"{stage.capitalize()} data stored in {self.db_path} for {file_type}.")
+
+    def begin_stage(self, stage, file_type, document_id=None):
+        """
+        Starts replacing one stage's rows for a document. The transaction stays open while the batches arrive;
+        end_stage() commits it, or rolls it back if the rows turn out to be unchanged.
+        """
+        document_id = document_id or self.document_id
+        if document_id is None:
+            raise ValueError("No document registered; call begin_document() before storing data")
+        stored = self.connection.execute(
+            "SELECT rows_hash FROM document_stages WHERE document_id = ? AND stage = ?", (document_id, stage)).fetchone()
+        self.connection.execute(f"DELETE FROM {stage}_data WHERE document_id = ?", (document_id,))
+        self._stage = (stage, document_id, stored[0] if stored else None, RowsDigest())
+
+    def store_batch(self, stage, records, file_type):
+        """
+        Inserts one page's records into the stage opened by begin_stage().
+        """
+        _, document_id, _, digest = self._stage
+        columns = STAGE_COLUMNS[stage]
+        rows = [(document_id,) + row for row in stage_rows(stage, records)]
+        digest.update(rows)
+        self.connection.executemany(
+            f"INSERT INTO {stage}_data (document_id, {', '.join(columns)}) VALUES ({', '.join('?' * (len(columns) + 1))})",
+            rows)
+
+    def end_stage(self, stage, file_type):
+        """
+        Finishes a streamed stage: records its rows hash and commits, or rolls back if nothing changed.
+        """
+        _, document_id, stored, digest = self._stage
+        self._stage = None
+        rows_hash = digest.hexdigest()
+        if rows_hash == stored:
+            self.connection.rollback()
+            print(f"{stage.capitalize()} data for {file_type} is already up to date in {self.db_path}.")
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO document_stages (document_id, stage, rows_hash, row_count) VALUES (?, ?, ?, ?)",
+            (document_id, stage, rows_hash, digest.count))
+        self.connection.commit()
+        print(f"{stage.capitalize()} data stored in {self.db_path} for {file_type}.")
+
+    def abort_stage(self):
+        """
+        Rolls back a stage whose extraction failed part-way, leaving the previously stored rows in place.
+        """
+        self._stage = None
+        self.connection.rollback()
+
+    def store_text(self, text_data, file_type, document_id=None):
+        self._store("text", text_data, file_type, document_id)
+        if getattr(text_data, "boilerplate", None) is not None:  # Deduplicated headers and footers, stored once
+            self._store("boilerplate", text_data.boilerplate_records(), file_type, document_id)
+
+    def store_links(self, links_data, file_type, document_id=None):
+        self._store("links", links_data, file_type, document_id)
+
+    def store_images(self, images_data, file_type, document_id=None):
+        self._store("images", images_data, file_type, document_id)
+
+    def store_tables(self, tables_data, file_type, document_id=None):
+        self._store("tables", tables_data, file_type, document_id)
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
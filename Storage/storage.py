@@ -1,7 +1,107 @@
+import json
+import hashlib
 from abc import ABC, abstractmethod
 
+
+def iter_text_lines(text_data):
+    """
+    Flattens the text stage output of any format into (page_number, position, style, text) tuples.
+    PDF pages and PPTX slides carry their number and a list of lines under 'content'; DOCX paragraphs
+    form a flat list without pages, so their page_number is None and position is the paragraph index.
+    Args:
+        text_data (TextColumns | list): Output of DataExtractor.extract_text(), or its to_records() export.
+    Yields:
+        tuple: (page_number, position, style, text) for every non-empty line.
+    """
+    if hasattr(text_data, "iter_lines"):
+        yield from text_data.iter_lines()  # TextColumns: read the columns directly, without building dicts
+        return
+    for index, item in enumerate(text_data):
+        if "content" in item:
+            page_number = item.get("page_number", item.get("slide_number"))
+            for position, line in enumerate(item["content"]):
+                if line.get("text"):
+                    yield page_number, position, line.get("style"), line["text"]
+        elif item.get("text"):
+            yield None, index, item.get("style"), item["text"]
+
+
+def page_of(item):
+    """
+    Returns the page or slide number of an extracted record, or None for formats without pages.
+    """
+    return item.get("page_number", item.get("slide_number"))
+
+
+# Columns of the per-document rows each stage produces, shared by the SQL backends
+STAGE_COLUMNS = {
+    "text": ("page_number", "position", "style", "text"),
+    "links": ("page_number", "linked_text", "link"),
+    "images": ("page_number", "image_filename", "image_format", "image_path"),
+    "tables": ("page_number", "table_index", "csv_filename", "csv_path"),
+    # Running headers and footers kept once per document; pages lists every page they appear on
+    "boilerplate": ("page_number", "boilerplate_id", "region", "style", "text", "pages")
+}
+
+
+def stage_rows(stage, data):
+    """
+    Converts the records extracted by one stage into tuples laid out as in STAGE_COLUMNS[stage].
+    Args:
+        stage (str): 'text', 'links', 'images', 'tables' or 'boilerplate'.
+        data (list): The stage's output from DataExtractor.
+    Returns:
+        list: One tuple per row.
+    """
+    if stage == "text":
+        return list(iter_text_lines(data))
+    if stage == "boilerplate":
+        return [(item["page_number"], item["boilerplate_id"], item["region"], item["style"], item["text"],
+                 ",".join(map(str, item["pages"]))) for item in data]
+    columns = STAGE_COLUMNS[stage][1:]
+    return [(page_of(item),) + tuple(item.get(column) for column in columns) for item in data]
+
+
+class RowsDigest:
+    """
+    Computes the SHA-256 of json.dumps(rows) incrementally, as rows arrive in batches. The digest of all batches
+    equals that of the complete list, so rows streamed page by page compare equal to rows stored in one call.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256(b"[")
+        self.count = 0
+
+    def update(self, rows):
+        for row in rows:
+            encoded = json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")
+            self._hash.update(b", " + encoded if self.count else encoded)
+            self.count += 1
+
+    def hexdigest(self):
+        digest = self._hash.copy()
+        digest.update(b"]")
+        return digest.hexdigest()
+
+
 class Storage(ABC):
 
+    # Backends that set this implement begin_stage(), store_batch(), end_stage() and abort_stage(), and can
+    # receive a stage's rows page by page while extraction is still running (see Storage.async_storage)
+    streams_batches = False
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        """
+        Announces the document whose data the following store_* calls belong to.
+        Backends that key their rows by document override this; the default does nothing.
+        Args:
+            content_hash (str): SHA-256 of the document content.
+            name (str): A human-readable name, usually the file path.
+            file_type (str): 'pdf', 'docx' or 'pptx'.
+            page_count (int, optional): Number of pages or slides, if known.
+        """
+        return None
+
     @abstractmethod
     def store_text(self, text_data):
         pass
@@ -16,4 +116,11 @@ class Storage(ABC):
 
     @abstractmethod
     def store_tables(self, tables_data):
-        pass
\ No newline at end of file
+        pass
+
+    def store_fonts(self, fonts_data, file_type):
+        """
+        Stores the span font metadata of the fonts stage (a span_columns.SpanColumns).
+        Only backends with a columnar format for it override this; the default does nothing.
+        """
+        return None
\ No newline at end of file
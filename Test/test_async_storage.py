@@ -0,0 +1,84 @@
+import os
+import pytest
+from pipeline import Pipeline, build_sinks
+from Storage.async_storage import AsyncStorage
+from Storage.storage import Storage
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+
+class StreamingSink(Storage):
+    streams_batches = True
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        self.calls.append(("begin",))
+
+    def begin_stage(self, stage, file_type):
+        self.calls.append(("begin_stage", stage))
+
+    def store_batch(self, stage, records, file_type):
+        if stage == self.fail_on:
+            raise RuntimeError("disk full")
+        self.calls.append(("batch", stage, len(records)))
+
+    def end_stage(self, stage, file_type):
+        self.calls.append(("end_stage", stage))
+
+    def abort_stage(self):
+        self.calls.append(("abort_stage",))
+
+    def _store(self, stage, data):
+        self.calls.append(("store", stage, len(data)))
+
+    def store_text(self, text_data, file_type):
+        self._store("text", text_data)
+
+    def store_links(self, links_data, file_type):
+        self._store("links", links_data)
+
+    def store_images(self, images_data, file_type):
+        self._store("images", images_data)
+
+    def store_tables(self, tables_data, file_type):
+        self._store("tables", tables_data)
+
+
+def test_pdf_stages_are_streamed_page_by_page():
+    sink = StreamingSink()
+    pipeline = Pipeline(["text", "links"], [sink], async_writes=True)
+    results = pipeline.run(SAMPLE_PDF)
+    pipeline.close()
+    text_batches = [call for call in sink.calls if call[:2] == ("batch", "text")]
+    assert len(text_batches) == 15
+    assert sum(call[2] for call in sink.calls if call[:2] == ("batch", "links")) == len(results["links"])
+    assert ("end_stage", "text") in sink.calls and not [call for call in sink.calls if call[0] == "store"]
+
+def test_writer_error_is_raised_and_the_stage_rolled_back():
+    sink = StreamingSink(fail_on="text")
+    pipeline = Pipeline(["text"], [sink], async_writes=True)
+    with pytest.raises(RuntimeError, match="disk full"):
+        pipeline.run(SAMPLE_PDF)
+    assert sink.calls[-1] == ("abort_stage",)
+    sink.fail_on = None
+    pipeline.run(SAMPLE_PDF)  # The next document is written normally
+    assert sink.calls[-1] == ("end_stage", "text")
+    pipeline.close()
+
+def test_streamed_rows_match_a_synchronous_write(tmp_path):
+    sync_sink, = build_sinks(["sqlite"], sqlite_path=str(tmp_path / "sync.db"))
+    async_sink, = build_sinks(["sqlite"], sqlite_path=str(tmp_path / "async.db"))
+    Pipeline(["text", "links"], [sync_sink]).run(SAMPLE_PDF)
+    pipeline = Pipeline(["text", "links"], [async_sink], async_writes=True)
+    pipeline.run(SAMPLE_PDF)
+    pipeline.run(SAMPLE_PDF)  # Unchanged rows: the streamed transaction is rolled back
+    query = "SELECT stage, rows_hash, row_count FROM document_stages ORDER BY stage"
+    assert isinstance(pipeline.sinks[0], AsyncStorage)
+    assert async_sink.connection.execute(query).fetchall() == sync_sink.connection.execute(query).fetchall()
+    assert async_sink.connection.execute("SELECT COUNT(*) FROM text_data").fetchone()[0] == \
+        sync_sink.connection.execute("SELECT COUNT(*) FROM text_data").fetchone()[0]
+    pipeline.close()
+    sync_sink.close()
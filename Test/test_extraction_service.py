@@ -0,0 +1,130 @@
+import os
+import json
+import signal
+import asyncio
+import pytest
+from extraction_service import ExtractionService
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+with open(SAMPLE_PDF, "rb") as sample:
+    PDF = sample.read()
+
+
+async def request(port, method, target, body=b"", headers=None):
+    """
+    Sends one HTTP/1.1 request on a new connection and returns (status, headers, body), undoing chunked encoding.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    headers = dict({"Content-Length": str(len(body)), "Connection": "close"}, **(headers or {}))
+    head = f"{method} {target} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *lines = head.decode("latin-1").split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines)}
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size, _, body = body.partition(b"\r\n")
+            size = int(size, 16)
+            if not size:
+                break
+            chunks.append(body[:size])
+            body = body[size + 2:]
+        body = b"".join(chunks)
+    return int(status_line.split()[1]), headers, body
+
+
+def serve(test, **options):
+    """
+    Runs test(service) against a service on an ephemeral port, then shuts it down.
+    """
+    async def main():
+        service = ExtractionService(port=0, **options)
+        await service.start()
+        try:
+            await test(service)
+        finally:
+            await service.stop()
+    asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Extracted images and tables go below ./output
+
+
+def test_extract_returns_json_and_ndjson():
+    async def test(service):
+        status, headers, body = await request(service.port, "POST", "/extract?format=pdf&stages=text,links", PDF)
+        assert status == 200 and headers["content-type"] == "application/json"
+        result = json.loads(body)
+        assert list(result) == ["text", "links"] and len(result["text"]) == 15
+
+        status, headers, body = await request(service.port, "POST", "/extract?format=pdf&stages=links&stream=1", PDF)
+        assert status == 200 and headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in body.splitlines()]
+        assert {line["stage"] for line in lines[:-1]} == {"links"}
+        assert lines[-1] == {"status": "done", "counts": {"links": len(lines) - 1}}
+
+        status, _, body = await request(service.port, "GET", "/stats")
+        assert status == 200 and json.loads(body)["completed"] == 2
+    serve(test, workers=1)
+
+def test_malformed_requests_are_rejected():
+    async def test(service):
+        for length in ("abc", "-1"):
+            status, _, body = await request(service.port, "POST", "/extract?format=pdf", headers={"Content-Length": length})
+            assert status == 400 and json.loads(body) == {"error": "Invalid Content-Length"}
+        status, _, _ = await request(service.port, "POST", "/extract?format=pdf", headers={"Content-Length": "2048"})
+        assert status == 413  # Rejected from the header, before the body is read
+        status, _, _ = await request(service.port, "POST", "/extract?format=txt", PDF[:100])
+        assert status == 400
+        status, _, _ = await request(service.port, "POST", "/extract?format=pdf&stages=figures", PDF[:100])
+        assert status == 400
+        status, _, _ = await request(service.port, "GET", "/extract")
+        assert status == 405
+    serve(test, workers=1, max_upload_bytes=1024)
+
+def test_uploads_beyond_workers_and_queue_get_503():
+    async def test(service):
+        target = "/extract?format=pdf&stages=text,tables"
+        # Arriving together, the first workers + queue_size uploads are all admitted
+        responses = await asyncio.gather(*(request(service.port, "POST", target, PDF) for _ in range(4)))
+        statuses = sorted(status for status, _, _ in responses)
+        assert statuses == [200, 200, 200, 503]
+        rejected = next(headers for status, headers, _ in responses if status == 503)
+        assert rejected["retry-after"] == "1"
+        assert service.in_flight == 0 and service.stats["rejected"] == 1
+    serve(test, workers=2, queue_size=1)
+
+def test_pool_is_replaced_when_a_worker_dies():
+    async def test(service):
+        loop = asyncio.get_running_loop()
+        pid = await loop.run_in_executor(service.pool, os.getpid)  # The only worker
+        target = "/extract?format=pdf&stages=text,tables"
+        running = asyncio.ensure_future(request(service.port, "POST", target, PDF))
+        while service.in_flight == 0:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.3)
+        os.kill(pid, signal.SIGKILL)  # As a crash in native code or the OOM killer would
+        status, _, body = await running
+        assert status == 500 and "worker died" in json.loads(body)["error"]
+
+        status, _, body = await request(service.port, "POST", target, PDF)
+        assert status == 200 and len(json.loads(body)["text"]) == 15
+        assert service.stats["pool_restarts"] == 1
+    serve(test, workers=1)
+
+def test_job_timeout_answers_504_and_frees_the_worker():
+    async def test(service):
+        for _ in range(2):
+            status, _, body = await request(service.port, "POST", "/extract?format=pdf&stages=text,tables", PDF)
+            assert status == 504 and "budget" in json.loads(body)["error"]
+        assert service.stats["timed_out"] == 2 and service.stats["pool_restarts"] == 0
+        status, _, _ = await request(service.port, "GET", "/health")
+        assert status == 200
+    serve(test, workers=1, job_timeout=0.2)
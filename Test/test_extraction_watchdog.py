@@ -0,0 +1,58 @@
+import os
+import time
+import pdfplumber
+import pytest
+from extraction_watchdog import ExtractionTimeout
+from job_queue import DONE, JobQueue, JobWorker
+from pipeline import Pipeline
+from Test.test_pipeline import RecordingSink
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+
+@pytest.fixture
+def stuck_page(tmp_path, monkeypatch):
+    """
+    Makes pdfplumber hang on page 14 for as long as the returned marker file exists. The patch is inherited by
+    the watchdog's forked workers.
+    """
+    marker = tmp_path / "stuck"
+    marker.touch()
+    extract_tables = pdfplumber.page.Page.extract_tables
+
+    def hanging(page, *args, **kwargs):
+        while page.page_number == 14 and marker.exists():
+            time.sleep(0.05)
+        return extract_tables(page, *args, **kwargs)
+    monkeypatch.setattr(pdfplumber.page.Page, "extract_tables", hanging)
+    return marker
+
+def test_page_timeout_kills_the_worker_and_keeps_the_partial_result(tmp_path, stuck_page):
+    sink = RecordingSink()
+    pipeline = Pipeline(["text", "tables"], [sink], output_root=str(tmp_path), pages="12-15", page_timeout=1)
+    try:
+        started = time.monotonic()
+        with pytest.raises(ExtractionTimeout) as timeout:
+            pipeline.run(SAMPLE_PDF)
+        assert time.monotonic() - started < 10
+        e = timeout.value
+        assert (e.stage, e.page) == ("tables", 13) and "1s budget in the tables stage after page 13" in e.reason
+        assert len(e.results["text"]) == 4 and [table["page_number"] for table in e.results["tables"]] == [13]
+        assert sink.calls[1:] == [("text", 4), ("tables", 1)]  # The pages finished before the timeout were stored
+        assert pipeline.watchdog.restarts == 1 and pipeline.watchdog.process.is_alive()
+
+        stuck_page.unlink()
+        assert len(pipeline.run(SAMPLE_PDF)["tables"]) == 1  # The replacement worker takes the next document
+    finally:
+        pipeline.close()
+
+def test_timed_out_job_is_completed_with_its_reason(tmp_path, stuck_page):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue(SAMPLE_PDF, stages=["tables"])
+    worker = JobWorker(queue, output_root=str(tmp_path), pipeline_options={"document_timeout": 2, "pages": "13-15"})
+    worker.run(stop_when_empty=True)
+    job = queue.get(job_id)
+    assert job["state"] == DONE and job["attempts"] == 1
+    assert job["result"] == {"tables": 1, "timeout": "Document exceeded its 2s budget in the tables stage after page 13"}
+    assert worker.watchdog.process is None  # Stopped with the worker
+    queue.close()
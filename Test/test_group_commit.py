@@ -0,0 +1,59 @@
+import os
+import queue
+import threading
+from pipeline import Pipeline
+from Storage.group_commit import GroupCommitSink, GroupCommitWriter
+from Storage.sqlite_storage import SQLiteStorage
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "Sample_file")
+
+
+def start_writer(storage, workers, **thresholds):
+    requests = queue.Queue()
+    acks = {worker: queue.Queue() for worker in range(workers)}
+    writer = GroupCommitWriter(storage, requests, acks, **thresholds)
+    thread = threading.Thread(target=writer.run)
+    thread.start()
+    return writer, thread, [GroupCommitSink(requests, acks[worker], worker) for worker in range(workers)]
+
+
+def test_documents_from_several_workers_share_one_commit(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "data.db"))
+    writer, thread, sinks = start_writer(storage, 2, max_documents=2, max_delay=5)
+    runs = [threading.Thread(target=Pipeline(["text", "links"], [sink]).run, args=(os.path.join(SAMPLE_DIR, name),))
+            for sink, name in zip(sinks, ["sample.pdf", "sample.docx"])]
+    for run in runs:
+        run.start()
+    for run in runs:
+        run.join()  # Each run returns only after its document was acknowledged
+    writer.requests.put(None)
+    thread.join()
+    assert writer.commits == 1
+    assert storage.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 2
+    assert storage.connection.execute("SELECT COUNT(*) FROM document_stages").fetchone()[0] == 4
+    storage.close()
+
+def test_failing_document_does_not_fail_its_group(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "data.db"))
+    writer, thread, (good, bad) = start_writer(storage, 2, max_documents=2, max_delay=5)
+    good.begin_document("a" * 64, "good.pdf", "pdf", 1)
+    good.store_links([{"page_number": 1, "link": "https://example.com"}], "pdf")
+    bad.begin_document("b" * 64, "bad.pdf", "pdf", 1)
+    bad.store_links([{"page_number": 1, "link": object()}], "pdf")  # Not a value SQLite can bind
+    errors = {}
+
+    def flush(sink):
+        try:
+            sink.flush()
+        except RuntimeError as e:
+            errors[sink.worker] = str(e)
+    flushes = [threading.Thread(target=flush, args=(sink,)) for sink in (good, bad)]
+    for flush_thread in flushes:
+        flush_thread.start()
+    for flush_thread in flushes:
+        flush_thread.join()
+    writer.requests.put(None)
+    thread.join()
+    assert list(errors) == [1] and "failed to store" in errors[1]
+    assert storage.connection.execute("SELECT name FROM documents").fetchall() == [("good.pdf",)]
+    storage.close()
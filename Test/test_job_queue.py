@@ -0,0 +1,69 @@
+import time
+import pytest
+from job_queue import JobQueue, JobWorker, PRIORITIES, QUEUED, RUNNING, DONE, FAILED
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), visibility_timeout=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+def test_interactive_jobs_are_claimed_before_older_batch_jobs(queue):
+    batch_id = queue.enqueue("backfill/huge.pdf", priority="batch")
+    interactive_id = queue.enqueue("uploads/small.pdf", priority="interactive")
+    assert queue.claim("w1")["id"] == interactive_id
+    assert queue.claim("w1")["id"] == batch_id
+    assert queue.claim("w1") is None
+
+def test_reserved_worker_skips_batch_jobs(queue):
+    queue.enqueue("backfill/huge.pdf", priority="batch")
+    assert queue.claim("w1", max_priority=PRIORITIES["interactive"]) is None
+
+def test_failed_job_is_retried_then_marked_failed(queue):
+    job_id = queue.enqueue("uploads/broken.docx")
+    job = queue.claim("w1")
+    assert queue.fail(job_id, "w1", "corrupt", retry_delay=0) == QUEUED
+    job = queue.claim("w1")
+    assert job["attempts"] == 2
+    assert queue.fail(job_id, "w1", "corrupt", retry_delay=0) == FAILED
+    assert queue.get(job_id)["last_error"] == "corrupt"
+
+def test_expired_lease_makes_job_visible_again(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), visibility_timeout=0.01)
+    job_id = queue.enqueue("uploads/slow.pptx")
+    assert queue.claim("w1")["id"] == job_id
+    time.sleep(0.05)
+    assert queue.claim("w2")["id"] == job_id
+    assert not queue.complete(job_id, "w1", {})  # The first worker lost its lease
+    assert queue.complete(job_id, "w2", {"text": 3})
+    assert queue.get(job_id)["state"] == DONE
+    queue.close()
+
+def test_in_memory_payload_and_format_detection(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue(b"%PDF-1.7")
+    job_id = queue.enqueue(b"%PDF-1.7", file_format="pdf", stages=["text"])
+    job = queue.claim("w1")
+    assert job["id"] == job_id and job["payload"] == b"%PDF-1.7" and job["state"] == RUNNING
+    assert queue.get(job_id)["state"] == RUNNING
+
+def test_worker_discards_the_result_of_a_job_whose_lease_expired(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), visibility_timeout=0.3)
+    job_id = queue.enqueue("uploads/slow.pptx")
+
+    class StalledWorker(JobWorker):
+        def process(self, job):
+            queue._transaction(  # As if the heartbeat had stalled past the lease
+                lambda cursor: cursor.execute("UPDATE jobs SET lease_expires_at = 0 WHERE id = ?", (job["id"],)))
+            assert queue.claim("w2")["id"] == job["id"]
+            assert self.lease_lost.wait(5)  # Noticed by the next heartbeat
+            return {"text": 1}
+
+    worker = StalledWorker(queue, worker_id="w1")
+    assert worker.run_once()
+    assert worker.lost_leases == 1
+    job = queue.get(job_id)
+    assert job["state"] == RUNNING and job["worker_id"] == "w2" and job["result"] is None
+    assert queue.complete(job_id, "w2", {"text": 3}) and queue.get(job_id)["result"] == {"text": 3}
+    queue.close()
@@ -0,0 +1,42 @@
+import numpy as np
+from data_extractor1 import DataExtractor
+from layout import BODY, FOOTER, HEADER, page_regions, reading_order
+from loaders.pdf_loader import PDFLoader
+
+WIDTH, HEIGHT = 612, 792
+
+
+def test_two_columns_are_read_left_column_first():
+    boxes = np.array([
+        [320, 100, 560, 300],  # Right column, top
+        [50, 740, 560, 760],  # Footer
+        [50, 100, 290, 300],  # Left column, top
+        [50, 30, 560, 50],  # Header
+        [50, 320, 290, 500],  # Left column, bottom
+        [50, 520, 560, 600],  # Full-width block below the columns
+        [320, 320, 560, 500],  # Right column, bottom
+    ], dtype=np.float32)
+    assert page_regions(boxes, HEIGHT).tolist() == [BODY, FOOTER, BODY, HEADER, BODY, BODY, BODY]
+    assert reading_order(boxes, WIDTH, HEIGHT).tolist() == [3, 2, 4, 0, 6, 5, 1]
+
+def test_short_indented_block_does_not_open_a_column():
+    boxes = np.array([[50, 100, 560, 200], [400, 210, 560, 225], [50, 230, 560, 400]], dtype=np.float32)
+    assert reading_order(boxes, WIDTH, HEIGHT).tolist() == [0, 1, 2]
+
+def test_pdf_text_follows_reading_order(tmp_path):
+    import fitz
+
+    path = str(tmp_path / "columns.pdf")
+    document = fitz.open()
+    page = document.new_page(width=WIDTH, height=HEIGHT)
+    # Written right column first, as some typesetters do
+    page.insert_textbox(fitz.Rect(320, 100, 560, 300), "right column text " * 20, fontsize=11)
+    page.insert_textbox(fitz.Rect(50, 100, 290, 300), "left column text " * 20, fontsize=11)
+    page.insert_textbox(fitz.Rect(50, 30, 560, 50), "running header", fontsize=11)
+    document.save(path)
+
+    header, body = [line["text"] for line in DataExtractor(PDFLoader(), path).extract_text()[0]["content"]]
+    assert header == "running header"  # Not joined with the body
+    assert body.startswith("left") and body.index("left") < body.index("right")
+    raw = DataExtractor(PDFLoader(), path, layout=False).extract_text()[0]["content"][0]["text"]
+    assert raw.startswith("right") and raw.endswith("running header")
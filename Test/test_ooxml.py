@@ -0,0 +1,152 @@
+import io
+import os
+import zipfile
+from docx import Document
+from docx.enum.text import WD_BREAK
+from data_extractor1 import DataExtractor, clean_text
+from loaders.docx_loader import DOCXLoader
+from loaders.ppt_loader import PPTLoader
+from loaders.ooxml import iter_docx_paragraphs, iter_pptx_slides
+
+SAMPLE_DOCX = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.docx")
+
+
+def python_docx_text(path):
+    return [
+        {"text": clean_text(paragraph.text), "style": paragraph.style.name if paragraph.style else "Normal"}
+        for paragraph in Document(path).paragraphs if paragraph.text.strip()
+    ]
+
+def test_streamed_docx_text_matches_python_docx():
+    assert DataExtractor(DOCXLoader(), SAMPLE_DOCX).extract_text() == python_docx_text(SAMPLE_DOCX)
+
+def test_runs_breaks_and_table_paragraphs(tmp_path):
+    document = Document()
+    document.add_heading("Title", level=2)
+    paragraph = document.add_paragraph("first\tcolumn ")
+    paragraph.add_run("line").add_break()
+    paragraph.add_run("next").add_break(WD_BREAK.PAGE)
+    document.add_table(rows=1, cols=1).cell(0, 0).text = "inside table"
+    document.add_paragraph("quoted", style="Quote")
+    path = str(tmp_path / "generated.docx")
+    document.save(path)
+
+    assert list(iter_docx_paragraphs(path)) == [
+        ("Title", "Heading 2"), ("first\tcolumn line\nnext", "Normal"), ("quoted", "Quote")]
+    with open(path, "rb") as file:
+        assert DataExtractor(DOCXLoader(), file.read()).extract_text() == python_docx_text(path)
+
+
+def make_deck(path, slides):
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+    from PIL import Image
+
+    presentation = Presentation()
+    for number in range(slides):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[5])
+        slide.shapes.title.text = f"Title {number}"
+        paragraph = slide.shapes.add_textbox(0, 0, Inches(3), Inches(1)).text_frame.paragraphs[0]
+        paragraph.add_run().text = "Visit "
+        link = paragraph.add_run()
+        link.text, link.font.size = "our site", Pt(16)
+        link.hyperlink.address = "https://example.com"
+        image = io.BytesIO()
+        Image.new("RGB", (8, 8)).save(image, "PNG")
+        slide.shapes.add_picture(image, 0, 0)
+        table = slide.shapes.add_table(1, 2, 0, 0, Inches(2), Inches(1)).table
+        table.cell(0, 1).text = "a\nb"
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_textbox(0, 0, 10, 10).text_frame.text = "grouped"
+        image.seek(0)
+        group.shapes.add_group_shape().shapes.add_picture(image, 0, 0)  # Nested two levels deep
+    presentation.save(path)
+
+def test_pptx_slides_are_read_from_slide_xml(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    make_deck(path, 2)
+    (number, slide), _ = iter_pptx_slides(path)
+    assert number == 1
+    assert slide["text"] == [("Title 0", "normal"), ("Visit our site", "Heading"), ("grouped", "normal")]
+    assert slide["links"] == [("our site", "https://example.com")]
+    assert [part for _, part in slide["pictures"]] == ["ppt/media/image1.png", "ppt/media/image1.png"]
+    assert [rows for _, rows in slide["tables"]] == [[["", "a\nb"]]]
+
+def test_pptx_links_are_deduplicated_and_grouped_pictures_found(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_deck("deck.pptx", 3)
+    extractor = DataExtractor(PPTLoader(), "deck.pptx")
+    assert extractor.extract_links() == [{"slide_number": 1, "linked_text": "our site", "link": "https://example.com"}]
+    images = extractor.extract_images()
+    assert [image["image_filename"] for image in images][:2] == ["pptx_image_1_4.png", "pptx_image_1_9.png"]
+    assert len(images) == 6
+
+def test_parallel_slide_parsing_keeps_presentation_order(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    make_deck(path, 12)
+    assert list(iter_pptx_slides(path, workers=2, batch_size=2)) == list(iter_pptx_slides(path))
+
+def test_slide_selection_parses_only_the_selected_slides(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_deck("deck.pptx", 12)
+    assert [number for number, _ in iter_pptx_slides("deck.pptx", workers=2, batch_size=2, slides={3, 7, 8})] == [3, 7, 8]
+    extractor = DataExtractor(PPTLoader(), "deck.pptx", pages="5-6")
+    assert [slide["slide_number"] for slide in extractor.extract_text()] == [5, 6]
+    assert {table["slide_number"] for table in extractor.extract_tables()} == {5, 6}
+    assert [slide["slide_number"] for slide in extractor.extract_text(pages="12-")] == [12]
+
+def test_docx_images_include_anchored_pictures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    images = DataExtractor(DOCXLoader(), os.path.abspath(SAMPLE_DOCX)).extract_images()
+    assert [(image["paragraph_number"], image["image_filename"]) for image in images] == [
+        (57, "docx_image_1.png"), (98, "docx_image_2.png"), (170, "docx_image_3.png")]
+
+def test_docx_inline_images_are_copied_unchanged(tmp_path, monkeypatch):
+    from PIL import Image
+
+    monkeypatch.chdir(tmp_path)
+    Image.new("RGB", (8, 8), "red").save("red.png")
+    document = Document()
+    document.add_paragraph("before")
+    document.add_picture("red.png")
+    document.add_table(rows=1, cols=1).cell(0, 0).paragraphs[0].add_run().add_picture("red.png")
+    document.save("pictures.docx")
+
+    images = DataExtractor(DOCXLoader(), "pictures.docx").extract_images()
+    assert [(image["paragraph_number"], image["image_format"]) for image in images] == [(2, "png"), (None, "png")]
+    with open("red.png", "rb") as original, open(images[0]["image_path"], "rb") as copy:
+        assert copy.read() == original.read()
+
+def test_docx_tables_resolve_merges_and_nested_tables(tmp_path, monkeypatch):
+    import csv
+
+    monkeypatch.chdir(tmp_path)
+    document = Document()
+    table = document.add_table(rows=3, cols=3)
+    table.cell(0, 0).text = "wide"
+    table.cell(0, 0).merge(table.cell(0, 1))
+    table.cell(1, 2).text = "tall"
+    table.cell(1, 2).merge(table.cell(2, 2))
+    table.cell(2, 0).add_table(rows=1, cols=2).cell(0, 1).text = "inner"  # The cell keeps an empty paragraph after it
+    document.save("tables.docx")
+
+    tables = DataExtractor(DOCXLoader(), "tables.docx").extract_tables()
+    assert [(table["table_index"], table["parent_table"]) for table in tables] == [(1, None), (2, 1)]
+    with open(tables[0]["csv_path"], newline="", encoding="utf-8") as file:
+        assert list(csv.reader(file)) == [["wide", "wide", ""], ["", "", "tall"], ["\n", "", "tall"]]
+    with open(tables[1]["csv_path"], newline="", encoding="utf-8") as file:
+        assert list(csv.reader(file)) == [["", "inner"]]
+
+def test_slide_count_follows_the_presentation_slide_list(tmp_path):
+    from pptx import Presentation
+
+    path = str(tmp_path / "deck.pptx")
+    make_deck(path, 3)
+    presentation = Presentation(path)
+    slide_ids = presentation.slides._sldIdLst
+    slide_ids.remove(slide_ids[1])  # Its slide part stays in the package, orphaned
+    presentation.save(path)
+    with zipfile.ZipFile(path) as package:
+        assert sum(name.startswith("ppt/slides/slide") for name in package.namelist()) == 3
+    extractor = DataExtractor(PPTLoader(), path, output_dir=str(tmp_path))
+    assert extractor.count_pages() == 2 == len(extractor.extract_text())
@@ -0,0 +1,36 @@
+import os
+import pytest
+from pipeline import Pipeline, build_sinks
+from Storage.output_layout import AtomicFile, document_key
+from Storage.serializers import read_json
+from loaders.file_loader import content_hash
+
+SAMPLE_DOCX = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.docx")
+
+
+def test_atomic_file_only_appears_when_committed(tmp_path):
+    path = str(tmp_path / "table.csv")
+    with AtomicFile(path, "w", newline="") as file:
+        file.write("a,b\n")
+        assert not os.path.exists(path)
+    assert open(path).read() == "a,b\n"
+    assert os.listdir(tmp_path) == ["table.csv"]
+
+def test_atomic_file_keeps_previous_version_on_error(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with AtomicFile(str(path)) as file:
+            file.write(b"partial")
+            raise RuntimeError("extraction failed")
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+def test_per_document_output_is_namespaced_by_content_hash(tmp_path):
+    sinks = build_sinks(["json"], str(tmp_path), per_document=True)
+    Pipeline(["text", "images"], sinks, output_root=str(tmp_path), per_document=True).run(SAMPLE_DOCX)
+    folder = tmp_path / document_key(content_hash(SAMPLE_DOCX))
+    assert os.listdir(tmp_path) == [folder.name]
+    assert read_json(str(folder / "document.json"))["file_type"] == "docx"
+    assert read_json(str(folder / "text" / "docx" / "docx_text.json"))
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".tmp")]
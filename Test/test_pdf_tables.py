@@ -0,0 +1,33 @@
+import os
+import pdfplumber
+import pytest
+import data_extractor1
+from data_extractor1 import DataExtractor
+from loaders.pdf_loader import PDFLoader
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+
+def _tables(tmp_path, **options):
+    tables = DataExtractor(PDFLoader(), SAMPLE_PDF, output_dir=str(tmp_path), pages="11-15", **options).extract_tables()
+    return [(table["page_number"], table["table_index"], table["csv_filename"]) for table in tables]
+
+def test_bounded_table_mode_releases_pages_and_reopens_in_windows(tmp_path, monkeypatch):
+    expected = _tables(tmp_path / "default")
+    assert expected == [(13, 1, "pdf_table_13_1.csv")]
+
+    opened, closed = [], []
+    open_pdf, close_page = pdfplumber.open, pdfplumber.page.Page.close
+    monkeypatch.setattr(data_extractor1.pdfplumber, "open",
+                        lambda *args, **kwargs: opened.append(kwargs["pages"]) or open_pdf(*args, **kwargs))
+    monkeypatch.setattr(pdfplumber.page.Page, "close", lambda page: closed.append(page.page_number) or close_page(page))
+    assert _tables(tmp_path / "bounded", table_reopen_pages=2) == expected
+    assert [[number for number in range(1, 16) if number in pages] for pages in opened] == [[11, 12], [13, 14], [15]]
+    # Each page is released right after its tables, before the next page is parsed (closing the document again repeats it)
+    assert closed[:2] == [11, 12] and sorted(set(closed)) == [11, 12, 13, 14, 15]
+
+def test_rss_ceiling_reopens_then_gives_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_extractor1, "_rss_mb", lambda: 500.0)
+    assert _tables(tmp_path / "roomy", table_max_rss=1000) == [(13, 1, "pdf_table_13_1.csv")]
+    with pytest.raises(MemoryError):
+        _tables(tmp_path / "tight", table_max_rss=100)
@@ -0,0 +1,125 @@
+import os
+import pytest
+from pipeline import Pipeline, build_sinks
+from Storage.storage import Storage
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+
+class RecordingSink(Storage):
+    def __init__(self):
+        self.calls = []
+
+    def begin_document(self, content_hash, name, file_type, page_count=None):
+        self.calls.append(("begin", name, file_type, page_count))
+
+    def store_text(self, text_data, file_type):
+        self.calls.append(("text", len(text_data)))
+
+    def store_links(self, links_data, file_type):
+        self.calls.append(("links", len(links_data)))
+
+    def store_images(self, images_data, file_type):
+        self.calls.append(("images", len(images_data)))
+
+    def store_tables(self, tables_data, file_type):
+        self.calls.append(("tables", len(tables_data)))
+
+
+def test_only_selected_stages_run_and_reach_every_sink():
+    sinks = [RecordingSink(), RecordingSink()]
+    results = Pipeline(["links", "text"], sinks).run(SAMPLE_PDF)
+    assert list(results) == ["links", "text"]
+    for sink in sinks:
+        assert [call[0] for call in sink.calls] == ["begin", "links", "text"]
+        assert sink.calls[0][2:] == ("pdf", 15)
+
+def test_unknown_stage_is_rejected():
+    with pytest.raises(ValueError):
+        Pipeline(["text", "figures"])
+
+def test_sqlite_sink_is_idempotent(tmp_path):
+    sink, = build_sinks(["sqlite"], sqlite_path=str(tmp_path / "data.db"))
+    pipeline = Pipeline(["text"], [sink])
+    pipeline.run(SAMPLE_PDF)
+    pipeline.run(SAMPLE_PDF)
+    assert sink.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 1
+    assert sink.connection.execute("SELECT COUNT(*) FROM text_data").fetchone()[0] > 0
+    sink.close()
+
+def test_pdf_pages_are_walked_once_for_all_requested_stages(monkeypatch):
+    import fitz
+
+    loaded = []
+    load_page = fitz.Document.load_page
+    monkeypatch.setattr(fitz.Document, "load_page", lambda doc, number: loaded.append(number) or load_page(doc, number))
+    results = Pipeline(["text", "links"]).run(SAMPLE_PDF)
+    assert loaded == list(range(15))
+    assert len(results["links"]) == 8 and results["text"][0]["page_number"] == 1
+
+def test_pdf_images_are_saved_from_the_single_page_pass(tmp_path, monkeypatch):
+    import data_extractor1
+    from data_extractor1 import DataExtractor
+    from loaders.pdf_loader import PDFLoader
+
+    opened = []
+    open_document = data_extractor1.open_fitz_document
+    monkeypatch.setattr(data_extractor1, "open_fitz_document", lambda source: opened.append(source) or open_document(source))
+    extractor = DataExtractor(PDFLoader(), SAMPLE_PDF, output_dir=str(tmp_path), stages=["text", "images"])
+    reported = []
+    extractor.on_page = reported.append
+    extractor.extract_text()
+    images = extractor.extract_images()
+    assert len(opened) == 1 and reported == list(range(1, 16))  # One document, and each page reported once
+    assert [(image["page_number"], image["image_filename"].rsplit(".", 1)[0]) for image in images] == [
+        (3, "pdf_image_3_1"), (3, "pdf_image_3_2"), (4, "pdf_image_4_1"), (4, "pdf_image_4_2"), (4, "pdf_image_4_3")]
+    assert all(os.path.getsize(image["image_path"]) > 0 for image in images)
+
+def test_page_selection_only_loads_the_selected_pages(monkeypatch):
+    import fitz
+
+    loaded = []
+    load_page = fitz.Document.load_page
+    monkeypatch.setattr(fitz.Document, "load_page", lambda doc, number: loaded.append(number) or load_page(doc, number))
+    full = Pipeline(["text", "links"]).run(SAMPLE_PDF)
+    loaded.clear()
+    results = Pipeline(["text", "links"], pages="2-3,15").run(SAMPLE_PDF)
+    assert loaded == [1, 2, 14]
+    assert [page["page_number"] for page in results["text"]] == [2, 3, 15]
+    assert results["text"] == [page for page in full["text"] if page["page_number"] in (2, 3, 15)]
+    assert results["links"] == [link for link in full["links"] if link["page_number"] in (2, 3, 15)]
+
+@pytest.mark.parametrize("spec, ranges", [
+    ("1-20", ((1, 20),)), ("12, 5-8", ((5, 8), (12, 12))), ("30-", ((30, None),)), (range(1, 4), ((1, 3),)), ([7, 2], ((2, 2), (7, 7)))
+])
+def test_page_selection_parsing(spec, ranges):
+    from data_extractor1 import PageSelection
+
+    assert PageSelection(spec).ranges == ranges
+
+@pytest.mark.parametrize("spec", ["", "0-3", "5-2", "a-b", "1,,2"])
+def test_invalid_page_selection_is_rejected(spec):
+    from data_extractor1 import PageSelection
+
+    with pytest.raises(ValueError):
+        PageSelection(spec)
+
+def test_boilerplate_is_stored_once_per_document(tmp_path):
+    import fitz
+
+    path = str(tmp_path / "report.pdf")
+    document = fitz.open()
+    for number, topic in enumerate(["Revenue", "Costs", "Staff", "Outlook", "Risks"], start=1):
+        page = document.new_page()
+        page.insert_text((72, 40), "ACME annual report", fontsize=9)
+        page.insert_text((72, 120), f"{topic} findings.", fontsize=11)
+        page.insert_text((72, 810), f"Page {number}", fontsize=9)
+    document.save(path)
+
+    sink, = build_sinks(["sqlite"], sqlite_path=str(tmp_path / "data.db"))
+    results = Pipeline(["text"], [sink], boilerplate="drop").run(path)
+    assert results["text"][0]["content"] == [{"text": "Revenue findings.", "style": "normal"}]
+    rows = sink.connection.execute("SELECT region, text, pages FROM boilerplate_data ORDER BY boilerplate_id").fetchall()
+    assert rows == [("header", "ACME annual report", "1,2,3,4,5"), ("footer", "Page 1", "1,2,3,4,5")]
+    assert sink.connection.execute("SELECT COUNT(*) FROM text_data").fetchone()[0] == 5
+    sink.close()
@@ -0,0 +1,49 @@
+import io
+import os
+import pytest
+from loaders.file_loader import content_hash
+from pipeline import Pipeline
+from Storage.search_index import SearchIndex
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    yield index
+    index.close()
+
+def test_hits_report_page_numbers_and_styles(index):
+    pdf_text = [
+        {"page_number": 1, "content": [{"text": "Quarterly Report", "style": "Heading"}]},
+        {"page_number": 2, "content": [{"text": "Revenue grew in the quarterly results", "style": "normal"}]}
+    ]
+    index.store_text(pdf_text, "pdf", document="report.pdf")
+    hits = index.search("quarterly")
+    assert {hit["page_number"] for hit in hits} == {1, 2}
+    headings = index.search("quarterly", style="Heading")
+    assert [hit["page_number"] for hit in headings] == [1]
+
+def test_reindexing_a_document_replaces_its_lines(index):
+    index.store_text([{"text": "old wording", "style": "Normal"}], "docx", document="contract.docx")
+    index.store_text([{"text": "new wording", "style": "Normal"}], "docx", document="contract.docx")
+    assert index.search("old") == []
+    hit, = index.search("wording")
+    assert hit["document"] == "contract.docx" and hit["page_number"] is None
+
+def test_punctuation_in_queries_does_not_break_fts_syntax(index):
+    index.store_text([{"slide_number": 3, "content": [{"text": "C++ (and more)", "style": "normal"}]}], "pptx", document="deck.pptx")
+    assert index.search('C++ "(and') != []
+
+def test_in_memory_document_without_a_name_is_indexed_by_content_hash(index, tmp_path):
+    with open(SAMPLE_PDF, "rb") as f:
+        data = f.read()
+    pipeline = Pipeline(["text"], [index], output_root=str(tmp_path))
+    pipeline.run(data, "pdf")
+    hits = index.search("the", limit=1)
+    assert hits[0]["document"] is None and hits[0]["content_hash"] == content_hash(data)
+
+    pipeline.run(io.BytesIO(data), "pdf", name="renamed.pdf")  # Same content: replaces the entry instead of adding one
+    assert index.connection.execute("SELECT name FROM documents").fetchall() == [("renamed.pdf",)]
+    assert index.search("the", limit=1, document=content_hash(data))[0]["document"] == "renamed.pdf"
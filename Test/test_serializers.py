@@ -0,0 +1,25 @@
+import pytest
+from Storage import serializers
+from Storage.file_storage import JSONFileStorage
+from Storage.serializers import dumps, read_json
+
+RECORDS = [{"page_number": 1, "content": [{"text": "Überblick – naïve café", "style": "Heading"}]},
+           {"page_number": 2, "content": []}]
+
+
+def test_output_is_compact_utf8():
+    assert dumps({"text": "café", "n": [1, 2]}) == '{"text":"café","n":[1,2]}'.encode("utf-8")
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    encoded = dumps(RECORDS)
+    monkeypatch.setattr(serializers, "orjson", None)
+    assert dumps(RECORDS) == encoded
+
+@pytest.mark.parametrize("lines", [False, True])
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_file_storage_round_trips(tmp_path, lines, compression):
+    storage = JSONFileStorage(str(tmp_path), lines=lines, compression=compression)
+    storage.store_text(RECORDS, "pdf")
+    name = "pdf_text.jsonl" if lines else "pdf_text.json"
+    name += {None: "", "gzip": ".gz"}[compression]
+    assert read_json(str(tmp_path / "text" / "pdf" / name)) == RECORDS
@@ -0,0 +1,32 @@
+import io
+import mmap
+import pytest
+from loaders.file_loader import is_file_path, to_buffer, normalize_source, open_stream, read_header, describe_source
+
+
+def test_path_sources_are_left_untouched():
+    assert is_file_path("Sample_file/sample.pdf")
+    assert normalize_source("Sample_file/sample.pdf") == "Sample_file/sample.pdf"
+    assert open_stream("Sample_file/sample.pdf") == "Sample_file/sample.pdf"
+
+def test_bytes_source_is_shared_without_copy():
+    data = b"%PDF-1.7 example"
+    assert to_buffer(data) is data
+    assert open_stream(data).read() == data
+
+def test_bytesio_and_mmap_sources_normalize_to_same_content(tmp_path):
+    data = b"PK\x03\x04 zipped content"
+    path = tmp_path / "sample.docx"
+    path.write_bytes(data)
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        assert to_buffer(mapped) == data
+        assert read_header(mapped, 4) == b"PK\x03\x04"
+        mapped.close()
+    assert to_buffer(io.BytesIO(data)) == data
+    assert read_header(io.BytesIO(data), 4) == b"PK\x03\x04"
+    assert "in-memory" in describe_source(io.BytesIO(data))
+
+def test_unsupported_source_type_is_rejected():
+    with pytest.raises(TypeError):
+        to_buffer(12345)
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+from docx import Document
+from docx.shared import Pt, RGBColor
+from data_extractor1 import DataExtractor
+from loaders.docx_loader import DOCXLoader
+from loaders.pdf_loader import PDFLoader
+from loaders.ppt_loader import PPTLoader
+from span_columns import FLAG_BOLD, FLAG_ITALIC, SpanColumns
+from Test.test_ooxml import make_deck
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+
+def test_columns_support_vectorized_queries_and_round_trip(tmp_path):
+    spans = SpanColumns()
+    spans.add(1, 0, 0, "Title", "Arial", 18, FLAG_BOLD, 0xFF0000, (0, 0, 100, 20))
+    spans.add(1, 1, 0, "body", "Times", 11, 0)
+    spans.add(2, 0, 0, "Émphasis", "Arial", 18, FLAG_BOLD | FLAG_ITALIC)
+    assert spans.texts((spans.size == 18) & (spans.flags & FLAG_BOLD != 0)) == ["Title", "Émphasis"]
+    assert spans.texts(spans.fonts_matching("times")) == ["body"]
+    assert spans.record(0)["bbox"] == [0, 0, 100, 20] and spans.record(1)["color"] is None
+
+    spans.save(str(tmp_path / "spans.npz"))
+    loaded = SpanColumns.load(str(tmp_path / "spans.npz"))
+    assert loaded.to_records() == spans.to_records()
+
+    other = SpanColumns()
+    other.add(1, 0, 0, "code", "Courier", 18, FLAG_BOLD)
+    corpus = SpanColumns.concatenate([loaded, other])
+    assert corpus.fonts == ["Arial", "Times", "Courier"]
+    assert corpus.document[corpus.size == 18].tolist() == [0, 0, 1]
+    assert corpus.texts(np.flatnonzero(corpus.page == 2)) == ["Émphasis"]
+
+def test_pdf_spans_come_from_the_text_page_pass(monkeypatch):
+    import fitz
+
+    loaded = []
+    load_page = fitz.Document.load_page
+    monkeypatch.setattr(fitz.Document, "load_page", lambda doc, number: loaded.append(number) or load_page(doc, number))
+    extractor = DataExtractor(PDFLoader(), SAMPLE_PDF, stages=["text", "fonts"], pages="1-2")
+    extractor.extract_text()
+    spans = extractor.extract_fonts()
+    assert loaded == [0, 1]
+    assert len(spans) and set(spans.page.tolist()) == {1, 2} and not np.isnan(spans.bbox).any()
+
+def test_docx_and_pptx_runs_carry_style_and_direct_formatting(tmp_path):
+    document = Document()
+    document.add_heading("Heading", level=1)
+    paragraph = document.add_paragraph("plain ")
+    run = paragraph.add_run("red bold")
+    run.bold, run.font.size, run.font.name, run.font.color.rgb = True, Pt(18), "Courier New", RGBColor(255, 0, 0)
+    path = str(tmp_path / "runs.docx")
+    document.save(path)
+    spans = DataExtractor(DOCXLoader(), path).extract_fonts()
+    assert spans.texts() == ["Heading", "plain ", "red bold"]
+    assert spans.record(0)["flags"] & FLAG_BOLD and spans.record(0)["size"] == 14  # From the Heading 1 style
+    assert spans.record(2)["font"] == "Courier New" and spans.record(2)["color"] == 0xFF0000
+    assert spans.texts((spans.size == 18) & (spans.flags & FLAG_BOLD != 0)) == ["red bold"]
+
+    make_deck(str(tmp_path / "deck.pptx"), 1)
+    spans = DataExtractor(PPTLoader(), str(tmp_path / "deck.pptx")).extract_fonts()
+    assert spans.texts(spans.size == 16) == ["our site"]
@@ -0,0 +1,36 @@
+import hashlib
+import json
+from unittest.mock import patch, MagicMock
+from Storage.sql_storage import SQLStorage
+
+
+def make_storage(stored_hash=None):
+    cursor = MagicMock()
+    cursor.fetchall.return_value = []  # No legacy tables
+    cursor.fetchone.return_value = (stored_hash,) if stored_hash else None
+    cursor.lastrowid = 7
+    connection = MagicMock()
+    connection.cursor.return_value = cursor
+    with patch('mysql.connector.connect', return_value=connection):
+        storage = SQLStorage(host="localhost", user="root", password="", database="test")
+    storage.begin_document("abc123", "report.pdf", "pdf", 2)
+    cursor.reset_mock()
+    return storage, cursor
+
+def executed(cursor):
+    return [" ".join(call[0][0].split()) for call in cursor.execute.call_args_list]
+
+def test_text_rows_are_keyed_to_the_document_and_replace_old_rows():
+    storage, cursor = make_storage()
+    storage.store_text([{"page_number": 1, "content": [{"text": "Intro", "style": "Heading"}]}], "pdf")
+    assert "DELETE FROM text_data WHERE document_id = %s" in executed(cursor)
+    rows = cursor.executemany.call_args[0][1]
+    assert rows == [(7, 1, 0, "Heading", "Intro")]
+
+def test_identical_rows_are_not_written_again():
+    rows = [(7, 2, None, "https://example.com")]
+    stored_hash = hashlib.sha256(json.dumps(rows, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+    storage, cursor = make_storage(stored_hash)
+    storage.store_links([{"page_number": 2, "link": "https://example.com"}], "pdf")
+    assert not any(query.startswith(("DELETE", "INSERT")) for query in executed(cursor))
+    cursor.executemany.assert_not_called()
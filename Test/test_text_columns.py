@@ -0,0 +1,48 @@
+import pickle
+from text_columns import TextColumns
+from Storage.serializers import dumps
+from Storage.storage import iter_text_lines
+
+PAGES = [{"page_number": 2, "content": [{"text": "Überblick", "style": "Heading"}, {"text": "", "style": None},
+                                        {"text": "naïve café – 3€", "style": "normal"}]},
+         {"page_number": 5, "content": []},
+         {"page_number": 6, "content": [{"text": "end", "style": "normal"}]}]
+PARAGRAPHS = [{"text": "Title", "style": "Title"}, {"text": "Body", "style": "Normal"}]
+
+
+def test_columns_read_like_the_records_they_replace():
+    columns = TextColumns.from_records(PAGES)
+    assert columns == PAGES and columns.to_records() == PAGES
+    assert len(columns) == 3 and columns.line_count == 4
+    assert columns[0] == PAGES[0] and columns[-1] == PAGES[-1] and columns[1:] == PAGES[1:]
+    assert list(columns) == PAGES
+    assert pickle.loads(pickle.dumps(columns)) == PAGES
+
+def test_lines_and_json_match_the_dict_shape():
+    for records in (PAGES, PARAGRAPHS):
+        columns = TextColumns.from_records(records)
+        assert list(iter_text_lines(columns)) == list(iter_text_lines(records))
+        assert dumps(columns) == dumps(records) and dumps({"text": columns}, indent=True) == dumps({"text": records}, indent=True)
+
+def test_styles_are_interned():
+    columns = TextColumns("slide_number")
+    for number in range(1, 101):
+        columns.add_page(number, [("a", "Heading"), ("b", "normal")])
+    assert repr(columns) == "<TextColumns 100 pages, 200 lines, 2 styles>"
+    assert columns[99] == {"slide_number": 100, "content": [{"text": "a", "style": "Heading"}, {"text": "b", "style": "normal"}]}
+
+def test_running_headers_and_page_numbers_are_kept_once():
+    columns = TextColumns()
+    for number, topic in enumerate(["Revenue", "Costs", "Staff", "Outlook"], start=1):
+        columns.add_page(number, [("ACME  annual report", "normal"), (f"{topic} findings", "normal"),
+                                  (f"Page {number} of 4", "normal")])
+    deduplicated = columns.deduplicate_boilerplate()
+    assert deduplicated.boilerplate == [("ACME  annual report", "normal", "header", [1, 2, 3, 4]),
+                                        ("Page 1 of 4", "normal", "footer", [1, 2, 3, 4])]
+    assert deduplicated[1]["content"] == [{"boilerplate": 0}, {"text": "Costs findings", "style": "normal"},
+                                          {"boilerplate": 1}]
+    assert [line[3] for line in iter_text_lines(deduplicated)] == ["Revenue findings", "Costs findings",
+                                                                         "Staff findings", "Outlook findings"]
+    dropped = columns.deduplicate_boilerplate(drop=True)
+    assert dropped.line_count == 4 and len(dropped.boilerplate_records()) == 2
+    assert columns.deduplicate_boilerplate(min_pages=5).boilerplate == []
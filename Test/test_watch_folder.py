@@ -0,0 +1,95 @@
+import os
+import shutil
+import pytest
+from pipeline import Pipeline
+from watch_folder import FolderWatcher, WatchState, extract_with
+from Test.test_pipeline import RecordingSink
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "Sample_file", "sample.pdf")
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    return inbox
+
+@pytest.fixture
+def state(tmp_path):
+    state = WatchState(str(tmp_path / "watch_state.db"))
+    yield state
+    state.close()
+
+def make_watcher(inbox, state, handled, settle_seconds=0):
+    handler = lambda path, file_format: handled.append((os.path.basename(path), file_format))
+    return FolderWatcher(str(inbox), handler, state, settle_seconds=settle_seconds, poll_interval=0.01,
+                         use_inotify=False)
+
+def test_new_files_are_processed_once(inbox, state):
+    handled = []
+    watcher = make_watcher(inbox, state, handled)
+    assert watcher.inotify is None  # Polling backend
+    (inbox / "report.pdf").write_bytes(b"%PDF-1.7 first")
+    (inbox / "upload.docx.part").write_bytes(b"partial")
+    (inbox / "~$report.docx").write_bytes(b"lock")
+    watcher.run(once=True)
+    assert handled == [("report.pdf", "pdf")]
+
+    (inbox / "slides.pptx").write_bytes(b"PK")
+    watcher.run(once=True)
+    watcher.run(once=True)
+    assert handled == [("report.pdf", "pdf"), ("slides.pptx", "pptx")]
+
+def test_touched_file_is_skipped_and_changed_file_is_processed_again(inbox, state):
+    handled = []
+    path = inbox / "report.pdf"
+    path.write_bytes(b"%PDF-1.7 first")
+    make_watcher(inbox, state, handled).run(once=True)
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # Same content, new mtime
+    watcher = make_watcher(inbox, state, handled)  # As after a restart
+    watcher.run(once=True)
+    assert handled == [("report.pdf", "pdf")]
+    assert state.is_unchanged(str(path), os.stat(path))  # The new mtime is remembered, so it is not re-hashed
+
+    path.write_bytes(b"%PDF-1.7 second")
+    watcher.run(once=True)
+    assert handled == [("report.pdf", "pdf"), ("report.pdf", "pdf")]
+
+def test_files_wait_until_settled_and_failures_are_retried(inbox, state):
+    handled = []
+    watcher = make_watcher(inbox, state, handled, settle_seconds=60)
+    (inbox / "report.pdf").write_bytes(b"%PDF-1.7 still copying")
+    watcher.scan()
+    assert watcher.process_ready() == 0 and handled == []
+
+    def failing(path, file_format):
+        raise SystemExit("Invalid PDF")  # As the loaders report unreadable files
+    watcher = FolderWatcher(str(inbox), failing, state, settle_seconds=0, use_inotify=False)
+    watcher.scan()
+    assert watcher.process_ready() == 0
+    make_watcher(inbox, state, handled).run(once=True)  # Not recorded, so picked up again
+    assert handled == [("report.pdf", "pdf")]
+
+def test_file_removed_after_it_settles_is_dropped(inbox, state, monkeypatch):
+    import watch_folder
+
+    handled = []
+    path = inbox / "report.pdf"
+    path.write_bytes(b"%PDF-1.7 first")
+    watcher = make_watcher(inbox, state, handled)
+    watcher.run(once=True)
+    path.write_bytes(b"%PDF-1.7 second, renamed away while it is read")
+    hash_file = watch_folder.content_hash
+    monkeypatch.setattr(watch_folder, "content_hash", lambda source: path.unlink() or hash_file(source))
+    watcher.scan()
+    assert watcher.process_ready() == 0  # The daemon keeps running
+    assert handled == [("report.pdf", "pdf")] and watcher.pending == {} and state.get(str(path)) is None
+
+def test_extract_with_runs_the_pipeline(inbox, state):
+    shutil.copy(SAMPLE_PDF, inbox / "sample.pdf")
+    sink = RecordingSink()
+    FolderWatcher(str(inbox), extract_with(Pipeline(["links"], [sink])), state, settle_seconds=0,
+                  use_inotify=False).run(once=True)
+    assert [call[0] for call in sink.calls] == ["begin", "links"]
@@ -1,14 +1,21 @@
 import os
+import gc
 import fitz  # PyMuPDF for handling PDF files
 import pdfplumber  # For extracting tables from PDFs
 import csv  # For saving tables as CSV files
 from docx.oxml.ns import qn  # Used for namespacing in DOCX processing
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from loaders.file_loader import AbstractFileLoader
+from loaders.file_loader import AbstractFileLoader, normalize_source, open_stream, open_fitz_document
 from loaders.pdf_loader import PDFLoader
 from loaders.ppt_loader import PPTLoader
 from loaders.docx_loader import DOCXLoader
+from Storage.output_layout import AtomicFile
+from text_columns import TextColumns
+from span_columns import SpanColumns
+from layout import block_boxes, page_regions, reading_order, upright_blocks
+from loaders.ooxml import (iter_docx_paragraphs, iter_docx_runs, iter_docx_images, iter_docx_tables, iter_pptx_slides,
+                           pptx_slide_parts, open_package, content_type, copy_part, read_part_header, image_extension)
 
 def clean_text(text):
     """
@@ -20,187 +27,475 @@ def clean_text(text):
     """
     return text.replace("\n", " ").replace("\t", " ").strip()
 
+# Maps each supported file format to the loader class that handles it
+LOADERS = {
+    "pdf": PDFLoader,
+    "docx": DOCXLoader,
+    "pptx": PPTLoader
+}
+
+# Extraction stages, mapped to the DataExtractor method that computes each of them
+STAGES = {
+    "text": "extract_text",
+    "links": "extract_links",
+    "images": "extract_images",
+    "tables": "extract_tables",
+    "fonts": "extract_fonts"
+}
+
+# Stages run when none are chosen; the span-level fonts stage is opt-in
+DEFAULT_STAGES = ("text", "links", "images", "tables")
+
+# get_text("dict") flags without image blocks: only text lines are used, and embedding every image's
+# binary data in the result made up most of the text extraction time
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+def detect_format(filename):
+    """
+    Determines the file format from a file name or path based on its extension.
+    Args:
+        filename (str): The file name or path.
+    Returns:
+        str | None: One of the keys of LOADERS, or None if the format is not supported.
+    """
+    extension = os.path.splitext(str(filename))[1].lower().lstrip(".")
+    return extension if extension in LOADERS else None
+
+def _rss_mb():
+    """
+    Returns the resident memory of this process in MB.
+    """
+    import psutil  # Only needed when a memory ceiling is set
+
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+class PageSelection:
+    """
+    A set of 1-based page (or slide) numbers given as ranges, e.g. "1-20", "5-8,12" or "30-" for page 30
+    to the end. Extraction only touches the selected pages.
+    """
+
+    __slots__ = ("ranges",)
+
+    def __init__(self, pages):
+        """
+        Args:
+            pages (str | int | range | iterable | PageSelection): The pages to select.
+        Raises:
+            ValueError: If the selection is empty or not a valid list of ranges.
+        """
+        if isinstance(pages, PageSelection):
+            ranges = list(pages.ranges)
+        elif isinstance(pages, str):
+            ranges = []
+            for part in pages.replace(" ", "").split(","):
+                first, dash, last = part.partition("-")
+                if not first.isdigit() or (last and not last.isdigit()):
+                    raise ValueError(f"Invalid page range: {part!r}. Use e.g. 1-20,25,30-")
+                ranges.append((int(first), (int(last) if last else None) if dash else int(first)))
+        elif isinstance(pages, int):
+            ranges = [(pages, pages)]
+        elif isinstance(pages, range) and pages.step == 1:
+            ranges = [(pages.start, pages.stop - 1)] if len(pages) else []
+        else:
+            ranges = [(number, number) for number in pages]
+        if not ranges or any(first < 1 or (last is not None and last < first) for first, last in ranges):
+            raise ValueError(f"Invalid page selection: {pages!r}. Pages are numbered from 1")
+        self.ranges = tuple(sorted(ranges, key=lambda item: (item[0], item[1] is None, item[1])))
+
+    def __contains__(self, number):
+        return any(first <= number and (last is None or number <= last) for first, last in self.ranges)
+
+    def __eq__(self, other):
+        return isinstance(other, PageSelection) and self.ranges == other.ranges
+
+    def __hash__(self):
+        return hash(self.ranges)
+
+    def __repr__(self):
+        return f"PageSelection({str(self)!r})"
+
+    def __str__(self):
+        return ",".join(str(first) if first == last else f"{first}-{last or ''}" for first, last in self.ranges)
+
+    def numbers(self, count):
+        """
+        Returns the selected page numbers of a document with `count` pages, in ascending order.
+        """
+        return [number for number in range(1, count + 1) if number in self]
+
+
 class DataExtractor:
-    def __init__(self, loader):
+    def __init__(self, loader, source=None, workers=1, stages=None, output_dir="output", pages=None, layout=True,
+                 boilerplate=None, table_reopen_pages=None, table_max_rss=None):
         """
         Initializes the DataExtractor with a specific file loader instance.
+        The document may be a filesystem path or an in-memory buffer (bytes, BytesIO or mmap); in-memory
+        sources are normalized once and the same buffer is shared by every extraction stage.
         Args:
             loader (PDFLoader | DOCXLoader | PPTLoader): The loader instance capable of loading a specific file format.
+            source (str | bytes | io.BytesIO | mmap.mmap, optional): The document to extract from. Defaults to loader.filepath.
+            workers (int): Processes used to parse PPTX slides in parallel. 1 parses them in this process.
+            stages (list, optional): Stages that will be requested, so the single PDF page pass only collects
+                what is needed. Defaults to DEFAULT_STAGES.
+            output_dir (str): Folder that receives extracted images and table CSVs (under images/<format> and
+                tables/<format>). Use a per-document folder when several documents are processed at once.
+            pages (str | range | iterable | PageSelection, optional): PDF pages or PPTX slides to extract,
+                e.g. "1-20". Defaults to all. DOCX files have no fixed pages and are always read whole.
+            layout (bool): Put the text blocks of each PDF page in reading order (header, columns left to right,
+                footer; see layout.reading_order) instead of the order of the page's content stream.
+            boilerplate (str, optional): 'reference' to keep running headers, footers and page numbers that
+                recur across PDF pages or PPTX slides once per document, with references from the pages
+                (see TextColumns.deduplicate_boilerplate), or 'drop' to also leave them out of the pages.
+            table_reopen_pages (int, optional): Reopen the PDF every this many pages while extracting tables, which
+                releases what pdfminer caches for the whole document (fonts, parsed objects).
+            table_max_rss (float, optional): Resident memory ceiling in MB for PDF table extraction. The document is
+                reopened as soon as it is exceeded, and MemoryError is raised if that does not bring it back down.
         """
         self.loader = loader
+        self.source = normalize_source(source if source is not None else loader.filepath)
+        self.loader.filepath = self.source
+        self.workers = workers
+        self.stages = set(stages or DEFAULT_STAGES)
+        self.output_dir = output_dir
+        self._slides = None  # Parsed PPTX slides, shared by all extraction stages
+        self._pages = None  # Per-page PDF content from the single page pass
+        self._page_kinds = set()  # Which stages' content _pages holds
+        self._pdf_text = None  # TextColumns filled by the page pass
+        self._pdf_spans = None  # SpanColumns filled by the page pass
+        self.on_batch = None  # Optional callback(stage, records), called as each PDF page's records are ready
+        self.on_page = None  # Optional callback(page_number), called whenever a stage is done with a PDF page
+        self.pages = None if pages is None else PageSelection(pages)
+        self.layout = layout
+        self.boilerplate = boilerplate
+        self.table_reopen_pages = table_reopen_pages
+        self.table_max_rss = table_max_rss
+
+    def _select(self, pages):
+        """
+        Applies the page selection passed to an extract_* method. A new selection drops the cached page
+        and slide content, which only holds the previously selected pages.
+        """
+        if pages is None:
+            return
+        pages = PageSelection(pages)
+        if pages != self.pages:
+            self.pages = pages
+            self._slides, self._pages, self._page_kinds = None, None, set()
+            self._pdf_text, self._pdf_spans = None, None
+
+    def _page_numbers(self, count):
+        return list(range(1, count + 1)) if self.pages is None else self.pages.numbers(count)
+
+    def _add_batch(self, stage, data, batch):
+        """
+        Appends one page's records to a stage's output and passes them to on_batch straight away, so storage
+        can write them while the following pages are still being extracted.
+        """
+        data.extend(batch)
+        if batch and self.on_batch is not None:
+            self.on_batch(stage, batch)
+
+    def _page_done(self, page_number):
+        """
+        Reports progress to on_page, e.g. for a watchdog that enforces a time budget per page.
+        """
+        if self.on_page is not None:
+            self.on_page(page_number)
+
+    def count_pages(self):
+        """
+        Counts the pages of a PDF or the slides of a PPTX without extracting any content.
+        Returns:
+            int | None: The page or slide count, or None for DOCX files, which have no fixed pages.
+        """
+        if isinstance(self.loader, PDFLoader):
+            with open_fitz_document(self.source) as doc:
+                return doc.page_count
+        if isinstance(self.loader, PPTLoader):
+            # The slides listed in the presentation, as extraction and page selection number them
+            with open_package(self.source) as package:
+                return len(pptx_slide_parts(package))
+        return None
+
+    def _pptx_slides(self, spans=False):
+        """
+        Parses the slide XML of a PPTX file once, straight from the ZIP, and caches it for every stage.
+        Only the selected slides are parsed. Run font properties are collected too when the fonts stage
+        was requested (or spans=True, which reparses slides cached without them).
+        Returns:
+            list: (slide number, slide dict) pairs as produced by loaders.ooxml.iter_pptx_slides.
+        """
+        if self._slides is None or (spans and self._slides and "spans" not in self._slides[0][1]):
+            self.loader.check_file(self.source)
+            self._slides = list(iter_pptx_slides(self.source, self.workers, slides=self.pages,
+                                                 spans=spans or "fonts" in self.stages))
+        return self._slides
 
-    def extract_text(self):
+    def _pdf_pages(self, stage):
+        """
+        Walks the pages of a PDF once with PyMuPDF, collecting text blocks, link URIs and image references
+        from each page together, and caches the result for every stage. Besides the stage asked for, the pass
+        collects all the other requested stages (see self.stages) that it does not hold yet. Only the selected
+        pages are loaded, and each is released as soon as it has been read.
+        Args:
+            stage (str): The stage that needs the page content: 'text', 'links', 'images' or 'fonts'.
+        Returns:
+            iterable: One dict per selected page with its 'page_number' and 'links' (URIs) and 'images' (records
+                of the images saved from the page) entries. Merged text lines go straight into the TextColumns in self._pdf_text, and spans into
+                the SpanColumns in self._pdf_spans.
+                On the first pass each page is yielded as soon as it has been read.
+        """
+        if stage in self._page_kinds:
+            return self._pages
+        kinds = ({stage} | (self.stages & {"text", "links", "images", "fonts"})) - self._page_kinds
+        return self._walk_pdf_pages(kinds)
+
+    def _walk_pdf_pages(self, kinds):
+        with open_fitz_document(self.source) as doc:
+            if self._pages is None:
+                self._pages = [{"page_number": number} for number in self._page_numbers(doc.page_count)]
+            if "text" in kinds:
+                self._pdf_text = TextColumns("page_number")
+            if "fonts" in kinds:
+                self._pdf_spans = SpanColumns()
+            for page_data in self._pages:
+                page = doc.load_page(page_data["page_number"] - 1)
+                if "text" in kinds or "fonts" in kinds:
+                    blocks = page.get_text("dict", flags=PDF_TEXT_FLAGS)["blocks"]  # Shared by both stages
+                    regions = None
+                    if self.layout and len(blocks) > 1:
+                        boxes = block_boxes(blocks)
+                        order = reading_order(boxes, page.rect.width, page.rect.height, upright_blocks(blocks))
+                        blocks = [blocks[index] for index in order]
+                        regions = page_regions(boxes, page.rect.height)[order]
+                    if "text" in kinds:
+                        self._pdf_text.add_page(page_data["page_number"], self._merge_pdf_lines(blocks, regions))
+                    if "fonts" in kinds:
+                        self._add_pdf_spans(page_data["page_number"], blocks)
+                    blocks = None
+                if "links" in kinds:
+                    page_data["links"] = [link["uri"] for link in page.get_links() if link.get("uri")]
+                if "images" in kinds:
+                    page_data["images"] = self._save_pdf_images(doc, page, page_data["page_number"])
+                page = None  # Release the page (and its parsed content) before loading the next one
+                self._page_done(page_data["page_number"])
+                yield page_data
+        self._page_kinds |= kinds
+
+    def extract_text(self, pages=None):
         """
         Extracts text from a loaded file using the appropriate loader.
         Differentiates extraction logic based on the file type.
+        Args:
+            pages (str | range | iterable | PageSelection, optional): PDF pages or PPTX slides to extract,
+                e.g. "1-20". Defaults to the selection given to the constructor.
         Returns:
-            list | dict: Text data extracted from the file, formatted according to file type.
+            TextColumns: Text data extracted from the file, in a compact columnar form. It behaves like the list of
+                per-page (or, for DOCX, per-paragraph) dictionaries it replaces; to_records() exports that list.
         """
+        self._select(pages)
         if isinstance(self.loader, PDFLoader):
-            return self._extract_pdf_text(self.loader.filepath)  # Special handling for PDF files directly from the path
-
-        loaded_file = self.loader.open_file(self.loader.filepath)  # Load file for DOCX or PPT
-
+            return self._extract_pdf_text(self._pdf_pages("text"))  # From the single PyMuPDF page pass
         if isinstance(self.loader, DOCXLoader):
-            return self._extract_docx_text(loaded_file)
-        elif isinstance(self.loader, PPTLoader):
-            return self._extract_pptx_text(loaded_file)
+            self.loader.check_file(self.source)
+            return self._extract_docx_text(self.source)  # Streamed from the ZIP, without building a python-docx tree
+        if isinstance(self.loader, PPTLoader):
+            return self._extract_pptx_text(self._pptx_slides())
 
-    def _extract_pdf_text(self, pdf_path):
+    def _extract_pdf_text(self, pages):
         """
         Extracts text from a PDF file, merging text blocks intelligently to maintain logical content structure.
         Args:
-            pdf_path (str): The file path to the PDF document.
+            pages (iterable): Per-page content from the single PDF page pass.
         Returns:
-            list: List of dictionaries with page numbers and content for each page.
-        """
-        doc = fitz.open(pdf_path)  # Open the PDF document using PyMuPDF
-        text_data = []
-
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)  # Load each page individually
-            blocks = page.get_text("dict")["blocks"]  # Extract text in 'dict' format to get structured blocks
-            page_content = []
-            current_line = ""
-            current_style = None  # Style tracking variable
-
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        line_text = ""
-                        line_style = None
-
-                        for span in line["spans"]:
-                            font_size = span["size"]
-                            text = span["text"].strip()
-                            style = "Heading" if font_size > 14 else "normal"
-
-                            line_text += " " + text if line_text else text
-                            line_style = line_style or style
-
-                        # Continuously merge text or start new line based on style consistency
-                        if current_line and line_style == current_style:
-                            current_line += " " + line_text
-                        else:
-                            if current_line:  # Finish the current line and start a new one
-                                page_content.append({"text": current_line.strip(), "style": current_style})
-                            current_line = line_text
-                            current_style = line_style
-
-            # Ensure the last line of the page is added
-            if current_line:
-                page_content.append({"text": current_line.strip(), "style": current_style})
-
-            text_data.append({"page_number": page_num + 1, "content": page_content})
-
-        return text_data
-
-    def _extract_docx_text(self, doc):
+            TextColumns: The text of each page; reads like a list of {"page_number", "content"} dictionaries.
+        """
+        if self.boilerplate:
+            for _ in pages:  # Boilerplate is only known once every page has been read, so nothing is streamed
+                pass
+            if self._pdf_text.boilerplate is None:
+                self._pdf_text = self._pdf_text.deduplicate_boilerplate(drop=self.boilerplate == "drop")
+            return self._pdf_text
+        for index, _ in enumerate(pages):  # On the first pass, each page's lines are added as it is read
+            if self.on_batch is not None:
+                self.on_batch("text", [self._pdf_text.record(index)])
+        return self._pdf_text
+
+    @staticmethod
+    def _merge_pdf_lines(blocks, regions=None):
+        """
+        Merges the lines of a page's text blocks into styled lines: consecutive lines with the same style
+        (Heading for spans larger than 14pt, normal otherwise) are joined.
+        Args:
+            blocks (list): The blocks of page.get_text("dict").
+            regions (array, optional): Page region of each block (see layout.page_regions). Lines of a running
+                header or footer are never joined with the body text.
+        Returns:
+            list: (text, style) pairs.
+        """
+        page_content = []
+        current_line = ""
+        current_style = None  # Style tracking variable
+        current_region = None
+
+        for index, block in enumerate(blocks):
+            if regions is not None and regions[index] != current_region:
+                current_region = regions[index]
+                if current_line:
+                    page_content.append((current_line.strip(), current_style))
+                current_line, current_style = "", None
+            if "lines" in block:
+                for line in block["lines"]:
+                    line_text = ""
+                    line_style = None
+
+                    for span in line["spans"]:
+                        font_size = span["size"]
+                        text = span["text"].strip()
+                        style = "Heading" if font_size > 14 else "normal"
+
+                        line_text += " " + text if line_text else text
+                        line_style = line_style or style
+
+                    # Continuously merge text or start new line based on style consistency
+                    if current_line and line_style == current_style:
+                        current_line += " " + line_text
+                    else:
+                        if current_line:  # Finish the current line and start a new one
+                            page_content.append((current_line.strip(), current_style))
+                        current_line = line_text
+                        current_style = line_style
+
+        # Ensure the last line of the page is added
+        if current_line:
+            page_content.append((current_line.strip(), current_style))
+        return page_content
+
+    def _extract_docx_text(self, docx_path):
         """
         Extracts text from a DOCX file and returns a list of dictionaries,
         each containing the text and its associated style if it has one.
+        word/document.xml is parsed incrementally and style ids are resolved through a map built once from
+        styles.xml, so large documents are read with bounded memory. The records match python-docx's
+        paragraph.text and paragraph.style.name.
         Args:
-            doc (Document): The loaded DOCX file object from python-docx.
+            docx_path (str | bytes): The file path to the DOCX document, or its in-memory content.
 
         Returns:
-            list: A list of dictionaries with keys 'text' and 'style' representing each paragraph's content and style name.
+            TextColumns: Each paragraph's text and style name; reads like a list of {"text", "style"} dictionaries.
         """
-        # List comprehension to iterate over all paragraphs in the document,
-        # clean the text, and collect text and style name if the paragraph is not empty.
-        return [
-            {"text": clean_text(paragraph.text), "style": paragraph.style.name if paragraph.style else "Normal"}
-            for paragraph in doc.paragraphs if paragraph.text.strip()
-        ]
+        text_data = TextColumns(page_key=None)
+        for text, style in iter_docx_paragraphs(docx_path):
+            if text.strip():
+                text_data.add_line(clean_text(text), style)
+        return text_data
 
-    def _extract_pptx_text(self, presentation):
+    def _extract_pptx_text(self, slides):
         """
         Extracts text from a PPTX file and compiles it into a structured list, considering text frames within shapes on each slide.
         This function also handles basic text styling by identifying headings based on bolding and font size.
 
         Args:
-            presentation (Presentation): The loaded PPTX file object from python-pptx.
+            slides (list): (slide number, slide dict) pairs parsed from the slide XML.
 
         Returns:
-            list: A list of dictionaries, each containing slide number and content,
-                which includes cleaned text and styles.
-        """
-        text_data = []
-
-        # Loop through each slide in the presentation
-        for slide_num, slide in enumerate(presentation.slides):
-            slide_content = []
-
-            # Check each shape in the slide; focus on those with text frames
-            for shape in slide.shapes:
-                if shape.has_text_frame:
-                    for paragraph in shape.text_frame.paragraphs:
-                        paragraph_text = ""
-                        style = "normal"  # Default style
-
-                        # Concatenate all runs in the paragraph to form the full text
-                        for run in paragraph.runs:
-                            paragraph_text += run.text
-
-                            # Determine style by checking if the text is bold or font size is significantly large
-                            if run.font.bold or (run.font.size and run.font.size > 200000):
-                                style = "Heading"
-
-                        # Clean text and filter out any paragraph that consists only of whitespace
-                        cleaned_text = clean_text(paragraph_text)
-                        if cleaned_text:
-                            slide_content.append({
-                                "text": cleaned_text,
-                                "style": style
-                            })
+            TextColumns: The cleaned text and styles of each slide with content; reads like a list of
+                {"slide_number", "content"} dictionaries.
+        """
+        text_data = TextColumns("slide_number")
+
+        for slide_num, slide in slides:
+            # Clean text and filter out any paragraph that consists only of whitespace
+            slide_content = [
+                (clean_text(paragraph_text), style)
+                for paragraph_text, style in slide["text"] if clean_text(paragraph_text)
+            ]
 
             # Only include slides that contain content to avoid empty entries
             if slide_content:
-                text_data.append({
-                    "slide_number": slide_num + 1,
-                    "content": slide_content
-                })
+                text_data.add_page(slide_num, slide_content)
 
+        if self.boilerplate:
+            return text_data.deduplicate_boilerplate(drop=self.boilerplate == "drop")
         return text_data
 
-    def extract_links(self):
+    def extract_fonts(self, pages=None):
+        """
+        Extracts span-level font metadata: the font name, size, style flags, colour and (for PDF) bounding box
+        of every text span or run, as NumPy columns. PDF spans come from the same get_text("dict") call as the
+        text stage. DOCX runs resolve document defaults, paragraph and character styles and direct formatting;
+        PPTX runs only carry their direct formatting (placeholder, layout and master inheritance is not followed).
+        Args:
+            pages (str | range | iterable | PageSelection, optional): PDF pages or PPTX slides to extract,
+                e.g. "1-20". Defaults to the selection given to the constructor.
+        Returns:
+            SpanColumns: One entry per span, for vectorized queries such as all 18pt bold spans.
+        """
+        self._select(pages)
+        if isinstance(self.loader, PDFLoader):
+            for _ in self._pdf_pages("fonts"):
+                pass
+            return self._pdf_spans
+        spans = SpanColumns()
+        if isinstance(self.loader, DOCXLoader):
+            self.loader.check_file(self.source)
+            for paragraph, text, font, size, flags, color in iter_docx_runs(self.source):
+                spans.add(0, paragraph, 0, text, font, size, flags, color)
+        elif isinstance(self.loader, PPTLoader):
+            for slide_num, slide in self._pptx_slides(spans=True):
+                for paragraph, text, font, size, flags, color in slide["spans"]:
+                    spans.add(slide_num, paragraph, 0, text, font, size, flags, color)
+        return spans
+
+    def _add_pdf_spans(self, page_number, blocks):
+        """
+        Adds the spans of a page's get_text("dict") blocks to self._pdf_spans.
+        """
+        for block_index, block in enumerate(blocks):
+            for line_index, line in enumerate(block.get("lines", ())):
+                for span in line["spans"]:
+                    self._pdf_spans.add(page_number, block_index, line_index, span["text"], span["font"],
+                                        span["size"], span["flags"], span["color"], span["bbox"])
+
+    def extract_links(self, pages=None):
         """
         Extracts hyperlinks from the currently loaded file using the appropriate loader.
         Determines the file type from the loader instance and calls the corresponding method
         to handle hyperlink extraction specific to each file type.
 
+        Args:
+            pages (str | range | iterable | PageSelection, optional): PDF pages or PPTX slides to extract,
+                e.g. "1-20". Defaults to the selection given to the constructor.
+
         Returns:
             list: A list of dictionaries, each containing metadata about the hyperlinks found.
         """
-        loaded_file = self.loader.open_file(self.loader.filepath)
-
+        self._select(pages)
+        if isinstance(self.loader, PPTLoader):
+            return self._extract_pptx_links(self._pptx_slides())
         if isinstance(self.loader, PDFLoader):
-            return self._extract_pdf_links(loaded_file)
-        elif isinstance(self.loader, DOCXLoader):
+            self.loader.check_file(self.source)
+            return self._extract_pdf_links(self._pdf_pages("links"))
+
+        loaded_file = self.loader.open_file(self.source)
+
+        if isinstance(self.loader, DOCXLoader):
             return self._extract_docx_links(loaded_file)
-        elif isinstance(self.loader, PPTLoader):
-            return self._extract_pptx_links(loaded_file)
 
-    def _extract_pdf_links(self, pdf_reader):
+    def _extract_pdf_links(self, pages):
         """
         Extracts hyperlinks from a PDF file using annotations, which are often used to store hyperlink data.
         Args:
-            pdf_reader (fitz.Document): The loaded PDF document.
+            pages (iterable): Per-page content from the single PDF page pass.
 
         Returns:
             list: A list of dictionaries where each dictionary contains the page number and the hyperlink URL.
         """
         links_data = []
-        for page_num, page in enumerate(pdf_reader.pages):
-            annotations = page.get('/Annots')  # Retrieve annotations from the page
-            if annotations:
-                for annotation in annotations:
-                    # Attempt to retrieve the hyperlink URI from the annotation
-                    uri = annotation.get_object().get('/A').get('/URI')
-                    if uri:
-                        links_data.append({
-                            "page_number": page_num + 1,  # Page numbers are indexed from 1 for user clarity
-                            "link": uri
-                        })
+        for page in pages:
+            # Page numbers are indexed from 1 for user clarity
+            self._add_batch("links", links_data, [{"page_number": page["page_number"], "link": uri} for uri in page["links"]])
         return links_data
 
     def _extract_docx_links(self, doc):
@@ -226,273 +521,325 @@ class DataExtractor:
 
         return links_data
 
-    def _extract_pptx_links(self, presentation):
+    def _extract_pptx_links(self, slides):
         """
         Extracts hyperlinks from a PPTX file, capturing both the linked text and the hyperlink address.
         Args:
-            presentation (Presentation): The loaded PPTX file object from python-pptx.
+            slides (list): (slide number, slide dict) pairs parsed from the slide XML.
 
         Returns:
             list: A list of dictionaries, each containing the slide number, linked text, and the hyperlink URL.
         """
         links_data = []  # Initialize the list to hold link data.
-
-        # Iterate over all slides in the presentation.
-        for slide_num, slide in enumerate(presentation.slides):
-            # Iterate over all shapes in the slide that have a text frame.
-            for shape in slide.shapes:
-                if shape.has_text_frame:
-                    # Check each paragraph in the text frame.
-                    for paragraph in shape.text_frame.paragraphs:
-                        linked_text = ""
-                        link = None
-
-                        # Check each run in the paragraph for hyperlinks.
-                        for run in paragraph.runs:
-                            if run.hyperlink and run.hyperlink.address:
-                                # Assign the first hyperlink address found and accumulate the text associated with the hyperlink.
-                                link = link or run.hyperlink.address
-                                linked_text += run.text
-
-                        # If a hyperlink was found and has associated text, store it, ensuring no duplicate entries.
-                        if link and linked_text and not any(d['link'] == link and d['linked_text'] == clean_text(linked_text) for d in links_data):
-                            links_data.append({
-                                "slide_number": slide_num + 1,  # 1-based index for user clarity.
-                                "linked_text": clean_text(linked_text),  # Cleaned text to ensure consistency.
-                                "link": link
-                            })
+        seen = set()  # (link, text) pairs already stored, so each duplicate check is constant time.
+
+        for slide_num, slide in slides:
+            for linked_text, link in slide["links"]:
+                linked_text = clean_text(linked_text)  # Cleaned text to ensure consistency.
+                # Store each hyperlink once, ensuring no duplicate entries.
+                if (link, linked_text) not in seen:
+                    seen.add((link, linked_text))
+                    links_data.append({
+                        "slide_number": slide_num,
+                        "linked_text": linked_text,
+                        "link": link
+                    })
 
         return links_data
 
-    def extract_images(self):
+    def extract_images(self, pages=None):
         """
         Extract images based on the file type of the loaded document. Determines the type of loader and
         delegates to the appropriate image extraction method.
+        Args:
+            pages (str | range | iterable | PageSelection, optional): PDF pages or PPTX slides to extract,
+                e.g. "1-20". Defaults to the selection given to the constructor.
         """
-        loaded_file = self.loader.open_file(self.loader.filepath)  # Load the file using the appropriate loader
+        self._select(pages)
+        if isinstance(self.loader, PPTLoader):
+            return self._extract_pptx_images(self._pptx_slides())  # Extract images from PPTX
+        self.loader.check_file(self.source)
         if isinstance(self.loader, PDFLoader):
-            return self._extract_pdf_images(self.loader.filepath)  # Extract images from PDF
+            return self._extract_pdf_images(self._pdf_pages("images"))  # Extract images from PDF
         elif isinstance(self.loader, DOCXLoader):
-            return self._extract_docx_images(loaded_file)  # Extract images from DOCX
-        elif isinstance(self.loader, PPTLoader):
-            return self._extract_pptx_images(loaded_file)  # Extract images from PPTX
+            return self._extract_docx_images(self.source)  # Stream images from the DOCX package
 
-    def _extract_pdf_images(self, pdf_path):
+    def _extract_pdf_images(self, pages):
         """
-        Extracts all images from a PDF file and saves them locally.
+        Collects the images saved from a PDF file by the single page pass.
         Args:
-            pdf_path (str): The file path to the PDF document.
+            pages (iterable): Per-page content from the single PDF page pass.
 
         Returns:
             list: A list of dictionaries containing details about each extracted image.
         """
         images_data = []
-        doc = fitz.open(pdf_path)  # Open the PDF document using PyMuPDF
-        pdf_images_folder = os.path.join("output", "images", "pdf")  # Define the directory to store images
-        os.makedirs(pdf_images_folder, exist_ok=True)  # Ensure the directory exists
+        for page in pages:
+            self._add_batch("images", images_data, page["images"])
+        return images_data
 
-        for page_num, page in enumerate(doc.pages()):  # Iterate through each page in the PDF
-            for image_index, image in enumerate(page.get_images(full=True)):  # Get all images from the page
-                xref = image[0]  # Reference number for the image
-                base_image = doc.extract_image(xref)  # Extract the image using its reference
-                image_filename = f"pdf_image_{page_num+1}_{image_index+1}.{base_image['ext']}"  # Create a filename
-                image_path = os.path.join(pdf_images_folder, image_filename)  # Create a full path for the image
+    def _save_pdf_images(self, doc, page, page_number):
+        """
+        Saves the images of one PDF page locally, reading their streams from the document the page pass has open.
+        Args:
+            doc (fitz.Document): The open document.
+            page (fitz.Page): The page being read.
+            page_number (int): Its 1-based number.
 
-                with open(image_path, "wb") as image_file:  # Write the image file to disk
-                    image_file.write(base_image["image"])  # Save the image data
+        Returns:
+            list: A list of dictionaries containing details about each image on the page.
+        """
+        pdf_images_folder = os.path.join(self.output_dir, "images", "pdf")  # Define the directory to store images
+        os.makedirs(pdf_images_folder, exist_ok=True)  # Ensure the directory exists
 
-                # Append image details to the list
-                images_data.append({
-                    "page_number": page_num + 1,
-                    "image_filename": image_filename,
-                    "image_format": base_image["ext"],
-                    "image_path": image_path
-                })
+        page_images = []
+        for image_index, image in enumerate(page.get_images(full=True)):
+            base_image = doc.extract_image(image[0])  # Extract the image using its reference
+            image_filename = f"pdf_image_{page_number}_{image_index+1}.{base_image['ext']}"  # Create a filename
+            image_path = os.path.join(pdf_images_folder, image_filename)  # Create a full path for the image
 
-        return images_data
+            with AtomicFile(image_path) as image_file:  # Write the image file to disk
+                image_file.write(base_image["image"])  # Save the image data
 
-    def _extract_docx_images(self, doc):
+            # Append image details to the page's list
+            page_images.append({
+                "page_number": page_number,
+                "image_filename": image_filename,
+                "image_format": base_image["ext"],
+                "image_path": image_path
+            })
+        return page_images
+
+    def _extract_docx_images(self, docx_path):
         """
         Extract images from a DOCX file and save them to a specified directory.
+        Inline and floating (anchored) pictures are found by streaming word/document.xml and mapped to their
+        media members through the document relationships; each member is then copied from the ZIP in chunks,
+        so memory use does not depend on image size.
         Args:
-            doc (Document): The loaded DOCX document object.
+            docx_path (str | bytes): The file path to the DOCX document, or its in-memory content.
 
         Returns:
             list: A list of dictionaries, each containing metadata about the extracted images.
         """
         images_data = []
-        docx_images_folder = os.path.join("output", "images", "docx")
+        docx_images_folder = os.path.join(self.output_dir, "images", "docx")
         os.makedirs(docx_images_folder, exist_ok=True)  # Ensure the output directory exists
 
-        # Iterate through all inline shapes in the document that are images
-        for i, shape in enumerate(doc.inline_shapes):
-            # Access the binary data of the image
-            image_part = doc.part.related_parts[shape._inline.graphic.graphicData.pic.blipFill.blip.embed]
-            image_filename = f"docx_image_{i+1}.{image_part.content_type.split('/')[-1]}"  # Construct filename
-            image_path = os.path.join(docx_images_folder, image_filename)  # Construct file path
+        with open_package(docx_path) as package:
+            for i, (paragraph_number, image_part) in enumerate(iter_docx_images(package)):
+                image_format = (content_type(package, image_part) or "").split('/')[-1] \
+                    or os.path.splitext(image_part)[1].lstrip(".")
+                image_filename = f"docx_image_{i+1}.{image_format}"  # Construct filename
+                image_path = os.path.join(docx_images_folder, image_filename)  # Construct file path
 
-            # Write the image file to the disk
-            with open(image_path, "wb") as image_file:
-                image_file.write(image_part.blob)
+                # Copy the image member straight from the ZIP to the disk
+                with AtomicFile(image_path) as image_file:
+                    copy_part(package, image_part, image_file)
 
-            # Append image details to the list for later use or reference
-            images_data.append({
-                "image_filename": image_filename,
-                "image_format": image_part.content_type.split('/')[-1],
-                "image_path": image_path
-            })
+                # Append image details to the list for later use or reference
+                images_data.append({
+                    "paragraph_number": paragraph_number,
+                    "image_filename": image_filename,
+                    "image_format": image_format,
+                    "image_path": image_path
+                })
         return images_data
 
-    def _extract_pptx_images(self, presentation):
+    def _extract_pptx_images(self, slides):
         """
         Extract images from a PPTX file, specifically from slides that contain image shapes.
+        Image parts are copied out of the ZIP in chunks; only their first bytes are read to name the file.
         Args:
-            presentation (Presentation): The loaded PPTX file object.
+            slides (list): (slide number, slide dict) pairs parsed from the slide XML.
 
         Returns:
             list: A list of dictionaries detailing the images extracted from each slide.
         """
         images_data = []
-        pptx_images_folder = os.path.join("output", "images", "pptx")
+        pptx_images_folder = os.path.join(self.output_dir, "images", "pptx")
         os.makedirs(pptx_images_folder, exist_ok=True)  # Ensure the output directory exists
 
-        # Iterate through each slide and its shapes to find images
-        for slide_num, slide in enumerate(presentation.slides):
-            for shape in slide.shapes:
-                if shape.shape_type == 13:  # Picture type in PowerPoint
-                    image = shape.image
-                    image_filename = f"pptx_image_{slide_num+1}_{shape.shape_id}.{image.ext}"  # Construct filename
+        with open_package(self.source) as package:
+            for slide_num, slide in slides:
+                for shape_id, image_part in slide["pictures"]:
+                    image_ext = image_extension(read_part_header(package, image_part), image_part)
+                    image_filename = f"pptx_image_{slide_num}_{shape_id}.{image_ext}"  # Construct filename
                     image_path = os.path.join(pptx_images_folder, image_filename)  # Construct file path
 
-                    # Write the image file to the disk
-                    with open(image_path, "wb") as image_file:
-                        image_file.write(image.blob)
+                    # Copy the image member straight from the ZIP to the disk
+                    with AtomicFile(image_path) as image_file:
+                        copy_part(package, image_part, image_file)
 
                     # Append image details to the list for later use or reference
                     images_data.append({
-                        "slide_number": slide_num + 1,
+                        "slide_number": slide_num,
                         "image_filename": image_filename,
-                        "image_format": image.ext,
+                        "image_format": image_ext,
                         "image_path": image_path
                     })
         return images_data
 
-    def extract_tables(self):
+    def extract_tables(self, pages=None):
         """
         Extract tables based on the file type of the loaded document. Determines the type of loader and
         delegates to the appropriate table extraction method.
+        Args:
+            pages (str | range | iterable | PageSelection, optional): PDF pages or PPTX slides to extract,
+                e.g. "1-20". Defaults to the selection given to the constructor.
         """
-        loaded_file = self.loader.open_file(self.loader.filepath)  # Load the file using the appropriate loader
+        self._select(pages)
+        if isinstance(self.loader, PPTLoader):
+            return self._extract_pptx_tables(self._pptx_slides())  # Extract tables from PPTX
+        self.loader.check_file(self.source)
         if isinstance(self.loader, PDFLoader):
-            return self._extract_pdf_tables(self.loader.filepath)  # Extract tables from PDF
+            return self._extract_pdf_tables(self.source)  # Extract tables from PDF
         elif isinstance(self.loader, DOCXLoader):
-            return self._extract_docx_tables(loaded_file)  # Extract tables from DOCX
-        elif isinstance(self.loader, PPTLoader):
-            return self._extract_pptx_tables(loaded_file)  # Extract tables from PPTX
+            return self._extract_docx_tables(self.source)  # Stream tables from the DOCX package
 
     def _extract_pdf_tables(self, pdf_path):
         """
         Extracts tables from a PDF file, processes them page by page, and saves them as CSV files.
         Each table extracted is saved into a separate CSV file named distinctly by page and table index.
+        Memory stays bounded on long documents: each page's parsed layout objects are released as soon as its
+        tables are written, and the document is reopened every table_reopen_pages pages or whenever resident
+        memory exceeds table_max_rss.
 
         Args:
-            pdf_path (str): The file path to the PDF document.
+            pdf_path (str | bytes): The file path to the PDF document, or its in-memory content.
 
         Returns:
             list: A list of dictionaries containing metadata about the extracted tables and their CSV file paths.
         """
         tables_data = []  # List to store metadata about the extracted tables
-        pdf_tables_folder = os.path.join("output", "tables", "pdf")  # Define the directory to store CSV files
+        pdf_tables_folder = os.path.join(self.output_dir, "tables", "pdf")  # Define the directory to store CSV files
         os.makedirs(pdf_tables_folder, exist_ok=True)  # Ensure the directory exists
 
-        with pdfplumber.open(pdf_path) as pdf:  # Open the PDF with pdfplumber
-            for page_num, page in enumerate(pdf.pages):  # Iterate through each page in the PDF
-                tables = page.extract_tables()  # Extract all tables found on the current page
-                for table_index, table in enumerate(tables):  # Iterate through each table
-                    csv_filename = f"pdf_table_{page_num+1}_{table_index+1}.csv"  # Create a unique filename for the CSV
-                    csv_path = os.path.join(pdf_tables_folder, csv_filename)  # Create the full path for the CSV file
-
-                    # Write the table data to a CSV file
-                    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerows(table)  # Write each row of the table to the CSV file
-
-                    # Store metadata about the table in the list
-                    tables_data.append({
-                        "page_number": page_num + 1,  # Page number (1-indexed for readability)
-                        "table_index": table_index + 1,  # Table index (1-indexed for readability)
-                        "csv_filename": csv_filename,
-                        "csv_path": csv_path
-                    })
-
+        bounded = self.pages is not None or self.table_reopen_pages or self.table_max_rss
+        remaining = self._page_numbers(self.count_pages()) if bounded else None
+        while remaining is None or remaining:
+            window = remaining if remaining is None or not self.table_reopen_pages \
+                else remaining[:self.table_reopen_pages]
+            # pdfplumber only builds the pages of the window; it tests every page for `in`, so a set keeps that O(1)
+            with pdfplumber.open(open_stream(pdf_path), pages=window and set(window)) as pdf:
+                done, exceeded = self._extract_pdf_page_tables(pdf, pdf_tables_folder, tables_data)
+            if remaining is None:
+                break
+            remaining = remaining[done:]
+            if exceeded and remaining:
+                gc.collect()  # The closed document's objects are unreachable now
+                if _rss_mb() > self.table_max_rss:
+                    raise MemoryError(f"Table extraction uses {_rss_mb():.0f} MB after reopening the document, "
+                                      f"above the {self.table_max_rss} MB ceiling")
         return tables_data
 
-    def _extract_docx_tables(self, doc):
+    def _extract_pdf_page_tables(self, pdf, pdf_tables_folder, tables_data):
+        """
+        Extracts the tables of the pages an open pdfplumber document holds, releasing every page after use.
+        Returns:
+            tuple: (pages processed, whether processing stopped because resident memory exceeded table_max_rss).
+        """
+        for done, page in enumerate(pdf.pages, start=1):
+            page_num = page.page_number - 1
+            try:
+                tables = page.extract_tables()  # Extract all tables found on the current page
+            finally:
+                page.close()  # Drop the page's cached characters, layout objects and text map
+            page_tables = []
+            for table_index, table in enumerate(tables):  # Iterate through each table
+                csv_filename = f"pdf_table_{page_num+1}_{table_index+1}.csv"  # Create a unique filename for the CSV
+                csv_path = os.path.join(pdf_tables_folder, csv_filename)  # Create the full path for the CSV file
+
+                # Write the table data to a CSV file
+                with AtomicFile(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerows(table)  # Write each row of the table to the CSV file
+
+                # Store metadata about the table in the page's list
+                page_tables.append({
+                    "page_number": page_num + 1,  # Page number (1-indexed for readability)
+                    "table_index": table_index + 1,  # Table index (1-indexed for readability)
+                    "csv_filename": csv_filename,
+                    "csv_path": csv_path
+                })
+            self._add_batch("tables", tables_data, page_tables)
+            self._page_done(page_num + 1)
+            if self.table_max_rss and _rss_mb() > self.table_max_rss:
+                return done, True  # Reopen the document before going on
+        return len(pdf.pages), False
+
+    def _extract_docx_tables(self, docx_path):
         """
         Extracts tables from a DOCX file and saves them as CSV files in a specified directory.
         Each table is saved into a separate CSV file named uniquely based on its index in the document.
-        
+        Rows are read straight from word/document.xml, resolving merged cells (gridSpan/vMerge) in a single pass,
+        and written to the CSV as they are read. Tables nested inside cells get their own CSV file.
+
         Args:
-            doc (Document): The loaded DOCX document object from python-docx.
+            docx_path (str | bytes): The file path to the DOCX document, or its in-memory content.
 
         Returns:
             list: A list of dictionaries containing metadata about the extracted tables and their CSV file paths.
         """
         tables_data = []  # Initialize a list to hold metadata about each extracted table
-        docx_tables_folder = os.path.join("output", "tables", "docx")  # Define the directory to store CSV files
+        docx_tables_folder = os.path.join(self.output_dir, "tables", "docx")  # Define the directory to store CSV files
         os.makedirs(docx_tables_folder, exist_ok=True)  # Ensure the directory exists
 
-        # Iterate over each table in the document
-        for table_index, table in enumerate(doc.tables):
-            csv_filename = f"docx_table_{table_index+1}.csv"  # Construct a unique filename for the CSV
-            csv_path = os.path.join(docx_tables_folder, csv_filename)  # Create the full path for the CSV file
-
-            # Open a new CSV file and write the table data
-            with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows([[cell.text for cell in row.cells] for row in table.rows])  # Convert table rows to CSV
-
-            # Append metadata about the table to the list
-            tables_data.append({
-                "table_index": table_index + 1,  # Index is 1-based for user clarity
-                "csv_filename": csv_filename,
-                "csv_path": csv_path
-            })
+        writers = {}  # Table index -> (atomic CSV file, writer) for the tables currently being read
+        with open_package(docx_path) as package:
+            try:
+                for event, table_index, value in iter_docx_tables(package):
+                    if event == "row":
+                        writers[table_index][1].writerow(value)
+                    elif event == "start":
+                        csv_filename = f"docx_table_{table_index}.csv"  # Construct a unique filename for the CSV
+                        csv_path = os.path.join(docx_tables_folder, csv_filename)  # Create the full path for the CSV file
+                        csvfile = AtomicFile(csv_path, 'w', newline='', encoding='utf-8')
+                        writers[table_index] = (csvfile, csv.writer(csvfile.file))
+
+                        # Append metadata about the table to the list
+                        tables_data.append({
+                            "table_index": table_index,  # Index is 1-based for user clarity
+                            "parent_table": value,  # Index of the enclosing table for nested tables
+                            "csv_filename": csv_filename,
+                            "csv_path": csv_path
+                        })
+                    else:
+                        writers.pop(table_index)[0].commit()
+            finally:
+                for csvfile, _ in writers.values():
+                    csvfile.discard()  # Only reached if reading the document failed part-way
         return tables_data
 
-    def _extract_pptx_tables(self, presentation):
+    def _extract_pptx_tables(self, slides):
         """
         Extracts tables from a PPTX file and saves them as CSV files in a specified directory.
         Each table is saved into a separate CSV file named uniquely based on its slide number and shape ID.
 
         Args:
-            presentation (Presentation): The loaded PPTX presentation object from python-pptx.
+            slides (list): (slide number, slide dict) pairs parsed from the slide XML.
 
         Returns:
             list: A list of dictionaries detailing the tables extracted from each slide, including CSV file paths.
         """
         tables_data = []  # Initialize a list to hold metadata about each extracted table
-        pptx_tables_folder = os.path.join("output", "tables", "pptx")  # Define the directory to store CSV files
+        pptx_tables_folder = os.path.join(self.output_dir, "tables", "pptx")  # Define the directory to store CSV files
         os.makedirs(pptx_tables_folder, exist_ok=True)  # Ensure the directory exists
 
-        # Iterate through each slide in the presentation
-        for slide_num, slide in enumerate(presentation.slides):
-            # Check each shape on the slide for a table
-            for shape in slide.shapes:
-                if shape.has_table:
-                    table = shape.table  # Get the table object
-                    csv_filename = f"pptx_table_{slide_num+1}_{shape.shape_id}.csv"  # Construct a unique filename for the CSV
-                    csv_path = os.path.join(pptx_tables_folder, csv_filename)  # Create the full path for the CSV file
-
-                    # Open a new CSV file and write the table data
-                    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerows([[cell.text for cell in row.cells] for row in table.rows])  # Convert table rows to CSV
-
-                    # Append metadata about the table to the list
-                    tables_data.append({
-                        "slide_number": slide_num + 1,  # Slide number is 1-based for user clarity
-                        "csv_filename": csv_filename,
-                        "csv_path": csv_path
-                    })
-        return tables_data
\ No newline at end of file
+        for slide_num, slide in slides:
+            for shape_id, rows in slide["tables"]:
+                csv_filename = f"pptx_table_{slide_num}_{shape_id}.csv"  # Construct a unique filename for the CSV
+                csv_path = os.path.join(pptx_tables_folder, csv_filename)  # Create the full path for the CSV file
+
+                # Open a new CSV file and write the table data
+                with AtomicFile(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerows(rows)
+
+                # Append metadata about the table to the list
+                tables_data.append({
+                    "slide_number": slide_num,  # Slide number is 1-based for user clarity
+                    "csv_filename": csv_filename,
+                    "csv_path": csv_path
+                })
+        return tables_data
@@ -0,0 +1,431 @@
+import os
+import sys
+import asyncio
+import argparse
+import contextlib
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit, parse_qs
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_extractor1 import DEFAULT_STAGES, LOADERS, STAGES, PageSelection, detect_format
+from pipeline import Pipeline
+from extraction_watchdog import ExtractionTimeout, ExtractionWatchdog
+from Storage.serializers import dumps
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout"
+}
+
+_watchdog = None  # The pool worker's ExtractionWatchdog when jobs have a time limit
+
+
+def _warm_worker(job_timeout=None):
+    """
+    Pool initializer: makes sure the extraction stack is imported once per worker process (also under the
+    spawn start method) so that requests never pay for importing PyMuPDF, pdfplumber, python-docx and python-pptx.
+    With a job_timeout, the worker extracts through its own watchdog, whose warm child process is killed and
+    replaced when a document runs over time, so a stuck document never holds the pool worker.
+    """
+    global _watchdog
+    import data_extractor1  # noqa: F401
+    if job_timeout:
+        _watchdog = ExtractionWatchdog(document_timeout=job_timeout)
+
+
+def _noop():
+    """Does nothing; submitted at startup to force the pool to spawn its workers."""
+    return os.getpid()
+
+
+def extract_document(data, file_format, stages, pages=None):
+    """
+    Runs the requested extraction stages on an in-memory document. Executed inside a pool worker.
+    Args:
+        data (bytes): The uploaded document content.
+        file_format (str): One of 'pdf', 'docx' or 'pptx'.
+        stages (list): Names of the stages to run (keys of STAGES).
+        pages (str, optional): PDF pages or PPTX slides to extract, e.g. "1-20". Defaults to all.
+    Returns:
+        dict: The extracted data keyed by stage name.
+    Raises:
+        ValueError: If the document cannot be read.
+        ExtractionTimeout: If the service's job_timeout ran out.
+    """
+    # Loaders and extractors report progress with print(); keep worker stdout quiet
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            LOADERS[file_format]().check_file(data)  # Reject mislabelled uploads before any stage runs
+            # Concurrent requests get separate folders for their images and tables
+            return Pipeline(stages, per_document=True, pages=pages, watchdog=_watchdog).run(data, file_format)
+        except SystemExit as e:
+            # Loaders stop the process on invalid input; report it as a normal error instead
+            raise ValueError(str(e)) from None
+
+
+class HTTPError(Exception):
+    """Raised while handling a request to send an error response with the given status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ExtractionService:
+    """
+    A long-running asyncio HTTP server that accepts document uploads and extracts them on a warm process pool.
+
+    At most workers + queue_size uploads are admitted at a time, counting those being extracted and those
+    waiting for a worker; beyond that the server answers 503 immediately instead of buffering without limit.
+    A job counts until it has finished, so uploads that arrive together are admitted while workers are free.
+    One dispatcher task per worker moves jobs from the queue into the pool, so at most `workers` documents are
+    being extracted at any time.
+    If a worker dies (a crash in native code, or the OOM killer), the pool is replaced by a fresh, warmed one:
+    only the jobs that were running on the broken pool fail. With a job_timeout, a document that takes longer
+    is stopped and answered with 504.
+
+    Endpoints:
+        POST /extract?format=pdf&stages=text,links[&pages=1-20][&stream=1]  Raw document bytes as the request body.
+        GET  /health                                                         Liveness check.
+        GET  /stats                                                          Queue depth and job counters.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, workers=None, queue_size=32, max_upload_bytes=256 * 1024 * 1024,
+                 job_timeout=None):
+        """
+        Args:
+            host (str): Interface to bind to.
+            port (int): TCP port to listen on (0 picks a free port).
+            workers (int, optional): Number of worker processes. Defaults to the CPU count.
+            queue_size (int): Uploads that may wait for a busy worker before new ones are rejected.
+            max_upload_bytes (int): Largest accepted request body.
+            job_timeout (float, optional): Seconds a document may take before it is stopped. Unlimited when omitted.
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.max_upload_bytes = max_upload_bytes
+        self.job_timeout = job_timeout
+        self.queue = None
+        self.pool = None
+        self.server = None
+        self.dispatchers = []
+        self.in_flight = 0  # Admitted jobs that have not finished yet
+        self._pool_lock = None
+        self.stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0, "timed_out": 0, "pool_restarts": 0}
+
+    async def start(self):
+        """
+        Starts the worker pool, warms it up, and begins listening for connections.
+        """
+        self.queue = asyncio.Queue()  # Bounded by the admission check in submit()
+        self._pool_lock = asyncio.Lock()
+        self.pool = await self._start_pool()
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Extraction service listening on http://{self.host}:{self.port} with {self.workers} workers")
+
+    async def _start_pool(self):
+        """
+        Creates the worker pool and spawns every worker now, so the first requests do not pay the startup cost.
+        Workers come from a fork server: forked straight from the event loop, a replacement pool would inherit
+        the open client sockets, and those connections would never see their end of stream.
+        """
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver"),
+                                   initializer=_warm_worker, initargs=(self.job_timeout,))
+        await asyncio.gather(*(loop.run_in_executor(pool, _noop) for _ in range(self.workers)))
+        return pool
+
+    async def _replace_pool(self, broken):
+        """
+        Shuts down a pool that lost a worker and starts a new one. Dispatchers that saw the same pool break
+        share the replacement.
+        Returns:
+            ProcessPoolExecutor: The current pool.
+        """
+        async with self._pool_lock:
+            if self.pool is broken:
+                print("Extraction worker died; restarting the worker pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = await self._start_pool()
+                self.stats["pool_restarts"] += 1
+            return self.pool
+
+    async def stop(self):
+        """
+        Stops accepting connections, cancels the dispatchers and shuts the worker pool down.
+        """
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        """
+        Starts the service and serves until cancelled.
+        """
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _dispatch(self):
+        """
+        Moves queued jobs into the process pool one at a time and resolves each job's future with its result.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            data, file_format, stages, pages, future = await self.queue.get()
+            pool = self.pool
+            try:
+                try:
+                    running = loop.run_in_executor(pool, extract_document, data, file_format, stages, pages)
+                except BrokenProcessPool:
+                    # A worker died after an earlier job; this one has not started, so it runs on the new pool
+                    pool = await self._replace_pool(pool)
+                    running = loop.run_in_executor(pool, extract_document, data, file_format, stages, pages)
+                result = await running
+                self.stats["completed"] += 1
+                if not future.done():
+                    future.set_result(result)
+            except BrokenProcessPool:
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(RuntimeError("the extraction worker died"))
+                await self._replace_pool(pool)
+            except ExtractionTimeout as e:
+                self.stats["timed_out"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            except Exception as e:
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                if not future.done():
+                    future.cancel()  # The service is shutting down
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    def submit(self, data, file_format, stages, pages=None):
+        """
+        Queues a document for extraction without waiting.
+        Args:
+            data (bytes): The document content.
+            file_format (str): One of 'pdf', 'docx' or 'pptx'.
+            stages (list): Names of the stages to run.
+            pages (str, optional): PDF pages or PPTX slides to extract, e.g. "1-20".
+        Returns:
+            asyncio.Future: Resolves to the extraction result.
+        Raises:
+            HTTPError: With status 503 if workers + queue_size jobs are already admitted.
+        """
+        if self.in_flight >= self.workers + self.queue_size:
+            self.stats["rejected"] += 1
+            raise HTTPError(503, "Extraction queue is full, retry later")
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((data, file_format, stages, pages, future))
+        self.in_flight += 1
+        self.stats["accepted"] += 1
+        return future
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serves HTTP/1.1 requests on one connection until the client closes it or asks for Connection: close.
+        """
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                keep_alive = request["headers"].get("connection", "").lower() != "close"
+                try:
+                    await self._route(request, writer, keep_alive)
+                except HTTPError as e:
+                    headers = {"Retry-After": "1"} if e.status == 503 else None
+                    await self._send_json(writer, e.status, {"error": e.message}, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader):
+        """
+        Reads one request (request line, headers and Content-Length body) from the stream.
+        Returns:
+            dict | None: The parsed request, or None if the client closed the connection.
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        body = b""
+        if method == "POST":
+            if "content-length" not in headers:
+                raise HTTPError(411, "Content-Length is required")
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                raise HTTPError(400, "Invalid Content-Length")
+            if length < 0:
+                raise HTTPError(400, "Invalid Content-Length")
+            if length > self.max_upload_bytes:
+                raise HTTPError(413, f"Upload exceeds {self.max_upload_bytes} bytes")
+            body = await reader.readexactly(length)
+
+        url = urlsplit(target)
+        return {"method": method, "path": url.path, "query": parse_qs(url.query), "headers": headers, "body": body}
+
+    async def _route(self, request, writer, keep_alive):
+        """
+        Dispatches a parsed request to the matching endpoint.
+        """
+        path, method = request["path"], request["method"]
+        if path == "/health":
+            await self._send_json(writer, 200, {"status": "ok"}, keep_alive)
+        elif path == "/stats":
+            stats = dict(self.stats, queued=self.queue.qsize(), in_flight=self.in_flight, queue_size=self.queue_size,
+                         workers=self.workers)
+            await self._send_json(writer, 200, stats, keep_alive)
+        elif path == "/extract":
+            if method != "POST":
+                raise HTTPError(405, "Use POST to upload a document")
+            await self._extract(request, writer, keep_alive)
+        else:
+            raise HTTPError(404, f"No such endpoint: {path}")
+
+    async def _extract(self, request, writer, keep_alive):
+        """
+        Handles POST /extract: validates the parameters, queues the upload and sends the result
+        either as one JSON document or, with stream=1 (or Accept: application/x-ndjson), as NDJSON.
+        """
+        query = request["query"]
+        file_format = query.get("format", [None])[0] or detect_format(query.get("filename", [""])[0])
+        if file_format not in ("pdf", "docx", "pptx"):
+            raise HTTPError(400, "Pass format=pdf|docx|pptx or a filename with a supported extension")
+        stages = query.get("stages", [",".join(DEFAULT_STAGES)])[0].split(",")
+        unknown = [stage for stage in stages if stage not in STAGES]
+        if unknown:
+            raise HTTPError(400, f"Unknown stages: {', '.join(unknown)}")
+        pages = query.get("pages", [None])[0]
+        try:
+            pages = pages and str(PageSelection(pages))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        if not request["body"]:
+            raise HTTPError(400, "Request body is empty")
+
+        stream = query.get("stream", ["0"])[0] == "1" or "application/x-ndjson" in request["headers"].get("accept", "")
+        future = self.submit(request["body"], file_format, stages, pages)
+
+        try:
+            result = await future
+        except ValueError as e:
+            raise HTTPError(422, str(e))
+        except ExtractionTimeout as e:
+            raise HTTPError(504, f"Extraction stopped: {e}")
+        except Exception as e:
+            raise HTTPError(500, f"Extraction failed: {e}")
+
+        if stream:
+            await self._send_ndjson(writer, result, keep_alive)
+        else:
+            await self._send_json(writer, 200, result, keep_alive)
+
+    async def _send_json(self, writer, status, payload, keep_alive=True, extra_headers=None):
+        """
+        Writes a complete JSON response.
+        """
+        body = dumps(payload)
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        headers.update(extra_headers or {})
+        writer.write(self._head(status, headers, keep_alive) + body)
+        await writer.drain()
+
+    async def _send_ndjson(self, writer, result, keep_alive=True):
+        """
+        Streams a result as newline-delimited JSON with chunked transfer encoding: one line per
+        extracted record, tagged with its stage, followed by a final summary line.
+        """
+        headers = {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked"}
+        writer.write(self._head(200, headers, keep_alive))
+        counts = {}
+        for stage, records in result.items():
+            counts[stage] = len(records)
+            for record in records:
+                line = dumps({"stage": stage, "record": record}) + b"\n"
+                writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+                await writer.drain()  # Respect the client's read rate instead of buffering the whole result
+        summary = dumps({"status": "done", "counts": counts}) + b"\n"
+        writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(summary), summary))
+        await writer.drain()
+
+    @staticmethod
+    def _head(status, headers, keep_alive):
+        """
+        Builds the status line and header block of a response.
+        """
+        headers = dict(headers, Connection="keep-alive" if keep_alive else "close")
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}"] + [f"{k}: {v}" for k, v in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the document extraction HTTP service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind to (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=32, help="Uploads allowed to wait before returning 503")
+    parser.add_argument("--max-upload-mb", type=int, default=256)
+    parser.add_argument("--job-timeout", type=float, help="Seconds a document may take before it is answered with 504")
+    args = parser.parse_args()
+
+    service = ExtractionService(args.host, args.port, args.workers, args.queue_size, args.max_upload_mb * 1024 * 1024,
+                                args.job_timeout)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        print("Extraction service stopped.")
+
+
+if __name__ == "__main__":
+    main()
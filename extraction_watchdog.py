@@ -0,0 +1,190 @@
+import os
+import sys
+import time
+import multiprocessing
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_extractor1 import DataExtractor, LOADERS, STAGES
+
+
+class ExtractionTimeout(TimeoutError):
+    """
+    Raised when a document runs over its page or document time budget. The worker that was extracting it has
+    been killed; what it finished before that is kept.
+    """
+
+    def __init__(self, reason, stage=None, page=None, partial=None):
+        """
+        Args:
+            reason (str): Which budget ran out, and where.
+            stage (str, optional): The stage that was running.
+            page (int, optional): The last page (or slide) that stage finished.
+            partial (list, optional): Records of the running stage from the pages it finished.
+        """
+        super().__init__(reason)
+        self.reason = reason
+        self.stage = stage
+        self.page = page
+        self.partial = partial or []
+        self.results = {}  # Stage -> data stored before the timeout, including the partial stage; set by Pipeline.run()
+
+
+def _extraction_worker(connection):
+    """
+    Worker process: extracts the documents sent over the pipe, one at a time, and reports the start of every
+    stage, every finished page, every page batch and every stage's output back to the watchdog.
+    """
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        file_format, options, stages = job
+        try:
+            extractor = DataExtractor(LOADERS[file_format](), **options)
+            extractor.on_batch = lambda stage, records: connection.send(("batch", stage, records))
+            extractor.on_page = lambda page_number: connection.send(("page", page_number))
+            for stage in stages:
+                connection.send(("stage", stage))
+                connection.send(("done", stage, getattr(extractor, STAGES[stage])() or []))
+            connection.send(("finished",))
+        except BaseException as e:  # Loaders stop with SystemExit on unreadable files
+            if isinstance(e, KeyboardInterrupt):
+                return
+            try:
+                connection.send(("error", e))
+            except Exception:  # The exception itself cannot be pickled
+                connection.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class ExtractionWatchdog:
+    """
+    Runs extraction stages in a separate worker process and enforces time budgets on it.
+
+    Some PDFs make page.extract_tables() or get_text("dict") spin for minutes inside native code, where they
+    cannot be interrupted. The worker therefore reports every page it finishes; when no page finishes within
+    page_timeout seconds, or the document takes longer than document_timeout seconds, the watchdog kills the
+    worker, starts a fresh one for the next document and raises ExtractionTimeout with the stages completed so
+    far and the records of the pages the running stage finished. For DOCX files, which have no pages, and for
+    stages that read a whole PPTX at once, the page budget applies to each stage as a whole.
+    The worker stays warm between documents; one watchdog can be shared by several pipelines.
+    """
+
+    def __init__(self, page_timeout=None, document_timeout=None):
+        """
+        Args:
+            page_timeout (float, optional): Seconds a stage may spend on one page. Unlimited when omitted.
+            document_timeout (float, optional): Seconds a whole document may take. Unlimited when omitted.
+        """
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+        self.process = None
+        self.connection = None
+        self.restarts = 0  # Workers killed after a timeout or found dead
+
+    def _start(self):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_extraction_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def _replace(self):
+        """
+        Kills the worker, which may be stuck in native code that never returns, and starts a fresh one.
+        """
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self.restarts += 1
+        self._start()
+
+    def _deadline(self, started, progress):
+        deadlines = []
+        if self.page_timeout:
+            deadlines.append(progress + self.page_timeout)
+        if self.document_timeout:
+            deadlines.append(started + self.document_timeout)
+        return min(deadlines) if deadlines else None
+
+    def _reason(self, started, now, stage, page):
+        where = f"the {stage} stage" if stage else "opening the document"
+        if self.document_timeout and now - started >= self.document_timeout:
+            reason = f"Document exceeded its {self.document_timeout:g}s budget in {where}"
+        else:
+            reason = f"A page exceeded its {self.page_timeout:g}s budget in {where}"
+        return reason + (f" after page {page}" if page is not None else "")
+
+    def run(self, file_format, options, stages, on_stage, on_batch=None):
+        """
+        Extracts one document in the worker process, within the time budgets.
+        Args:
+            file_format (str): 'pdf', 'docx' or 'pptx'.
+            options (dict): DataExtractor keyword arguments. The source must be a path or bytes.
+            stages (list): Stage names from STAGES, in the order to run them.
+            on_stage (callable): Called as on_stage(stage, data) as soon as each stage is complete.
+            on_batch (callable, optional): Called as on_batch(stage, records) with each page's records.
+        Raises:
+            ExtractionTimeout: If a budget ran out. The worker has been replaced.
+            Exception: Whatever the extraction raised in the worker.
+        """
+        if self.process is None or not self.process.is_alive():
+            if self.process is not None:
+                self.connection.close()
+            self._start()
+        self.connection.send((file_format, options, stages))
+        started = progress = time.monotonic()
+        stage = page = None
+        partial = []
+        busy = True  # Until the worker has reported the end of the document
+        try:
+            while True:
+                deadline = self._deadline(started, progress)
+                if not self.connection.poll(None if deadline is None else max(deadline - time.monotonic(), 0)):
+                    raise ExtractionTimeout(self._reason(started, time.monotonic(), stage, page), stage, page, partial)
+                try:
+                    message = self.connection.recv()
+                except EOFError:
+                    self.process.join()
+                    raise RuntimeError(f"Extraction worker exited with code {self.process.exitcode}") from None
+                kind = message[0]
+                if kind == "stage":
+                    stage, page, partial = message[1], None, []
+                elif kind == "page":
+                    page = message[1]
+                elif kind == "batch":
+                    partial.extend(message[2])
+                    if on_batch is not None:
+                        on_batch(message[1], message[2])
+                elif kind == "done":
+                    partial = []
+                    on_stage(message[1], message[2])
+                elif kind == "finished":
+                    busy = False
+                    return
+                elif kind == "error":
+                    busy = False
+                    raise message[1]
+                progress = time.monotonic()
+        except BaseException:
+            if busy:
+                self._replace()  # Still extracting, or out of step with us: start over with a fresh worker
+            raise
+
+    def close(self):
+        """
+        Stops the worker process.
+        """
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.connection.close()
+        self.process = None
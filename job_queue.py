@@ -0,0 +1,458 @@
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_extractor1 import DEFAULT_STAGES, STAGES, detect_format
+from pipeline import Pipeline, SINKS, build_sinks
+from extraction_watchdog import ExtractionTimeout, ExtractionWatchdog
+from Storage.group_commit import DATABASE_SINKS, GroupCommitSink, writer_process
+
+# Priority classes; lower values are claimed first
+PRIORITIES = {
+    "interactive": 0,
+    "normal": 1,
+    "batch": 2
+}
+
+# Job life cycle: queued -> running -> done, or back to queued on failure/lease expiry until attempts run out
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    """
+    A durable job queue stored in a local SQLite database.
+
+    Workers claim jobs with a lease (visibility timeout). If a worker dies, its lease expires and the job
+    becomes visible again; jobs that keep failing are moved to the 'failed' state after max_attempts.
+    Jobs are claimed in priority order, then oldest first, so small interactive uploads overtake batch backfills.
+    Every process should create its own JobQueue; SQLite's WAL mode lets them share one database file.
+    """
+
+    def __init__(self, db_path="jobs.db", visibility_timeout=300, max_attempts=3):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file.
+            visibility_timeout (float): Seconds a claimed job stays invisible to other workers without a heartbeat.
+            max_attempts (int): Default number of attempts before a job is marked as failed.
+        """
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _create_tables(self):
+        self.connection.executescript("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_path TEXT,
+            payload BLOB,
+            file_format TEXT NOT NULL,
+            stages TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            lease_expires_at REAL,
+            worker_id TEXT,
+            last_error TEXT,
+            result TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (state, priority, available_at, id);
+        CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (state, lease_expires_at);
+        """)
+
+    def _transaction(self, work):
+        """
+        Runs work(cursor) inside a write transaction; BEGIN IMMEDIATE makes concurrent claims serialize.
+        """
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(cursor)
+                cursor.execute("COMMIT")
+                return result
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                cursor.close()
+
+    def enqueue(self, source, file_format=None, stages=None, priority="normal", max_attempts=None, delay=0):
+        """
+        Adds a document to the queue.
+        Args:
+            source (str | bytes): A file path, or the document content itself (stored in the queue).
+            file_format (str, optional): 'pdf', 'docx' or 'pptx'. Detected from the path when omitted.
+            stages (list, optional): Stages to run. Defaults to DEFAULT_STAGES.
+            priority (str | int): A PRIORITIES class name or a raw priority value.
+            max_attempts (int, optional): Overrides the queue's default attempt limit.
+            delay (float): Seconds before the job becomes visible to workers.
+        Returns:
+            int: The new job id.
+        """
+        is_path = isinstance(source, (str, os.PathLike))
+        file_format = file_format or (detect_format(source) if is_path else None)
+        if file_format is None:
+            raise ValueError(f"Cannot determine the file format of {source if is_path else 'in-memory payload'}")
+        stages = list(stages or DEFAULT_STAGES)
+        unknown = [stage for stage in stages if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(unknown)}")
+        priority = PRIORITIES[priority] if isinstance(priority, str) else int(priority)
+        now = time.time()
+
+        def work(cursor):
+            cursor.execute(
+                "INSERT INTO jobs (file_path, payload, file_format, stages, priority, state, max_attempts, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.fspath(source) if is_path else None, None if is_path else bytes(source), file_format,
+                 ",".join(stages), priority, QUEUED, max_attempts or self.max_attempts, now + delay, now, now))
+            return cursor.lastrowid
+        return self._transaction(work)
+
+    def claim(self, worker_id, max_priority=None):
+        """
+        Leases the next visible job to a worker.
+        Args:
+            worker_id (str): Identifier of the claiming worker.
+            max_priority (int, optional): Only claim jobs with a priority value at or below this
+                (e.g. PRIORITIES['interactive'] for workers reserved for interactive traffic).
+        Returns:
+            dict | None: The claimed job, or None if nothing is available.
+        """
+        now = time.time()
+
+        def work(cursor):
+            self._expire_leases(cursor, now)
+            query = "SELECT * FROM jobs WHERE state = ? AND available_at <= ?"
+            params = [QUEUED, now]
+            if max_priority is not None:
+                query += " AND priority <= ?"
+                params.append(max_priority)
+            row = cursor.execute(query + " ORDER BY priority, available_at, id LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            cursor.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_expires_at = ?, worker_id = ?, "
+                "updated_at = ? WHERE id = ?",
+                (RUNNING, now + self.visibility_timeout, worker_id, now, row["id"]))
+            job = dict(row)
+            job.update(state=RUNNING, attempts=job["attempts"] + 1, worker_id=worker_id)
+            job["stages"] = job["stages"].split(",")
+            return job
+        return self._transaction(work)
+
+    def _expire_leases(self, cursor, now):
+        """
+        Returns jobs whose lease ran out to the queue, or fails them if they have no attempts left.
+        """
+        cursor.execute(
+            "UPDATE jobs SET state = ?, last_error = 'visibility timeout expired', updated_at = ? "
+            "WHERE state = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+            (FAILED, now, RUNNING, now))
+        cursor.execute(
+            "UPDATE jobs SET state = ?, available_at = ?, worker_id = NULL, updated_at = ? "
+            "WHERE state = ? AND lease_expires_at < ?",
+            (QUEUED, now, now, RUNNING, now))
+
+    def heartbeat(self, job_id, worker_id):
+        """
+        Extends the lease of a running job.
+        Returns:
+            bool: False if the worker no longer owns the job (its lease expired and it was reclaimed).
+        """
+        now = time.time()
+
+        def work(cursor):
+            cursor.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND state = ?",
+                (now + self.visibility_timeout, now, job_id, worker_id, RUNNING))
+            return cursor.rowcount == 1
+        return self._transaction(work)
+
+    def complete(self, job_id, worker_id, result=None):
+        """
+        Marks a job as done and records a JSON-serializable result summary.
+        Returns:
+            bool: False if the worker no longer owns the job.
+        """
+        now = time.time()
+
+        def work(cursor):
+            cursor.execute(
+                "UPDATE jobs SET state = ?, result = ?, payload = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND state = ?",
+                (DONE, json.dumps(result), now, job_id, worker_id, RUNNING))
+            return cursor.rowcount == 1
+        return self._transaction(work)
+
+    def fail(self, job_id, worker_id, error, retry_delay=5):
+        """
+        Records a failed attempt. The job is retried after an exponential backoff, or marked as failed
+        once it has used all of its attempts.
+        Returns:
+            str | None: The job's new state, or None if the worker no longer owns the job.
+        """
+        now = time.time()
+
+        def work(cursor):
+            row = cursor.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND state = ?",
+                                 (job_id, worker_id, RUNNING)).fetchone()
+            if row is None:
+                return None
+            state = FAILED if row["attempts"] >= row["max_attempts"] else QUEUED
+            cursor.execute(
+                "UPDATE jobs SET state = ?, last_error = ?, available_at = ?, lease_expires_at = NULL, worker_id = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (state, str(error), now + retry_delay * 2 ** (row["attempts"] - 1), now, job_id))
+            return state
+        return self._transaction(work)
+
+    def get(self, job_id):
+        """
+        Returns a job by id as a dict (without its payload), or None.
+        """
+        with self._lock:
+            row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.pop("payload")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def counts(self):
+        """
+        Returns the number of jobs per (state, priority).
+        """
+        with self._lock:
+            rows = self.connection.execute("SELECT state, priority, COUNT(*) AS n FROM jobs GROUP BY state, priority").fetchall()
+        return {(row["state"], row["priority"]): row["n"] for row in rows}
+
+    def close(self):
+        self.connection.close()
+
+
+class JobWorker:
+    """
+    Claims jobs from a JobQueue and runs them through the extraction Pipeline and its Storage backends.
+    A background heartbeat keeps the lease alive while a long document is being extracted. If the lease is lost
+    anyway (the heartbeat stalled and another worker reclaimed the job), lease_lost is set and the job's result
+    is discarded, since the job now belongs to the other worker.
+    With a page_timeout or document_timeout in pipeline_options, documents are extracted in a worker process
+    that a watchdog kills and replaces when it runs over budget. Such a job is completed with its partial result
+    and the timeout reason rather than retried, since a retry would run into the same budget.
+    """
+
+    def __init__(self, queue, sinks=None, worker_id=None, max_priority=None, poll_interval=0.5, output_root="output",
+                 pipeline_options=None):
+        """
+        Args:
+            queue (JobQueue): The queue to take jobs from.
+            sinks (list, optional): Storage backends (MySQL, SQLite, JSON files, search index...) that receive
+                the output of every stage, as in Pipeline.
+            worker_id (str, optional): Identifier recorded on claimed jobs. Generated when omitted.
+            max_priority (int, optional): Restricts this worker to jobs at or above this priority class.
+            poll_interval (float): Seconds to sleep when the queue is empty.
+            output_root (str): Folder for extracted images and tables; every document gets its own subfolder.
+            pipeline_options (dict, optional): Further Pipeline arguments for every job, e.g. table_max_rss or
+                page_timeout and document_timeout.
+        """
+        self.queue = queue
+        self.sinks = list(sinks or [])
+        self.worker_id = worker_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.max_priority = max_priority
+        self.poll_interval = poll_interval
+        self.output_root = output_root
+        self.pipeline_options = dict(pipeline_options or {})
+        page_timeout = self.pipeline_options.pop("page_timeout", None)
+        document_timeout = self.pipeline_options.pop("document_timeout", None)
+        # One watchdog, and one warm extraction process, for all of this worker's jobs
+        self.watchdog = ExtractionWatchdog(page_timeout, document_timeout) if page_timeout or document_timeout else None
+        self.lease_lost = threading.Event()  # Set by the heartbeat while the current job belongs to another worker
+        self.lost_leases = 0  # Jobs whose result was discarded because their lease was lost
+
+    def run_once(self):
+        """
+        Claims and processes a single job.
+        Returns:
+            bool: True if a job was processed, False if the queue had nothing to offer.
+        """
+        job = self.queue.claim(self.worker_id, self.max_priority)
+        if job is None:
+            return False
+
+        stop = threading.Event()
+        self.lease_lost.clear()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job["id"], stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.process(job)
+        except BaseException as e:  # Loaders stop the process with SystemExit on unreadable files
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            state = self.queue.fail(job["id"], self.worker_id, str(e) or type(e).__name__)
+            if state is None:
+                self._lease_lost(job, "failure")
+            else:
+                print(f"Job {job['id']} failed (attempt {job['attempts']}): {e} -> {state}")
+        else:
+            if self.queue.complete(job["id"], self.worker_id, result):
+                print(f"Job {job['id']} completed: {result}")
+            else:
+                self._lease_lost(job, "result")
+        finally:
+            stop.set()
+            heartbeat.join()
+        return True
+
+    def _lease_lost(self, job, outcome):
+        self.lost_leases += 1
+        print(f"Job {job['id']} lost its lease to another worker (attempt {job['attempts']}); its {outcome} was discarded")
+
+    def _heartbeat(self, job_id, stop):
+        interval = max(self.queue.visibility_timeout / 3, 0.1)
+        while not stop.wait(interval):
+            if not self.queue.heartbeat(job_id, self.worker_id):
+                self.lease_lost.set()
+                print(f"Job {job_id} lost its lease while it was being processed")
+                break
+
+    def process(self, job):
+        """
+        Runs the requested stages of a job through a Pipeline that writes to this worker's sinks.
+        Returns:
+            dict: The number of records produced per stage, and the reason under 'timeout' if the job ran out of time.
+        """
+        source = job["file_path"] if job["file_path"] is not None else job["payload"]
+        pipeline = Pipeline(job["stages"], self.sinks, output_root=self.output_root, per_document=True,
+                            watchdog=self.watchdog, **self.pipeline_options)
+        try:
+            results = pipeline.run(source, job["file_format"], name=job["file_path"] or f"job-{job['id']}")
+        except ExtractionTimeout as e:
+            counts = {stage: len(extracted_data) for stage, extracted_data in e.results.items()}
+            return dict(counts, timeout=e.reason)
+        return {stage: len(extracted_data) for stage, extracted_data in results.items()}
+
+    def run(self, stop_when_empty=False):
+        """
+        Processes jobs until interrupted, or until the queue is empty if stop_when_empty is set.
+        """
+        try:
+            while True:
+                if not self.run_once():
+                    if stop_when_empty:
+                        return
+                    time.sleep(self.poll_interval)
+        finally:
+            if self.watchdog is not None:
+                self.watchdog.close()
+
+
+def _worker_process(db_path, visibility_timeout, max_priority, sink_options, stop_when_empty, group_commit=None,
+                    pipeline_options=None):
+    queue = JobQueue(db_path, visibility_timeout=visibility_timeout)
+    sinks = build_sinks(**sink_options)
+    if group_commit is not None:
+        sinks.append(GroupCommitSink(*group_commit))  # (requests, acks, worker) of the shared database writer
+    worker = JobWorker(queue, sinks, max_priority=max_priority, output_root=sink_options["output_folder"],
+                       pipeline_options=pipeline_options)
+    worker.run(stop_when_empty=stop_when_empty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durable SQLite-backed extraction job queue.")
+    parser.add_argument("--db", default="jobs.db", help="Path to the queue database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue one or more documents")
+    enqueue.add_argument("files", nargs="+")
+    enqueue.add_argument("--priority", choices=list(PRIORITIES), default="normal")
+    enqueue.add_argument("--stages", default=",".join(DEFAULT_STAGES))
+
+    work = commands.add_parser("work", help="Run extraction workers")
+    work.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    work.add_argument("--reserve-interactive", type=int, default=1,
+                      help="Workers that only take interactive jobs, so small uploads never wait behind batch work")
+    work.add_argument("--visibility-timeout", type=float, default=300)
+    work.add_argument("--sinks", default="", help=f"Comma-separated sinks to write results to: {','.join(SINKS)}")
+    work.add_argument("--output", default="output", help="Output folder, with one subfolder per document")
+    work.add_argument("--sqlite", default="extracted_data.db", help="Database file for the sqlite sink")
+    work.add_argument("--index", default="search_index.db", help="Database file for the index sink")
+    work.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    work.add_argument("--group-commit", action="store_true",
+                      help="Send database rows from all workers to one writer process that commits them in groups")
+    work.add_argument("--commit-size", type=int, default=64, help="Documents per group commit")
+    work.add_argument("--commit-delay", type=float, default=0.05,
+                      help="Seconds a document may wait for its group commit to fill up")
+    work.add_argument("--table-reopen-pages", type=int, help="Reopen PDFs every N pages while extracting tables")
+    work.add_argument("--table-max-rss", type=float,
+                      help="Per-worker memory ceiling in MB for PDF table extraction")
+    work.add_argument("--page-timeout", type=float,
+                      help="Seconds a stage may spend on one page; the document is then stopped with a partial result")
+    work.add_argument("--document-timeout", type=float,
+                      help="Seconds a document may take; it is then stopped with a partial result")
+
+    commands.add_parser("status", help="Show job counts by state and priority")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        queue = JobQueue(args.db)
+        for file_path in args.files:
+            job_id = queue.enqueue(file_path, stages=args.stages.split(","), priority=args.priority)
+            print(f"Queued job {job_id}: {file_path} ({args.priority})")
+    elif args.command == "status":
+        names = {value: name for name, value in PRIORITIES.items()}
+        for (state, priority), count in sorted(JobQueue(args.db).counts().items()):
+            print(f"{state:<8} {names.get(priority, priority):<12} {count}")
+    else:
+        reserved = min(args.reserve_interactive, max(args.workers - 1, 0))
+        pipeline_options = {"table_reopen_pages": args.table_reopen_pages, "table_max_rss": args.table_max_rss,
+                            "page_timeout": args.page_timeout, "document_timeout": args.document_timeout}
+        names = [name for name in args.sinks.split(",") if name]
+        sink_options = {"names": names, "output_folder": args.output,
+                        "sqlite_path": args.sqlite, "index_path": args.index, "per_document": True}
+        writer, group_commit = None, [None] * args.workers
+        if args.group_commit:
+            databases = [name for name in names if name in DATABASE_SINKS]
+            if len(databases) != 1:
+                parser.error(f"--group-commit needs exactly one of {', '.join(DATABASE_SINKS)} in --sinks")
+            requests = multiprocessing.Queue(maxsize=args.workers * 4)
+            acks = {i: multiprocessing.Queue() for i in range(args.workers)}
+            writer = multiprocessing.Process(target=writer_process, args=(
+                dict(sink_options, names=databases), requests, acks, args.commit_size, 50000, args.commit_delay))
+            writer.start()
+            sink_options["names"] = [name for name in names if name not in DATABASE_SINKS]
+            group_commit = [(requests, acks[i], i) for i in range(args.workers)]
+        processes = [
+            multiprocessing.Process(target=_worker_process, args=(
+                args.db, args.visibility_timeout, PRIORITIES["interactive"] if i < reserved else None, sink_options,
+                args.drain, group_commit[i], pipeline_options))
+            for i in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        if writer is not None:
+            requests.put(None)  # Commits the last group, then stops
+            writer.join()
+
+
+if __name__ == "__main__":
+    main()
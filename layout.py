@@ -0,0 +1,127 @@
+import numpy as np
+
+# Region codes returned by page_regions()
+BODY, HEADER, FOOTER = 0, 1, 2
+
+# Share of the page height at the top and bottom in which whole blocks are taken for running headers and footers
+MARGIN_BAND = 0.08
+# Blocks at least this share of the body width wide span all columns and start a new section of the page
+SPANNING_WIDTH = 0.6
+# Narrowest empty vertical strip, as a share of the page width, that separates two columns
+MIN_GUTTER = 0.015
+# Narrowest block, as a share of the page width, that counts as column text on either side of a gutter
+MIN_COLUMN_WIDTH = 0.15
+# Resolution of the horizontal coverage profile used to find gutters
+COVERAGE_BINS = 400
+
+
+def block_boxes(blocks):
+    """
+    Returns the bounding boxes of get_text("dict") blocks as an (n, 4) array of x0, y0, x1, y1.
+    """
+    return np.array([block["bbox"] for block in blocks], dtype=np.float32).reshape(-1, 4)
+
+
+def upright_blocks(blocks):
+    """
+    Returns a boolean mask of the get_text("dict") blocks whose lines all run left to right, as opposed to
+    rotated text such as the vertical identifiers printed in the margin of preprints.
+    """
+    return np.array([all(line["dir"][0] > 0.99 for line in block.get("lines", ())) for block in blocks], dtype=bool)
+
+
+def page_regions(boxes, height, band=MARGIN_BAND):
+    """
+    Classifies blocks as header, footer or body by position: a block that lies entirely within the top
+    (bottom) band of the page is part of the running header (footer).
+    Args:
+        boxes (ndarray): (n, 4) block bounding boxes.
+        height (float): Page height.
+    Returns:
+        ndarray: One of BODY, HEADER or FOOTER per block.
+    """
+    regions = np.full(len(boxes), BODY, dtype=np.int8)
+    regions[boxes[:, 3] <= height * band] = HEADER
+    regions[boxes[:, 1] >= height * (1 - band)] = FOOTER
+    return regions
+
+
+def column_gutters(boxes, width):
+    """
+    Finds the x positions of the gutters between text columns. A gutter is an empty vertical strip of at least
+    MIN_GUTTER of the page width, between the narrow (non-spanning) blocks, with column-wide blocks (at least
+    MIN_COLUMN_WIDTH of the page) on both sides of it that overlap vertically. A short indented block, table
+    cells or the pieces of a typeset formula therefore do not open columns of their own.
+    Args:
+        boxes (ndarray): (n, 4) bounding boxes of the narrow body blocks.
+        width (float): Page width.
+    Returns:
+        ndarray: Sorted x positions of the gutters' centres; empty for single-column text.
+    """
+    if len(boxes) < 2:
+        return np.empty(0, dtype=np.float32)
+    scale = COVERAGE_BINS / max(width, 1)
+    starts = np.clip((boxes[:, 0] * scale).astype(np.int64), 0, COVERAGE_BINS)
+    ends = np.clip(np.ceil(boxes[:, 2] * scale).astype(np.int64), 0, COVERAGE_BINS)
+    edges = np.zeros(COVERAGE_BINS + 1, dtype=np.int64)
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, ends, -1)
+    covered = np.cumsum(edges[:-1]) > 0
+    # Empty runs strictly between the leftmost and rightmost covered bins
+    first, last = np.flatnonzero(covered)[[0, -1]]
+    empty = np.flatnonzero(~covered[first:last + 1]) + first
+    if not len(empty):
+        return np.empty(0, dtype=np.float32)
+    breaks = np.flatnonzero(np.diff(empty) > 1)
+    run_starts = empty[np.r_[0, breaks + 1]]
+    run_ends = empty[np.r_[breaks, len(empty) - 1]] + 1
+    wide = (run_ends - run_starts) >= MIN_GUTTER * COVERAGE_BINS
+    centres = (run_starts[wide] + run_ends[wide]) / 2 / scale
+    centre_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    wide_blocks = boxes[:, 2] - boxes[:, 0] >= MIN_COLUMN_WIDTH * width
+    gutters = []
+    for centre in centres:
+        left, right = boxes[wide_blocks & (centre_x < centre)], boxes[wide_blocks & (centre_x >= centre)]
+        side_by_side = (left[:, None, 1] < right[None, :, 3]) & (right[None, :, 1] < left[:, None, 3])
+        if side_by_side.any():
+            gutters.append(centre)
+    return np.array(gutters, dtype=np.float32)
+
+
+def reading_order(boxes, width, height, upright=None):
+    """
+    Orders the blocks of a page for reading: the running header first, then the body, then rotated text,
+    then the footer. On pages with columns, blocks that span (most of) the body width split the body into
+    sections from top to bottom; within a section the spanning block comes first, followed by each column top
+    to bottom, left column first. Single-column bodies keep the order of the content stream, which already
+    reads correctly and keeps tables and formulas intact. All steps are vectorized over the page's blocks,
+    so the cost per page stays small.
+    Args:
+        boxes (ndarray): (n, 4) block bounding boxes, e.g. from block_boxes().
+        width (float): Page width.
+        height (float): Page height.
+        upright (ndarray, optional): Mask of the blocks with horizontal text (see upright_blocks). Rotated
+            blocks take no part in column detection. Defaults to all blocks.
+    Returns:
+        ndarray: Block indexes in reading order.
+    """
+    if len(boxes) < 2:
+        return np.arange(len(boxes))
+    regions = page_regions(boxes, height)
+    x0, y0 = boxes[:, 0], boxes[:, 1]
+    sideways = np.zeros(len(boxes), dtype=bool) if upright is None else ~upright & (regions == BODY)
+    body = (regions == BODY) & ~sideways
+    # Sort keys, least significant first: x, y, column, section, region (header < body < rotated < footer)
+    region_rank = np.select([regions == HEADER, sideways, regions == FOOTER], [0, 2, 3], 1)
+    if body.any():
+        body_left, body_right = x0[body].min(), boxes[body, 2].max()
+        spanning = body & (boxes[:, 2] - x0 >= SPANNING_WIDTH * max(body_right - body_left, 1))
+        narrow = body & ~spanning
+        gutters = column_gutters(boxes[narrow], width)
+        if len(gutters):
+            column = np.zeros(len(boxes), dtype=np.int64)
+            column[narrow] = np.searchsorted(gutters, (x0[narrow] + boxes[narrow, 2]) / 2)
+            column[spanning] = -1  # A spanning block opens its section
+            section = np.searchsorted(np.sort(y0[spanning]), y0, side="right")
+            return np.lexsort((x0, y0, column, section, region_rank))
+    return np.argsort(region_rank, kind="stable")
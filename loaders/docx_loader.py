@@ -2,7 +2,7 @@ import os
 import sys
 from docx import Document
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from loaders.file_loader import AbstractFileLoader
+from loaders.file_loader import AbstractFileLoader, is_file_path, open_stream, read_header, describe_source
 import logging
 
 
@@ -14,33 +14,38 @@ class DOCXLoader(AbstractFileLoader):
     def check_file(self, filepath):
         """
         Validates that the specified file path ends with '.docx'.
+        In-memory sources (bytes, BytesIO, mmap) are checked for the ZIP container signature instead.
 
         Args:
-        filepath (str): The path to the file to validate.
+        filepath (str | bytes | io.BytesIO | mmap.mmap): The path or in-memory document to validate.
 
         Raises:
         ValueError: If the file extension is not .docx.
         """
-        if not filepath.lower().endswith('.docx'):
-            logging.error(f"Invalid file format for DOCX loader: {filepath}")
-            sys.exit(f"Stopping the process due to invalid file format for DOCX loader: {filepath}")
-        print(f"Validated DOCX file: {filepath}")
+        if is_file_path(filepath):
+            valid = str(filepath).lower().endswith('.docx')
+        else:
+            valid = read_header(filepath, 4) == b"PK\x03\x04"  # .docx files are ZIP packages
+        if not valid:
+            logging.error(f"Invalid file format for DOCX loader: {describe_source(filepath)}")
+            sys.exit(f"Stopping the process due to invalid file format for DOCX loader: {describe_source(filepath)}")
+        print(f"Validated DOCX file: {describe_source(filepath)}")
     
     def open_file(self, filepath):
         """
         Loads a DOCX file and returns a Document object.
 
         Args:
-        filepath (str): The path to the file to load.
+        filepath (str | bytes | io.BytesIO | mmap.mmap): The path or in-memory document to load.
 
         Raises:
         IOError: If the file cannot be opened or read.
         """
         try:
             self.check_file(filepath)
-            doc = Document(filepath)
-            print(f"Loaded DOCX file: {filepath}")
+            doc = Document(open_stream(filepath))
+            print(f"Loaded DOCX file: {describe_source(filepath)}")
             return doc
         except Exception as e:
             logging.error(f"Unable to open or read the DOCX file due to corruption or other issues: {e}")
-            sys.exit(f"Stopping the process due to a critical error with the file: {filepath}")
\ No newline at end of file
+            sys.exit(f"Stopping the process due to a critical error with the file: {describe_source(filepath)}")
\ No newline at end of file
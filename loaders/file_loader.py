@@ -1,5 +1,138 @@
+import io
+import mmap
+import os
+import hashlib
 from abc import ABC, abstractmethod
 
+
+def is_file_path(source):
+    """
+    Checks whether a loader source refers to a file on disk rather than an in-memory buffer.
+    Args:
+        source (str | os.PathLike | bytes | bytearray | memoryview | io.BytesIO | mmap.mmap): The loader source.
+    Returns:
+        bool: True if the source is a filesystem path.
+    """
+    return isinstance(source, (str, os.PathLike))
+
+
+def to_buffer(source):
+    """
+    Normalizes an in-memory source into a single bytes-like object that every extraction stage can share.
+    bytes, bytearray and unmodified BytesIO objects are returned without copying; mmap and memoryview
+    sources are materialized once so that PyMuPDF (which only accepts bytes-like streams) can use them.
+    Args:
+        source (bytes | bytearray | memoryview | io.BytesIO | mmap.mmap): The in-memory document.
+    Returns:
+        bytes | bytearray: The document content.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    if isinstance(source, io.BytesIO):
+        return source.getvalue()  # CPython hands back the internal buffer when it has not been resized
+    if isinstance(source, mmap.mmap):
+        return source[:]
+    if isinstance(source, memoryview):
+        return source.tobytes()
+    raise TypeError(f"Unsupported document source type: {type(source).__name__}")
+
+
+def normalize_source(source):
+    """
+    Returns the source unchanged if it is a path, otherwise its shared in-memory buffer.
+    Args:
+        source: A filesystem path or any in-memory source accepted by to_buffer().
+    Returns:
+        str | os.PathLike | bytes | bytearray: The normalized source.
+    """
+    return source if is_file_path(source) else to_buffer(source)
+
+
+def open_stream(source):
+    """
+    Returns something python-docx, python-pptx, pdfplumber and PyPDF2 can open: the path itself,
+    or a fresh BytesIO view over the shared buffer (BytesIO over bytes does not copy until written to).
+    Args:
+        source: A filesystem path or in-memory source.
+    Returns:
+        str | os.PathLike | io.BytesIO: A path or seekable binary stream.
+    """
+    if is_file_path(source):
+        return source
+    return io.BytesIO(to_buffer(source))
+
+
+def open_fitz_document(source):
+    """
+    Opens a PDF with PyMuPDF from either a path or an in-memory buffer.
+    Args:
+        source: A filesystem path or in-memory source.
+    Returns:
+        fitz.Document: The opened PDF document.
+    """
+    import fitz  # Imported lazily so DOCX/PPTX-only deployments do not need PyMuPDF
+
+    if is_file_path(source):
+        return fitz.open(source)
+    return fitz.open(stream=to_buffer(source), filetype="pdf")
+
+
+def describe_source(source):
+    """
+    Builds a short human-readable label for a source, used in log and print messages.
+    Args:
+        source: A filesystem path or in-memory source.
+    Returns:
+        str: The path, or a description of the in-memory buffer.
+    """
+    if is_file_path(source):
+        return str(source)
+    try:
+        size = len(source.getbuffer()) if isinstance(source, io.BytesIO) else len(source)
+    except TypeError:
+        size = "unknown"
+    return f"<in-memory {type(source).__name__}, {size} bytes>"
+
+
+def read_header(source, size=8):
+    """
+    Reads the first bytes of a source without consuming or copying the whole document.
+    Args:
+        source: A filesystem path or in-memory source.
+        size (int): Number of bytes to read.
+    Returns:
+        bytes: The leading bytes of the document.
+    """
+    if is_file_path(source):
+        with open(source, "rb") as file:
+            return file.read(size)
+    if isinstance(source, io.BytesIO):
+        return bytes(source.getbuffer()[:size])
+    return bytes(source[:size])
+
+
+def content_hash(source, chunk_size=1024 * 1024):
+    """
+    Computes the SHA-256 of a document's content, reading files in fixed-size chunks so large documents
+    are never fully loaded into memory. Identical documents get the same hash whatever their name or location.
+    Args:
+        source: A filesystem path or in-memory source.
+        chunk_size (int): Bytes read per chunk for files on disk.
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    if is_file_path(source):
+        with open(source, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+    elif isinstance(source, io.BytesIO):
+        digest.update(source.getbuffer())
+    else:
+        digest.update(source)
+    return digest.hexdigest()
+
+
 class AbstractFileLoader(ABC):
 
     @abstractmethod
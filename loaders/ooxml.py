@@ -0,0 +1,717 @@
+import os
+import sys
+import posixpath
+import shutil
+import zipfile
+from lxml import etree
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from loaders.file_loader import open_stream
+from span_columns import FLAG_BOLD, FLAG_ITALIC, FLAG_SUPERSCRIPT
+
+# XML namespaces used by the WordprocessingML, PresentationML, DrawingML and package-relationship parts
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+TABLE_URI = "http://schemas.openxmlformats.org/drawingml/2006/table"
+V_NS = "urn:schemas-microsoft-com:vml"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT = R_NS + "/officeDocument"
+STYLES = R_NS + "/styles"
+
+
+def w(tag):
+    """
+    Returns the Clark-notation name of a WordprocessingML element, e.g. w("p") -> "{...main}p".
+    """
+    return f"{{{W_NS}}}{tag}"
+
+
+def p(tag):
+    """
+    Returns the Clark-notation name of a PresentationML element.
+    """
+    return f"{{{P_NS}}}{tag}"
+
+
+def a(tag):
+    """
+    Returns the Clark-notation name of a DrawingML element.
+    """
+    return f"{{{A_NS}}}{tag}"
+
+
+W_BODY, W_P, W_R, W_HYPERLINK = w("body"), w("p"), w("r"), w("hyperlink")
+W_PPR, W_PSTYLE, W_VAL, W_TYPE = w("pPr"), w("pStyle"), w("val"), w("type")
+W_T, W_TAB, W_PTAB, W_BR, W_CR, W_NO_BREAK_HYPHEN = w("t"), w("tab"), w("ptab"), w("br"), w("cr"), w("noBreakHyphen")
+
+P_SP_TREE, P_GRP_SP, P_SP, P_PIC, P_GRAPHIC_FRAME, P_TX_BODY = (p("spTree"), p("grpSp"), p("sp"), p("pic"),
+                                                                p("graphicFrame"), p("txBody"))
+A_P, A_R, A_BR, A_FLD, A_T, A_RPR = a("p"), a("r"), a("br"), a("fld"), a("t"), a("rPr")
+R_ID, R_EMBED = f"{{{R_NS}}}id", f"{{{R_NS}}}embed"
+A_BLIP, V_IMAGEDATA, MC_FALLBACK = a("blip"), f"{{{V_NS}}}imagedata", f"{{{MC_NS}}}Fallback"
+W_TBL, W_SDT, W_TR, W_TC, W_TC_PR, W_TR_PR = w("tbl"), w("sdt"), w("tr"), w("tc"), w("tcPr"), w("trPr")
+SLIDE_SHAPES = (p("sp"), p("grpSp"), p("graphicFrame"), p("cxnSp"), p("pic"), p("contentPart"))
+
+# Built-in style names that Word stores in lower case; python-docx reports them capitalized
+UI_STYLE_NAMES = {"caption": "Caption", "footer": "Footer", "header": "Header",
+                  **{f"heading {level}": f"Heading {level}" for level in range(1, 10)}}
+
+
+def open_package(source):
+    """
+    Opens a DOCX or PPTX file (path or in-memory buffer) as a ZIP package without parsing any of its parts.
+    Args:
+        source: A filesystem path or in-memory source.
+    Returns:
+        zipfile.ZipFile: The opened package.
+    """
+    return zipfile.ZipFile(open_stream(source))
+
+
+def part_relationships(package, part_name):
+    """
+    Reads the relationships of a package part from its _rels/<part>.rels file.
+    Args:
+        package (zipfile.ZipFile): The opened package.
+        part_name (str): The part, e.g. "word/document.xml". Use "" for the package-level relationships.
+    Returns:
+        dict: Relationship id -> (type, target, external). Internal targets are resolved to part names in the ZIP.
+    """
+    folder, name = posixpath.split(part_name)
+    rels_name = posixpath.join(folder, "_rels", f"{name}.rels")
+    try:
+        root = etree.fromstring(package.read(rels_name))
+    except KeyError:
+        return {}
+    relationships = {}
+    for rel in root.iter(f"{{{REL_NS}}}Relationship"):
+        target, external = rel.get("Target"), rel.get("TargetMode") == "External"
+        if not external:
+            target = posixpath.normpath(posixpath.join(folder, target)).lstrip("/") if not target.startswith("/") \
+                else target.lstrip("/")
+        relationships[rel.get("Id")] = (rel.get("Type"), target, external)
+    return relationships
+
+
+def related_part(package, part_name, rel_type):
+    """
+    Finds the first internal part that part_name relates to with the given relationship type.
+    Returns:
+        str | None: The target part name, or None if there is no such relationship.
+    """
+    for kind, target, external in part_relationships(package, part_name).values():
+        if kind == rel_type and not external:
+            return target
+    return None
+
+
+def main_document_part(package, default="word/document.xml"):
+    """
+    Resolves the main document part (word/document.xml in files written by Word) from the package relationships.
+    """
+    return related_part(package, "", OFFICE_DOCUMENT) or default
+
+
+def docx_paragraph_styles(package, document_part):
+    """
+    Builds the style id -> style name map for paragraph styles from styles.xml, resolved the same way
+    python-docx does: unknown or missing ids fall back to the default paragraph style.
+    Args:
+        package (zipfile.ZipFile): The opened DOCX package.
+        document_part (str): The main document part name.
+    Returns:
+        tuple: (dict of style id -> name, name of the default paragraph style).
+    """
+    styles_part = related_part(package, document_part, STYLES)
+    if styles_part is None or styles_part not in package.NameToInfo:
+        return {}, "Normal"  # python-docx falls back to its template styles, whose default is Normal
+    root = etree.fromstring(package.read(styles_part))
+    styles, default = {}, "Normal"
+    for style in root.iterchildren(w("style")):
+        if style.get(W_TYPE, "paragraph") != "paragraph":
+            continue
+        name_element = style.find(w("name"))
+        name = name_element.get(W_VAL) if name_element is not None else None
+        name = UI_STYLE_NAMES.get(name, name)
+        style_id = style.get(w("styleId"))
+        if style_id is not None:
+            styles.setdefault(style_id, name)  # The first definition of an id wins, as in python-docx
+        if style.get(w("default")) in ("1", "true", "on"):
+            default = name
+    return styles, default
+
+
+def release(element):
+    """
+    Frees an element that iterparse has finished with, along with the already processed siblings before it.
+    """
+    parent = element.getparent()
+    element.clear(keep_tail=True)
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def run_text(run):
+    """
+    Converts a w:r element to text the way python-docx does: tabs become "\\t", line breaks "\\n",
+    non-breaking hyphens "-", and page or column breaks are dropped.
+    """
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == W_TAB or tag == W_PTAB:
+            parts.append("\t")
+        elif tag == W_BR:
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == W_CR:
+            parts.append("\n")
+        elif tag == W_NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(paragraph):
+    """
+    Returns the text of a w:p element: its runs and the runs inside its hyperlinks, in document order.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == W_R:
+            parts.append(run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(run_text(run) for run in child.iterchildren(W_R))
+    return "".join(parts)
+
+
+def paragraph_style_id(paragraph):
+    """
+    Returns the w:pStyle id of a w:p element, or None if it uses the default paragraph style.
+    """
+    properties = paragraph.find(W_PPR)
+    if properties is None:
+        return None
+    style = properties.find(W_PSTYLE)
+    return style.get(W_VAL) if style is not None else None
+
+
+def iter_docx_paragraphs(source):
+    """
+    Streams the body paragraphs of a DOCX file as (text, style name) pairs.
+
+    word/document.xml is decompressed and parsed incrementally; each top-level paragraph is released as soon as
+    it has been read, together with any tables before it, so memory stays bounded by the largest single element
+    rather than the size of the document. Paragraphs inside tables are skipped, like python-docx's
+    Document.paragraphs.
+    Args:
+        source: A filesystem path or in-memory DOCX.
+    Yields:
+        tuple: (paragraph text, style name) for every body paragraph, including empty ones.
+    """
+    with open_package(source) as package:
+        document_part = main_document_part(package)
+        styles, default_style = docx_paragraph_styles(package, document_part)
+        with package.open(document_part) as stream:
+            for _, paragraph in etree.iterparse(stream, events=("end",), tag=W_P, huge_tree=True):
+                parent = paragraph.getparent()
+                if parent is None or parent.tag != W_BODY:
+                    continue  # Nested in a table or text box; released with its body-level ancestor
+                style_id = paragraph_style_id(paragraph)
+                style = styles.get(style_id, default_style) if style_id is not None else default_style
+                yield paragraph_text(paragraph), style
+                release(paragraph)  # Also drops already processed siblings (earlier paragraphs, tables, ...)
+
+
+def _on(element):
+    # WordprocessingML toggles: <w:b/> is on unless its val says otherwise
+    return element is not None and element.get(W_VAL, "true") not in ("0", "false", "off")
+
+
+def run_properties(properties):
+    """
+    Reads the font properties a w:rPr element sets.
+    Returns:
+        dict: Any of "font", "size" (points), "bold", "italic", "superscript" and "color" (0xRRGGBB); properties
+            the element does not mention are left out, so they can be layered over inherited ones.
+    """
+    if properties is None:
+        return {}
+    values = {}
+    fonts = properties.find(w("rFonts"))
+    if fonts is not None and (fonts.get(w("ascii")) or fonts.get(w("hAnsi"))):
+        values["font"] = fonts.get(w("ascii")) or fonts.get(w("hAnsi"))
+    size = properties.find(w("sz"))
+    if size is not None and size.get(W_VAL):
+        values["size"] = int(size.get(W_VAL)) / 2  # Half-points
+    for tag, key in (("b", "bold"), ("i", "italic")):
+        element = properties.find(w(tag))
+        if element is not None:
+            values[key] = _on(element)
+    vertical = properties.find(w("vertAlign"))
+    if vertical is not None:
+        values["superscript"] = vertical.get(W_VAL) == "superscript"
+    color = properties.find(w("color"))
+    if color is not None and color.get(W_VAL, "auto") != "auto":
+        values["color"] = int(color.get(W_VAL), 16)
+    return values
+
+
+def docx_run_styles(package, document_part):
+    """
+    Resolves the run properties of every paragraph and character style in styles.xml, including what they
+    inherit through w:basedOn, and reads the document defaults (w:docDefaults/w:rPrDefault) that apply below
+    all of them. Theme fonts, table styles and toggle-property inversion are not modelled.
+    Returns:
+        tuple: (dict of style id -> properties as returned by run_properties, document default properties,
+            id of the default paragraph style or None).
+    """
+    styles_part = related_part(package, document_part, STYLES)
+    if styles_part is None or styles_part not in package.NameToInfo:
+        return {}, {}, None
+    root = etree.fromstring(package.read(styles_part))
+    defaults = run_properties(root.find(f"{w('docDefaults')}/{w('rPrDefault')}/{w('rPr')}"))
+    own, based_on, default_style = {}, {}, None
+    for style in root.iterchildren(w("style")):
+        style_id = style.get(w("styleId"))
+        if style_id is None or style_id in own:
+            continue
+        own[style_id] = run_properties(style.find(w("rPr")))
+        parent = style.find(w("basedOn"))
+        if parent is not None:
+            based_on[style_id] = parent.get(W_VAL)
+        if style.get(W_TYPE, "paragraph") == "paragraph" and style.get(w("default")) in ("1", "true", "on"):
+            default_style = style_id
+
+    resolved = {}
+
+    def resolve(style_id, seen=()):
+        if style_id not in resolved:
+            parent = based_on.get(style_id)
+            inherited = resolve(parent, seen + (style_id,)) if parent in own and parent not in seen else {}
+            resolved[style_id] = {**inherited, **own[style_id]}
+        return resolved[style_id]
+
+    for style_id in own:
+        resolve(style_id)
+    return resolved, defaults, default_style
+
+
+def iter_docx_runs(source):
+    """
+    Streams the text runs of a DOCX file's body paragraphs with their effective font properties: document
+    defaults, then the paragraph style, the character style (w:rStyle) and the run's own w:rPr.
+    Paragraphs are numbered like iter_docx_paragraphs, counting empty ones.
+    Args:
+        source: A filesystem path or in-memory DOCX.
+    Yields:
+        tuple: (paragraph index, run text, font, size, SpanColumns flags, 0xRRGGBB color); None where unknown.
+    """
+    with open_package(source) as package:
+        document_part = main_document_part(package)
+        styles, defaults, default_style = docx_run_styles(package, document_part)
+        with package.open(document_part) as stream:
+            index = -1
+            for _, paragraph in etree.iterparse(stream, events=("end",), tag=W_P, huge_tree=True):
+                parent = paragraph.getparent()
+                if parent is None or parent.tag != W_BODY:
+                    continue
+                index += 1
+                paragraph_properties = {**defaults, **styles.get(paragraph_style_id(paragraph) or default_style, {})}
+                runs = [run for child in paragraph
+                        for run in ((child,) if child.tag == W_R else child.iterchildren(W_R)
+                                    if child.tag == W_HYPERLINK else ())]
+                for run in runs:
+                    text = run_text(run)
+                    if not text:
+                        continue
+                    properties = run.find(w("rPr"))
+                    character_style = properties.find(w("rStyle")) if properties is not None else None
+                    values = {**paragraph_properties,
+                              **(styles.get(character_style.get(W_VAL), {}) if character_style is not None else {}),
+                              **run_properties(properties)}
+                    flags = (FLAG_BOLD if values.get("bold") else 0) | (FLAG_ITALIC if values.get("italic") else 0) | \
+                        (FLAG_SUPERSCRIPT if values.get("superscript") else 0)
+                    yield index, text, values.get("font"), values.get("size"), flags, values.get("color")
+                release(paragraph)
+
+
+def _row_cells(row, above):
+    """
+    Resolves the cells of a w:tr the way python-docx's row.cells does, in one pass: a cell spanning n grid columns
+    (w:gridSpan) is repeated n times, and a vertically merged continuation cell (w:vMerge without "restart")
+    takes the text of the cell above it.
+    Args:
+        row: The w:tr element.
+        above (dict): Grid offset -> text of the previous row, as returned for it by this function.
+    Returns:
+        tuple: (list of cell texts, dict of grid offset -> text for this row).
+    """
+    properties = row.find(W_TR_PR)
+    before = properties.find(w("gridBefore")) if properties is not None else None
+    offset = int(before.get(W_VAL, 0)) if before is not None else 0
+    cells, offsets = [], {}
+    for cell in row.iterchildren(W_TC):
+        properties = cell.find(W_TC_PR)
+        span, merge = 1, None
+        if properties is not None:
+            grid_span = properties.find(w("gridSpan"))
+            span = int(grid_span.get(W_VAL, 1)) if grid_span is not None else 1
+            v_merge = properties.find(w("vMerge"))
+            merge = v_merge.get(W_VAL, "continue") if v_merge is not None else None
+        if merge == "continue":
+            text = above.get(offset, "")
+        else:
+            text = "\n".join(paragraph_text(paragraph) for paragraph in cell.iterchildren(W_P))
+        offsets[offset] = text
+        cells.extend([text] * span)
+        offset += span
+    return cells, offsets
+
+
+def iter_docx_tables(package):
+    """
+    Streams the tables of a DOCX document row by row, straight from word/document.xml, in linear time.
+    Tables are numbered in document order, and tables nested in a cell are reported as well, right after
+    their parent table starts. Each row is released as soon as it has been read.
+    Args:
+        package (zipfile.ZipFile): The opened DOCX package.
+    Yields:
+        tuple: ("start", table index, parent table index or None), ("row", table index, list of cell texts)
+            and ("end", table index, None). Table indexes are 1-based.
+    """
+    document_part = main_document_part(package)
+    open_tables, count = [], 0  # Stack of [table index, previous row offsets] for the tables being read
+    with package.open(document_part) as stream:
+        for event, element in etree.iterparse(stream, events=("start", "end"), tag=(W_TBL, W_TR, W_P),
+                                              huge_tree=True):
+            if event == "start":
+                if element.tag == W_TBL:
+                    count += 1
+                    parent = open_tables[-1][0] if open_tables else None
+                    open_tables.append([count, {}])
+                    yield "start", count, parent
+                continue
+            if element.tag == W_TR and open_tables:
+                table = open_tables[-1]
+                cells, table[1] = _row_cells(element, table[1])
+                yield "row", table[0], cells
+                release(element)
+            elif element.tag == W_TBL:
+                yield "end", open_tables.pop()[0], None
+                if not open_tables:
+                    release(element)
+            elif not open_tables and element.getparent() is not None and element.getparent().tag == W_BODY:
+                release(element)  # Body paragraphs between tables
+
+
+# Leading bytes of the image formats python-pptx names files after (via Pillow), and their canonical extensions.
+# Pillow reads EMF through its WMF plugin, so both come out as "wmf".
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"), (b"\xff\xd8\xff", "jpg"), (b"GIF87a", "gif"), (b"GIF89a", "gif"),
+    (b"BM", "bmp"), (b"II*\x00", "tiff"), (b"MM\x00*", "tiff"), (b"\xd7\xcd\xc6\x9a\x00\x00", "wmf"),
+    (b"\x01\x00\x00\x00", "wmf"),
+)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def image_extension(header, part_name):
+    """
+    Returns the canonical file extension of an embedded image from its first bytes, without decoding it.
+    Formats without a known signature (SVG, ...) keep the extension of their part name.
+    Args:
+        header (bytes): At least the first 8 bytes of the image part.
+        part_name (str): The image part name, e.g. "ppt/media/image1.png".
+    Returns:
+        str: The lower-case extension without a dot.
+    """
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    return posixpath.splitext(part_name)[1].lstrip(".").lower()
+
+
+def read_part_header(package, part_name, size=16):
+    """
+    Reads the first bytes of a package member, decompressing only as much as needed.
+    """
+    with package.open(part_name) as stream:
+        return stream.read(size)
+
+
+def content_type(package, part_name):
+    """
+    Looks up the content type of a part in [Content_Types].xml: an Override for the part name, else the Default
+    for its extension.
+    Returns:
+        str | None: The content type, e.g. "image/png".
+    """
+    content_types = getattr(package, "_content_types", None)
+    if content_types is None:
+        root = etree.fromstring(package.read("[Content_Types].xml"))
+        content_types = package._content_types = (
+            {item.get("PartName").lstrip("/").lower(): item.get("ContentType")
+             for item in root.iterchildren(f"{{{CT_NS}}}Override")},
+            {item.get("Extension").lower(): item.get("ContentType")
+             for item in root.iterchildren(f"{{{CT_NS}}}Default")},
+        )
+    overrides, defaults = content_types
+    extension = posixpath.splitext(part_name)[1].lstrip(".").lower()
+    return overrides.get(part_name.lower(), defaults.get(extension))
+
+
+def copy_part(package, part_name, destination, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Copies a package member (e.g. word/media/image1.png) to a file in fixed-size chunks, straight from the
+    compressed stream. The image is never decoded nor held in memory as a whole.
+    Args:
+        package (zipfile.ZipFile): The opened package.
+        part_name (str): The member to copy.
+        destination: A writable binary file object.
+        chunk_size (int): Bytes copied per read.
+    """
+    with package.open(part_name) as source:
+        shutil.copyfileobj(source, destination, chunk_size)
+
+
+def iter_docx_images(package):
+    """
+    Streams the images a DOCX document displays, in document order: inline and floating (anchored) DrawingML
+    pictures as well as legacy VML images. Alternate-content fallbacks, which repeat an image for older readers,
+    are skipped, and so are linked (not embedded) images.
+    Args:
+        package (zipfile.ZipFile): The opened DOCX package.
+    Yields:
+        tuple: (paragraph number, image part name). The paragraph number is the 1-based position of the containing
+            paragraph in python-docx's Document.paragraphs, or None for images in tables, text boxes and the like.
+    """
+    document_part = main_document_part(package)
+    relationships = part_relationships(package, document_part)
+    paragraphs = 0
+    with package.open(document_part) as stream:
+        for _, element in etree.iterparse(stream, events=("end",), tag=(A_BLIP, V_IMAGEDATA, W_P, W_TBL, W_SDT),
+                                          huge_tree=True):
+            parent = element.getparent()
+            if element.tag == A_BLIP or element.tag == V_IMAGEDATA:
+                relationship = relationships.get(element.get(R_EMBED if element.tag == A_BLIP else R_ID))
+                if relationship is None or relationship[2]:
+                    continue
+                paragraph, ancestor = None, parent
+                while ancestor is not None:
+                    if ancestor.tag == MC_FALLBACK:
+                        break
+                    if ancestor.tag == W_P and paragraph is None:
+                        paragraph = ancestor
+                    ancestor = ancestor.getparent()
+                else:
+                    in_body = paragraph is not None and paragraph.getparent().tag == W_BODY
+                    yield (paragraphs + 1 if in_body else None), relationship[1]
+            elif parent is not None and parent.tag == W_BODY:
+                if element.tag == W_P:
+                    paragraphs += 1
+                release(element)
+
+
+def pptx_slide_parts(package):
+    """
+    Lists the slide parts of a PPTX package in presentation order (the order of p:sldIdLst, which is not
+    necessarily the numbering of the slideN.xml file names).
+    Args:
+        package (zipfile.ZipFile): The opened PPTX package.
+    Returns:
+        list: Slide part names, e.g. ["ppt/slides/slide1.xml", ...].
+    """
+    presentation_part = main_document_part(package, "ppt/presentation.xml")
+    relationships = part_relationships(package, presentation_part)
+    root = etree.fromstring(package.read(presentation_part))
+    slide_ids = root.find(p("sldIdLst"))
+    if slide_ids is None:
+        return []
+    return [relationships[slide_id.get(R_ID)][1] for slide_id in slide_ids.iterchildren(p("sldId"))]
+
+
+def shape_id(shape):
+    """
+    Returns the id of a slide shape from its non-visual properties (p:nvSpPr/p:cNvPr and equivalents).
+    """
+    for properties in shape:
+        c_nv_pr = properties.find(p("cNvPr"))
+        if c_nv_pr is not None:
+            return int(c_nv_pr.get("id"))
+    return None
+
+
+def drawing_paragraph_text(paragraph):
+    """
+    Returns the text of an a:p element as python-pptx's paragraph.text does: runs, fields, and "\v" for line breaks.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == A_R or child.tag == A_FLD:
+            t = child.find(A_T)
+            parts.append(t.text or "" if t is not None else "")
+        elif child.tag == A_BR:
+            parts.append("\v")
+    return "".join(parts)
+
+
+def drawing_run_font(properties):
+    """
+    Reads the direct formatting of an a:rPr element.
+    Returns:
+        tuple: (typeface, size in points, SpanColumns flags, 0xRRGGBB color); None for what the run does not set.
+    """
+    if properties is None:
+        return None, None, 0, None
+    latin = properties.find(a("latin"))
+    size = properties.get("sz")  # Hundredths of a point
+    flags = (FLAG_BOLD if properties.get("b") in ("1", "true") else 0) | \
+        (FLAG_ITALIC if properties.get("i") in ("1", "true") else 0) | \
+        (FLAG_SUPERSCRIPT if int(properties.get("baseline", "0")) > 0 else 0)
+    color = properties.find(f"{a('solidFill')}/{a('srgbClr')}")
+    return (latin.get("typeface") if latin is not None else None, int(size) / 100 if size else None, flags,
+            int(color.get("val"), 16) if color is not None else None)
+
+
+def _text_records(shape, relationships, slide_folder, text, links, spans=None):
+    """
+    Collects the paragraphs of a p:sp shape into text records and link candidates (see read_pptx_slide),
+    and, when a spans list is given, each run's (paragraph index, text, font, size, flags, color).
+    """
+    body = shape.find(P_TX_BODY)
+    if body is None:
+        return
+    for paragraph in body.iterchildren(A_P):
+        paragraph_text, style, linked_text, link = "", "normal", "", None
+        for run in paragraph.iterchildren(A_R):
+            t = run.find(A_T)
+            run_text = t.text or "" if t is not None else ""
+            paragraph_text += run_text
+            properties = run.find(A_RPR)
+            if spans is not None and run_text:
+                spans.append((len(text), run_text, *drawing_run_font(properties)))
+            if properties is None:
+                continue
+            size = properties.get("sz")
+            # Bold or larger than 200000 EMU (sz is in hundredths of a point, 127 EMU each) marks a heading
+            if properties.get("b") in ("1", "true") or (size and int(size) * 127 > 200000):
+                style = "Heading"
+            click = properties.find(a("hlinkClick"))
+            rel_id = click.get(R_ID) if click is not None else None
+            if rel_id and rel_id in relationships:
+                kind, target, external = relationships[rel_id]
+                address = target if external else posixpath.relpath(target, slide_folder)
+                if address:
+                    link = link or address
+                    linked_text += run_text
+        text.append((paragraph_text, style))
+        if link and linked_text:
+            links.append((linked_text, link))
+
+
+def _table_rows(frame):
+    """
+    Returns the cell text of a table graphic frame as a list of rows, or None if the frame holds something else.
+    """
+    data = frame.find(f"{a('graphic')}/{a('graphicData')}")
+    if data is None or data.get("uri") != TABLE_URI:
+        return None
+    rows = []
+    for row in data.iterfind(f"{a('tbl')}/{a('tr')}"):
+        cells = []
+        for cell in row.iterchildren(a("tc")):
+            body = cell.find(a("txBody"))
+            cells.append("\n".join(drawing_paragraph_text(paragraph) for paragraph in body.iterchildren(A_P))
+                         if body is not None else "")
+        rows.append(cells)
+    return rows
+
+
+def read_pptx_slide(package, slide_part, spans=False):
+    """
+    Parses one slide part and its relationships without python-pptx, collecting text, links, pictures and tables
+    in a single traversal. Shapes inside group shapes (at any depth) are visited too, in document order.
+    The slide XML is parsed incrementally and each shape is released once read.
+    Args:
+        package (zipfile.ZipFile): The opened PPTX package.
+        slide_part (str): The slide part name.
+        spans (bool): Also collect the font properties of every text run.
+    Returns:
+        dict: "text" -> [(paragraph text, style)], "links" -> [(linked text, address)] per linked paragraph,
+            "pictures" -> [(shape id, image part name)], "tables" -> [(shape id, rows of cell text)], and with
+            spans=True "spans" -> [(index into "text", run text, typeface, size, flags, color)].
+    """
+    relationships = part_relationships(package, slide_part)
+    slide_folder = posixpath.dirname(slide_part)
+    slide = {"text": [], "links": [], "pictures": [], "tables": []}
+    if spans:
+        slide["spans"] = []
+    with package.open(slide_part) as stream:
+        for _, shape in etree.iterparse(stream, events=("end",), tag=SLIDE_SHAPES):
+            parent = shape.getparent()
+            if parent is None or (parent.tag != P_SP_TREE and parent.tag != P_GRP_SP):
+                continue  # E.g. a shape inside a graphic frame's alternate content
+            is_placeholder = shape.find(f"*/{p('nvPr')}/{p('ph')}") is not None
+            if shape.tag == P_SP:
+                _text_records(shape, relationships, slide_folder, slide["text"], slide["links"], slide.get("spans"))
+            elif shape.tag == P_PIC and not is_placeholder \
+                    and shape.find(f"{p('nvPicPr')}/{p('nvPr')}/{a('videoFile')}") is None:
+                blip = shape.find(f"{p('blipFill')}/{a('blip')}")
+                relationship = relationships.get(blip.get(R_EMBED)) if blip is not None else None
+                if relationship is not None and not relationship[2]:
+                    slide["pictures"].append((shape_id(shape), relationship[1]))
+            elif shape.tag == P_GRAPHIC_FRAME:
+                rows = _table_rows(shape)
+                if rows is not None:
+                    slide["tables"].append((shape_id(shape), rows))
+            release(shape)
+    return slide
+
+
+def read_pptx_slides(source, slide_parts, spans=False):
+    """
+    Opens the package once and parses a batch of slides. Used directly and as the unit of work for worker processes.
+    """
+    with open_package(source) as package:
+        return [read_pptx_slide(package, slide_part, spans) for slide_part in slide_parts]
+
+
+def iter_pptx_slides(source, workers=1, batch_size=32, slides=None, spans=False):
+    """
+    Parses the slides of a PPTX file, in presentation order, optionally spreading batches of slides over
+    worker processes. Each worker opens its own view of the package, so no python-pptx objects are shared.
+    Args:
+        source: A filesystem path or in-memory PPTX.
+        workers (int): Number of processes; 1 parses in the calling process.
+        batch_size (int): Slides per task sent to a worker.
+        slides (container, optional): 1-based numbers of the slides to parse (anything supporting `in`).
+            The others are skipped without being read. Defaults to every slide.
+        spans (bool): Also collect the font properties of every text run (see read_pptx_slide).
+    Yields:
+        tuple: (slide number, slide dict from read_pptx_slide).
+    """
+    with open_package(source) as package:
+        numbered = [(number, part) for number, part in enumerate(pptx_slide_parts(package), start=1)
+                    if slides is None or number in slides]
+    slide_numbers = [number for number, _ in numbered]
+    slide_parts = [part for _, part in numbered]
+    if workers <= 1 or len(slide_parts) <= batch_size:
+        yield from zip(slide_numbers, read_pptx_slides(source, slide_parts, spans))
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Every task reopens the package, so use at most a few batches per worker
+    batch_size = max(batch_size, -(-len(slide_parts) // (workers * 4)))
+    batches = [slide_parts[start:start + batch_size] for start in range(0, len(slide_parts), batch_size)]
+    slide_numbers = iter(slide_numbers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Results come back in order
+        for parsed in pool.map(read_pptx_slides, [source] * len(batches), batches, [spans] * len(batches)):
+            for slide in parsed:
+                yield next(slide_numbers), slide
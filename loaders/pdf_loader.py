@@ -3,7 +3,7 @@ from PyPDF2 import PdfReader
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from loaders.file_loader import AbstractFileLoader
+from loaders.file_loader import AbstractFileLoader, is_file_path, open_stream, read_header, describe_source
 
 class PDFLoader(AbstractFileLoader):
     """
@@ -14,18 +14,24 @@ class PDFLoader(AbstractFileLoader):
     def check_file(self, filepath):
         """
         Validates that the specified file path ends with '.pdf' to ensure it's a PDF file.
+        In-memory sources (bytes, BytesIO, mmap) have no extension, so their header is checked for the PDF signature instead.
         
         Args:
-            filepath (str): The path to the file that needs validation.
+            filepath (str | bytes | io.BytesIO | mmap.mmap): The path or in-memory document that needs validation.
         
         Raises:
             ValueError: If the file extension is not .pdf.
         """
-        # Check if the file's extension is '.pdf'
-        if not filepath.lower().endswith('.pdf'):
+        if is_file_path(filepath):
+            # Check if the file's extension is '.pdf'
+            valid = str(filepath).lower().endswith('.pdf')
+        else:
+            # PDF readers tolerate leading junk, so look for the signature within the first kilobyte
+            valid = b"%PDF" in read_header(filepath, 1024)
+        if not valid:
             sys.exit(f"Invalid file format. Expected a PDF file.")
             raise ValueError("Invalid file format. Expected a PDF file.")
-        print(f"Validated PDF file: {filepath}")
+        print(f"Validated PDF file: {describe_source(filepath)}")
 
     def open_file(self, filepath):
         """
@@ -33,7 +39,7 @@ class PDFLoader(AbstractFileLoader):
         and data extraction from the PDF.
         
         Args:
-            filepath (str): The path to the file that needs to be loaded.
+            filepath (str | bytes | io.BytesIO | mmap.mmap): The path or in-memory document that needs to be loaded.
         
         Returns:
             PdfReader: An object that represents the opened PDF file.
@@ -41,8 +47,8 @@ class PDFLoader(AbstractFileLoader):
         # Validate the file to ensure it is a PDF
         try:
             self.check_file(filepath)
-            reader = PdfReader(filepath)
-            print(f"Loaded PDF file: {filepath}")
+            reader = PdfReader(open_stream(filepath))
+            print(f"Loaded PDF file: {describe_source(filepath)}")
             return reader
             # Return the PdfReader object for potential further processing outside this method
         except:
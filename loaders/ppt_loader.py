@@ -3,7 +3,7 @@ import logging
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from loaders.file_loader import AbstractFileLoader
+from loaders.file_loader import AbstractFileLoader, is_file_path, open_stream, read_header, describe_source
 import sys  # Import sys for using sys.exit()
 
 class PPTLoader(AbstractFileLoader):
@@ -14,32 +14,37 @@ class PPTLoader(AbstractFileLoader):
     def check_file(self, filepath):
         """
         Validates that the specified file path ends with '.pptx'.
+        In-memory sources (bytes, BytesIO, mmap) are checked for the ZIP container signature instead.
 
         Args:
-        filepath (str): The path to the file to validate.
+        filepath (str | bytes | io.BytesIO | mmap.mmap): The path or in-memory document to validate.
 
         Raises:
         ValueError: If the file extension is not .pptx.
         """
-        if not filepath.lower().endswith('.pptx'):
-            logging.error(f"Invalid file format for PPT loader: {filepath}")
-            sys.exit(f"Stopping the process due to invalid file format for PPT loader: {filepath}")
+        if is_file_path(filepath):
+            valid = str(filepath).lower().endswith('.pptx')
+        else:
+            valid = read_header(filepath, 4) == b"PK\x03\x04"  # .pptx files are ZIP packages
+        if not valid:
+            logging.error(f"Invalid file format for PPT loader: {describe_source(filepath)}")
+            sys.exit(f"Stopping the process due to invalid file format for PPT loader: {describe_source(filepath)}")
 
     def open_file(self, filepath):
         """
         Loads a PPTX file and returns a Presentation object.
 
         Args:
-        filepath (str): The path to the file to load.
+        filepath (str | bytes | io.BytesIO | mmap.mmap): The path or in-memory document to load.
 
         Raises:
         IOError: If the file cannot be opened or read.
         """
         try:
             self.check_file(filepath)
-            ppt = Presentation(filepath)
-            print(f"Loaded PPTX file: {filepath}")
+            ppt = Presentation(open_stream(filepath))
+            print(f"Loaded PPTX file: {describe_source(filepath)}")
             return ppt
         except Exception as e:
             logging.error(f"Unable to open or read the PPT file due to corruption or other issues: {e}")
-            sys.exit(f"Stopping the process due to a critical error with the file: {filepath}")
\ No newline at end of file
+            sys.exit(f"Stopping the process due to a critical error with the file: {describe_source(filepath)}")
\ No newline at end of file
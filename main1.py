@@ -1,13 +1,10 @@
 import os
-import json
 import sys
-from widget import upload_file
+import argparse
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from Storage.sql_storage import SQLStorage
-from loaders.pdf_loader import PDFLoader
-from loaders.ppt_loader import PPTLoader
-from loaders.docx_loader import DOCXLoader
-from data_extractor1 import DataExtractor
+from data_extractor1 import DEFAULT_STAGES, STAGES, PageSelection, detect_format
+from pipeline import Pipeline, SINKS, build_sinks
+from extraction_watchdog import ExtractionTimeout
 from dotenv import load_dotenv
 
 load_dotenv("config.env")  # Load environment variables from 'config.env'
@@ -21,119 +18,87 @@ def ensure_directory(path):
     if not os.path.exists(path):
         os.makedirs(path)  # Make directory if it does not exist.
 
-def save_to_file(data, filename):
+def parse_list(value, choices, parser, option):
     """
-    Serializes data to a JSON file.
-    Args:
-        data: Data to be serialized.
-        filename (str): Path to the output JSON file.
+    Splits a comma-separated option value and checks every item against the allowed choices.
     """
-    with open(filename, 'w', encoding='utf-8') as file:
-        json.dump(data, file, ensure_ascii=False, indent=4)  # Write data as pretty-printed JSON.
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in choices]
+    if unknown or not items:
+        parser.error(f"{option} must be a comma-separated list of: {', '.join(choices)}")
+    return items
 
 
 def main():
-    # Retrieve database credentials from environment variables
-    db_host = os.getenv("DB_HOST")
-    db_user = os.getenv("DB_USERNAME")
-    db_password = os.getenv("PASSWORD")
-    db_name = os.getenv("DATABASE")
-    # Create the base directory structure for outputs
-    base_output_folder = "output"
-    ensure_directory(base_output_folder)  # Ensure the base output directory exists
-
-    # Define subdirectories for each type of content
-    output_folders = {
-        "text": os.path.join(base_output_folder, "text"),
-        "links": os.path.join(base_output_folder, "links"),
-        "images": os.path.join(base_output_folder, "images"),
-        "tables": os.path.join(base_output_folder, "tables")
-    }
-
-    # Ensure subdirectories for each file format within each content type
-    for category, folder in output_folders.items():
-        ensure_directory(os.path.join(folder, "pdf"))
-    
-    file_path = upload_file()
+    parser = argparse.ArgumentParser(description="Extract text, links, images and tables from PDF, DOCX and PPTX files.")
+    parser.add_argument("file", nargs="?", help="Document to process. Opens a file dialog when omitted.")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES),
+                        help=f"Stages to run, any of {','.join(STAGES)} (default: {','.join(DEFAULT_STAGES)})")
+    parser.add_argument("--sinks", default="json,mysql", help=f"Where to write results, any of {','.join(SINKS)}")
+    parser.add_argument("--output", default="output", help="Output folder for images, tables and the json/jsonl sinks")
+    parser.add_argument("--per-document", action="store_true",
+                        help="Write each document's files to its own folder under --output, keyed by content hash")
+    parser.add_argument("--sqlite", default="extracted_data.db", help="Database file for the sqlite sink")
+    parser.add_argument("--index", default="search_index.db", help="Database file for the index sink")
+    parser.add_argument("--compress", choices=["gzip", "zstd"], help="Compress json/jsonl output files")
+    parser.add_argument("--pretty", action="store_true", help="Indent json output files for reading by eye")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to parse PPTX slides in parallel")
+    parser.add_argument("--no-layout", action="store_true",
+                        help="Keep PDF text blocks in content-stream order instead of detecting columns and reading order")
+    parser.add_argument("--boilerplate", choices=["reference", "drop"],
+                        help="Store running headers, footers and page numbers once per document and reference them "
+                             "from the pages, or drop them from the text entirely")
+    parser.add_argument("--table-reopen-pages", type=int,
+                        help="Reopen PDFs every N pages while extracting tables, to keep memory flat on long documents")
+    parser.add_argument("--table-max-rss", type=float,
+                        help="Memory ceiling in MB for PDF table extraction; the document is reopened when it is reached")
+    parser.add_argument("--page-timeout", type=float,
+                        help="Seconds a stage may spend on one page before the document is stopped with a partial result")
+    parser.add_argument("--document-timeout", type=float,
+                        help="Seconds the document may take before it is stopped with a partial result")
+    parser.add_argument("--pages", help="PDF pages or PPTX slides to extract, e.g. 1-20 or 5-8,12 (default: all)")
+    args = parser.parse_args()
+
+    stages = parse_list(args.stages, STAGES, parser, "--stages")
+    try:
+        pages = args.pages and PageSelection(args.pages)
+    except ValueError as e:
+        parser.error(f"--pages: {e}")
+    sink_names = parse_list(args.sinks, SINKS, parser, "--sinks")
+
+    file_path = args.file
+    if not file_path:
+        from widget import upload_file  # Only needs tkinter when no file is given on the command line
+        file_path = upload_file()
     if file_path:
         # Process the uploaded file as needed
         print(f"Processing file: {file_path}")
     else:
         print("No file to process.")
-    #file_path = 'Sample_file/sample.pdf'
-
-    loader = None
-    file_format = None
-
-    if file_path.endswith(".pdf"):
-        loader = PDFLoader()
-        file_format = "pdf"
-    elif file_path.endswith(".docx"):
-        loader = DOCXLoader()
-        file_format = "docx"
-    elif file_path.endswith(".pptx"):
-        loader = PPTLoader()
-        file_format = "pptx"
-    else:
-        print(f"Unsupported file format for {file_path}")
         return
 
-    if loader is None:
-        print(f"Loader for file {file_path} could not be determined.")
+    if detect_format(file_path) is None:
+        print(f"Unsupported file format for {file_path}")
         return
-    
-    loader.filepath = file_path
-
-
-
-    extractor = DataExtractor(loader)
-
-    extracted_text = extractor.extract_text()
-    if extracted_text:
-        save_to_file(extracted_text, os.path.join(output_folders["text"], file_format, f"{file_format}_text.json"))
-
-    # Define a list of tasks for each content type: links, images, and tables
-    tasks = [
-        ("links", "extract_links", "links"),
-        ("images", "extract_images", "images"),
-        ("tables", "extract_tables", None)  # No need for output folder for tables as it stores directly in DB
-    ]
-
-    # Loop through each task (links, images, tables) for each file format (PDF, DOCX, PPTX)
-    for category, extract_method, output_type in tasks:
-        extracted_data = getattr(extractor, extract_method)()  # Dynamically call the extraction method
-        
-        if extracted_data: 
-            # If the task is to store in a file (for links and images), save to the appropriate output folder
-            if output_type:
-                output_path = os.path.join(output_folders[output_type], file_format, f"{file_format}_{category}.json")
-                save_to_file(extracted_data, output_path)
-                print(f"{category.capitalize()} extraction completed and saved.")
-        else:
-            print(f"No {category} data extracted.")
-                
-
-    # Setup SQLStorage using the credentials from environment variables
-    storage = SQLStorage(host=db_host, user=db_user, password=db_password, database=db_name)
-
-    # Check if the connection to the MySQL database is successful
-    if storage.connection.is_connected():
-        print("Successfully connected to the MySQL database")
-    else:
-        print("Failed to connect to the MySQL database")
-
-    # Store data in the database for each content type
-    for category, extract_method, _ in tasks + [("text", "extract_text", "text")]:
-            extracted_data = getattr(extractor, extract_method)()
-            getattr(storage, f"store_{category}")(extracted_data, file_format)  # Dynamically store data in the DB
-            if extracted_data:
-                getattr(storage, f"store_{category}")(extracted_data, "pdf")
-                print(f"{category.capitalize()} data stored in the database.")
-            else:
-                print(f"No {category} data to store in the database.")
 
+    ensure_directory(args.output)  # Ensure the base output directory exists
+    sinks = build_sinks(sink_names, args.output, args.sqlite, args.index, per_document=args.per_document,
+                        compression=args.compress, indent=args.pretty)
+    # Sinks write on background threads, so storing the first pages overlaps with extracting the rest
+    pipeline = Pipeline(stages, sinks, args.workers, output_root=args.output, per_document=args.per_document,
+                        async_writes=True, pages=pages, layout=not args.no_layout, boilerplate=args.boilerplate,
+                        table_reopen_pages=args.table_reopen_pages, table_max_rss=args.table_max_rss,
+                        page_timeout=args.page_timeout, document_timeout=args.document_timeout)
+    try:
+        results = pipeline.run(file_path)
+    except ExtractionTimeout as e:
+        print(f"Stopped: {e.reason}. Partial results were stored.")
+        results = e.results
+    finally:
+        pipeline.close()
+    for stage, extracted_data in results.items():
+        print(f"{stage.capitalize()}: {len(extracted_data)} records")
 
 
-# Helper functions (ensure_directory, save_to_file, etc.) should be defined as required
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,202 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_extractor1 import DataExtractor, DEFAULT_STAGES, LOADERS, STAGES, PageSelection, detect_format
+from loaders.file_loader import content_hash, is_file_path, describe_source
+from Storage.output_layout import document_dir
+from Storage.async_storage import AsyncStorage
+from extraction_watchdog import ExtractionTimeout, ExtractionWatchdog
+
+# Sinks that can be selected by name, e.g. --sinks jsonl,sqlite
+SINKS = ("json", "jsonl", "sqlite", "mysql", "index")
+
+
+def sql_storage_from_env():
+    """
+    Builds an SQLStorage from the database credentials in config.env.
+    """
+    from dotenv import load_dotenv
+    from Storage.sql_storage import SQLStorage
+
+    load_dotenv("config.env")
+    return SQLStorage(host=os.getenv("DB_HOST"), user=os.getenv("DB_USERNAME"),
+                      password=os.getenv("PASSWORD"), database=os.getenv("DATABASE"))
+
+
+def build_sinks(names, output_folder="output", sqlite_path="extracted_data.db", index_path="search_index.db",
+                per_document=False, compression=None, indent=False):
+    """
+    Creates the storage backends for a list of sink names. Backends are imported only when selected,
+    so e.g. a JSON-only run does not need the MySQL driver.
+    Args:
+        names (list): Sink names from SINKS.
+        output_folder (str): Root folder for the json/jsonl sinks.
+        sqlite_path (str): Database file for the sqlite sink.
+        index_path (str): Database file for the full-text index sink.
+        per_document (bool): Write json/jsonl files into a folder per document, keyed by content hash.
+        compression (str, optional): 'gzip' or 'zstd' to compress json/jsonl files.
+        indent (bool): Pretty-print json files.
+    Returns:
+        list: Storage instances, in the order given.
+    """
+    sinks = []
+    for name in names:
+        if name in ("json", "jsonl"):
+            from Storage.file_storage import JSONFileStorage
+            sinks.append(JSONFileStorage(output_folder, lines=name == "jsonl", per_document=per_document,
+                                         compression=compression, indent=indent))
+        elif name == "sqlite":
+            from Storage.sqlite_storage import SQLiteStorage
+            sinks.append(SQLiteStorage(sqlite_path))
+        elif name == "mysql":
+            sinks.append(sql_storage_from_env())
+        elif name == "index":
+            from Storage.search_index import SearchIndex
+            sinks.append(SearchIndex(index_path))
+        else:
+            raise ValueError(f"Unknown sink: {name}. Choose from {', '.join(SINKS)}")
+    return sinks
+
+
+class Pipeline:
+    """
+    Runs a chosen subset of extraction stages on a document and fans each stage's output out to every sink.
+
+    Each selected stage is computed exactly once; stages that were not asked for are never run.
+    Sinks are Storage backends: they are told about the document through begin_document() and then
+    receive store_<stage>(data, file_format) for every stage.
+    Images and table CSVs are written below output_root, or below output_root/<document key> with
+    per_document=True so pipelines running side by side can share one output volume.
+    With async_writes=True every sink writes on its own background thread (see AsyncStorage): database sinks
+    receive PDF results page by page while the next pages are extracted, and run() returns once all writes are done.
+    Sinks that buffer writes (AsyncStorage, GroupCommitSink) are flushed at the end of run() and aborted if
+    extraction fails.
+    With a page_timeout or document_timeout, extraction runs in a worker process under an ExtractionWatchdog.
+    A document that runs over its budget keeps the stages completed so far and the pages finished by the running
+    stage: they are stored and flushed, then run() raises ExtractionTimeout with the reason.
+    """
+
+    def __init__(self, stages=None, sinks=None, workers=1, output_root="output", per_document=False,
+                 async_writes=False, max_pending=64, pages=None, layout=True, boilerplate=None,
+                 table_reopen_pages=None, table_max_rss=None, page_timeout=None, document_timeout=None,
+                 watchdog=None):
+        """
+        Args:
+            stages (list, optional): Stage names from STAGES, in the order to run them. Defaults to DEFAULT_STAGES.
+            sinks (list, optional): Storage backends to write to. With no sinks, results are only returned.
+            workers (int): Processes used to parse PPTX slides in parallel.
+            output_root (str): Folder for extracted images and table CSVs.
+            per_document (bool): Give every document its own folder under output_root, keyed by content hash.
+            async_writes (bool): Overlap extraction with storage by writing through AsyncStorage.
+            max_pending (int): Writes each async sink may fall behind before extraction waits for it.
+            pages (str | range | iterable | PageSelection, optional): PDF pages or PPTX slides to extract,
+                e.g. "1-20". Defaults to all.
+            layout (bool): Emit PDF text in reading order (see DataExtractor).
+            boilerplate (str, optional): 'reference' or 'drop' to store running headers and footers once per
+                document instead of on every page (see DataExtractor).
+            table_reopen_pages (int, optional): Reopen PDFs every this many pages while extracting tables.
+            table_max_rss (float, optional): Resident memory ceiling in MB for PDF table extraction (see DataExtractor).
+            page_timeout (float, optional): Seconds a stage may spend on one page before the document is stopped.
+            document_timeout (float, optional): Seconds a document may take before it is stopped.
+            watchdog (ExtractionWatchdog, optional): A watchdog, and its worker process, to share with other
+                pipelines. Created from page_timeout and document_timeout when omitted.
+        """
+        self.stages = list(stages or DEFAULT_STAGES)
+        unknown = [stage for stage in self.stages if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(unknown)}. Choose from {', '.join(STAGES)}")
+        self.sinks = list(sinks or [])
+        if async_writes:
+            self.sinks = [AsyncStorage(sink, max_pending) for sink in self.sinks]
+        self.workers = workers
+        self.output_root = output_root
+        self.per_document = per_document
+        self.pages = None if pages is None else PageSelection(pages)
+        self.layout = layout
+        self.boilerplate = boilerplate
+        self.table_reopen_pages = table_reopen_pages
+        self.table_max_rss = table_max_rss
+        self._owns_watchdog = watchdog is None and bool(page_timeout or document_timeout)
+        self.watchdog = ExtractionWatchdog(page_timeout, document_timeout) if self._owns_watchdog else watchdog
+
+    def run(self, source, file_format=None, name=None):
+        """
+        Extracts the selected stages from one document.
+        Args:
+            source (str | bytes | io.BytesIO | mmap.mmap): The document path or content.
+            file_format (str, optional): 'pdf', 'docx' or 'pptx'. Detected from the path or name when omitted.
+            name (str, optional): Name recorded by the sinks. Defaults to the path.
+        Returns:
+            dict: The extracted data keyed by stage name.
+        Raises:
+            ExtractionTimeout: If the document ran over its time budget. Its results hold the stages that
+                completed; those and the running stage's finished pages have been stored.
+        """
+        name = name or (str(source) if is_file_path(source) else None)
+        file_format = file_format or detect_format(name or "")
+        if file_format not in LOADERS:
+            raise ValueError(f"Unsupported file format for {name or describe_source(source)}")
+
+        options = dict(source=source, workers=self.workers, stages=self.stages, output_dir=self.output_root,
+                       pages=self.pages, layout=self.layout, boilerplate=self.boilerplate,
+                       table_reopen_pages=self.table_reopen_pages, table_max_rss=self.table_max_rss)
+        extractor = DataExtractor(LOADERS[file_format](), **options)
+        digest = content_hash(extractor.source) if self.sinks or self.per_document else None
+        if self.per_document:
+            extractor.output_dir = document_dir(self.output_root, digest)
+        writers = [sink for sink in self.sinks if isinstance(sink, AsyncStorage)]
+        if writers:
+            def store_batch(stage, records):
+                for sink in writers:
+                    sink.store_batch(stage, records, file_format)
+            extractor.on_batch = store_batch
+
+        results = {}
+
+        def store(stage, extracted_data):
+            results[stage] = extracted_data
+            for sink in self.sinks:
+                getattr(sink, f"store_{stage}")(extracted_data, file_format)
+
+        try:
+            if self.sinks:
+                document = (digest, name, file_format, extractor.count_pages())
+                for sink in self.sinks:
+                    sink.begin_document(*document)
+
+            if self.watchdog is not None:
+                # The worker process reads the normalized source (a path or bytes) into the same output folder
+                options.update(source=extractor.source, output_dir=extractor.output_dir)
+                self.watchdog.run(file_format, options, self.stages, store, extractor.on_batch)
+            else:
+                for stage in self.stages:
+                    store(stage, getattr(extractor, STAGES[stage])() or [])
+        except ExtractionTimeout as e:
+            if e.partial:
+                store(e.stage, e.partial)  # The pages the stage finished before the timeout
+            self._flush()
+            e.results = results
+            raise
+        except BaseException:
+            for sink in self.sinks:
+                if hasattr(sink, "abort"):
+                    sink.abort()  # Roll back a half-streamed stage or drop a buffered document
+            raise
+        self._flush()
+        return results
+
+    def _flush(self):
+        for sink in self.sinks:
+            if hasattr(sink, "flush"):
+                sink.flush()  # Returns once buffered or background writes are stored
+
+    def close(self):
+        """
+        Closes the sinks that can be closed; async sinks first finish their pending writes. Stops the watchdog's
+        worker process unless the watchdog was passed in.
+        """
+        if self._owns_watchdog:
+            self.watchdog.close()
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                sink.close()
@@ -0,0 +1,196 @@
+import numpy as np
+from array import array
+
+# Span flags, using PyMuPDF's bit values so PDF flags are stored unchanged; DOCX and PPTX runs set the same bits
+FLAG_SUPERSCRIPT = 1
+FLAG_ITALIC = 2
+FLAG_SERIF = 4
+FLAG_MONOSPACE = 8
+FLAG_BOLD = 16
+
+# Column name -> array typecode while collecting, and NumPy dtype once built
+_COLUMNS = {
+    "page": ("l", np.int32),  # Page or slide number; 0 for DOCX, which has no pages
+    "block": ("l", np.int32),  # PDF block in reading order, DOCX body paragraph or PPTX paragraph on the slide
+    "line": ("l", np.int32),  # Line within the PDF block; 0 for DOCX and PPTX
+    "font": ("l", np.int32),  # Index into fonts; -1 if the run does not set a font
+    "size": ("f", np.float32),  # Point size; NaN if unknown
+    "flags": ("L", np.uint32),  # FLAG_* bits
+    "color": ("l", np.int32),  # sRGB as 0xRRGGBB; -1 if unknown
+}
+
+
+class SpanColumns:
+    """
+    Span-level font metadata of one document, kept as NumPy columns: page, block, line, font (an index into the
+    interned fonts list), size, flags, color and bbox, plus each span's text as offsets into one UTF-8 buffer.
+
+    Queries are vectorized expressions over the columns, e.g. all 18pt bold spans:
+        spans.texts((spans.size == 18) & (spans.flags & FLAG_BOLD != 0))
+    Documents are saved as .npz files (save/load) and can be concatenated for corpus-wide queries.
+    """
+
+    __slots__ = ("fonts", "_font_index", "_pending", "_bbox", "_buffer", "_ends", "_arrays", "document")
+
+    def __init__(self):
+        self.fonts = []  # Interned font names
+        self._font_index = {}
+        self._pending = {name: array(code) for name, (code, _) in _COLUMNS.items()}
+        self._bbox = array("f")  # x0, y0, x1, y1 per span; NaN when the format has no geometry
+        self._buffer = bytearray()  # UTF-8 text of every span, back to back
+        self._ends = array("Q")
+        self._arrays = None  # Built NumPy columns, invalidated by add()
+        self.document = None  # Document index per span, set by concatenate()
+
+    def font_id(self, font):
+        """
+        Returns the index of a font name in fonts, adding it if needed (-1 for None).
+        """
+        if font is None:
+            return -1
+        font_id = self._font_index.get(font)
+        if font_id is None:
+            font_id = self._font_index[font] = len(self.fonts)
+            self.fonts.append(font)
+        return font_id
+
+    def add(self, page, block, line, text, font=None, size=None, flags=0, color=None, bbox=None):
+        """
+        Appends one span (a PDF span, or a DOCX/PPTX run).
+        """
+        pending = self._pending
+        pending["page"].append(page)
+        pending["block"].append(block)
+        pending["line"].append(line)
+        pending["font"].append(self.font_id(font))
+        pending["size"].append(float("nan") if size is None else size)
+        pending["flags"].append(flags)
+        pending["color"].append(-1 if color is None else color)
+        self._bbox.extend(bbox if bbox is not None else (float("nan"),) * 4)
+        self._buffer += text.encode("utf-8")
+        self._ends.append(len(self._buffer))
+        self._arrays = None
+
+    def _columns(self):
+        if self._arrays is None:
+            columns = {name: np.array(self._pending[name], dtype=dtype) for name, (_, dtype) in _COLUMNS.items()}
+            columns["bbox"] = np.array(self._bbox, dtype=np.float32).reshape(-1, 4)
+            columns["text_ends"] = np.array(self._ends, dtype=np.int64)
+            columns["text"] = np.frombuffer(bytes(self._buffer), dtype=np.uint8)
+            self._arrays = columns
+        return self._arrays
+
+    page = property(lambda self: self._columns()["page"])
+    block = property(lambda self: self._columns()["block"])
+    line = property(lambda self: self._columns()["line"])
+    font = property(lambda self: self._columns()["font"])
+    size = property(lambda self: self._columns()["size"])
+    flags = property(lambda self: self._columns()["flags"])
+    color = property(lambda self: self._columns()["color"])
+    bbox = property(lambda self: self._columns()["bbox"])
+
+    def fonts_matching(self, name):
+        """
+        Returns a boolean mask of the spans whose font name contains `name` (case-insensitive).
+        """
+        matching = [i for i, font in enumerate(self.fonts) if name.lower() in font.lower()]
+        return np.isin(self.font, matching)
+
+    def text(self, index):
+        """
+        Returns the text of one span.
+        """
+        start = self._ends[index - 1] if index else 0
+        return self._buffer[start:self._ends[index]].decode("utf-8")
+
+    def texts(self, selection=None):
+        """
+        Returns the texts of the selected spans.
+        Args:
+            selection (array, optional): A boolean mask or an array of indexes. Defaults to all spans.
+        """
+        indexes = range(len(self)) if selection is None else np.flatnonzero(selection) \
+            if np.asarray(selection).dtype == bool else selection
+        return [self.text(int(index)) for index in indexes]
+
+    def record(self, index):
+        """
+        Returns one span as a dict, for JSON export.
+        """
+        columns = self._columns()
+        font, size, color = int(columns["font"][index]), float(columns["size"][index]), int(columns["color"][index])
+        bbox = columns["bbox"][index]
+        return {
+            "page_number": int(columns["page"][index]),
+            "block": int(columns["block"][index]),
+            "line": int(columns["line"][index]),
+            "text": self.text(index),
+            "font": self.fonts[font] if font >= 0 else None,
+            "size": None if np.isnan(size) else round(size, 2),
+            "flags": int(columns["flags"][index]),
+            "color": None if color < 0 else color,
+            "bbox": None if np.isnan(bbox).any() else [round(float(value), 2) for value in bbox],
+        }
+
+    def to_records(self):
+        """
+        Exports every span as a dict (see record()).
+        """
+        return [self.record(index) for index in range(len(self))]
+
+    def save(self, file):
+        """
+        Writes the columns to a compressed .npz file.
+        Args:
+            file (str | file object): Destination path or binary file object.
+        """
+        np.savez_compressed(file, fonts=np.array(self.fonts, dtype=str), **self._columns())
+
+    @classmethod
+    def load(cls, file):
+        """
+        Reads columns written by save().
+        """
+        spans = cls()
+        with np.load(file) as data:
+            spans.fonts = [str(font) for font in data["fonts"]]
+            spans._font_index = {font: i for i, font in enumerate(spans.fonts)}
+            for name, (code, _) in _COLUMNS.items():
+                spans._pending[name] = array(code, data[name].tolist())
+            spans._bbox = array("f", data["bbox"].ravel().tolist())
+            spans._buffer = bytearray(data["text"].tobytes())
+            spans._ends = array("Q", data["text_ends"].tolist())
+        return spans
+
+    @classmethod
+    def concatenate(cls, documents):
+        """
+        Joins the spans of several documents, e.g. loaded from a corpus of .npz files, for corpus-wide queries.
+        Font indexes are remapped onto one shared fonts list, and the `document` column records which input
+        (by position) each span came from.
+        """
+        spans = cls()
+        document_ids = array("l")
+        for number, document in enumerate(documents):
+            remap = np.array([spans.font_id(font) for font in document.fonts] + [-1], dtype=np.int32)
+            columns = document._columns()
+            for name, (code, _) in _COLUMNS.items():
+                values = remap[columns[name]] if name == "font" else columns[name]
+                spans._pending[name].extend(array(code, values.tolist()))
+            spans._bbox.extend(array("f", columns["bbox"].ravel().tolist()))
+            offset = len(spans._buffer)
+            spans._buffer += document._buffer
+            spans._ends.extend(array("Q", (columns["text_ends"] + offset).tolist()))
+            document_ids.extend(array("l", [number]) * len(document))
+        spans.document = np.array(document_ids, dtype=np.int32)
+        return spans
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def __repr__(self):
+        return f"<SpanColumns {len(self)} spans, {len(self.fonts)} fonts>"
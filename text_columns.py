@@ -0,0 +1,263 @@
+import re
+import sys
+from array import array
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_boilerplate(text):
+    """
+    Normalizes a line for recognizing running headers and footers across pages: case and whitespace are
+    ignored and every number becomes '#', so "Page 3 of 40" and "page 4 of 40" are the same line.
+    """
+    return _SPACES.sub(" ", _DIGITS.sub("#", text.lower())).strip()
+
+
+
+class TextColumns:
+    """
+    Compact, column-oriented container for the output of the text stage.
+
+    Instead of one dict per line inside one dict per page, lines are stored as columns: their UTF-8 text back to
+    back in a single buffer with an array of end offsets, and their style as an index into a list of interned
+    style labels. Pages (or slides) are an array of numbers plus an array of line offsets. A line then costs its
+    encoded text and about ten bytes, instead of a dict and two string references.
+
+    The container still reads like the list of records it replaces: len(), iteration and indexing produce the
+    usual {"page_number": n, "content": [{"text": ..., "style": ...}]} dicts on demand (or flat {"text", "style"}
+    records for formats without pages, such as DOCX), and to_records() exports the whole list, e.g. for JSON.
+
+    After deduplicate_boilerplate(), running headers and footers are kept once in `boilerplate` and the pages
+    only hold {"boilerplate": id} references to them (or nothing, if they were dropped).
+    """
+
+    __slots__ = ("page_key", "_buffer", "_ends", "_style_ids", "_styles", "_style_index", "_page_numbers",
+                 "_page_ends", "_refs", "boilerplate")
+
+    def __init__(self, page_key="page_number"):
+        """
+        Args:
+            page_key (str | None): Name of the page field in exported records: 'page_number' for PDF,
+                'slide_number' for PPTX, or None for a flat list of lines (DOCX paragraphs).
+        """
+        self.page_key = page_key
+        self._buffer = bytearray()  # UTF-8 text of every line, back to back
+        self._ends = array("Q")  # End offset of each line in _buffer
+        self._style_ids = array("H")  # Index of each line's style in _styles
+        self._styles = []  # Interned style labels
+        self._style_index = {}
+        self._page_numbers = array("l")
+        self._page_ends = array("Q")  # Number of lines up to and including each page
+        self._refs = None  # Boilerplate id of each line (-1 for ordinary lines), once boilerplate is referenced
+        self.boilerplate = None  # Set by deduplicate_boilerplate(): [(text, style, region, page numbers)]
+
+    @classmethod
+    def from_records(cls, records, page_key=None):
+        """
+        Builds the container from text stage records in the list-of-dicts shape.
+        Args:
+            records (list): Records as returned by to_records().
+            page_key (str, optional): 'page_number' or 'slide_number'. Detected from the first record when omitted.
+        Returns:
+            TextColumns
+        """
+        records = list(records)
+        if page_key is None and records and "content" in records[0]:
+            page_key = "page_number" if "page_number" in records[0] else "slide_number"
+        columns = cls(page_key)
+        for record in records:
+            if page_key is None:
+                columns.add_line(record["text"], record.get("style"))
+            else:
+                columns.add_page(record[page_key], ((line["text"], line.get("style")) for line in record["content"]))
+        return columns
+
+    def _style_id(self, style):
+        style_id = self._style_index.get(style)
+        if style_id is None:
+            style_id = self._style_index[style] = len(self._styles)
+            self._styles.append(style)
+        return style_id
+
+    def add_line(self, text, style=None):
+        """
+        Appends a line (or paragraph). For paged containers it belongs to the last page added.
+        """
+        self._buffer += text.encode("utf-8")
+        self._ends.append(len(self._buffer))
+        self._style_ids.append(self._style_id(style))
+        if self._refs is not None:
+            self._refs.append(-1)
+
+    def add_page(self, number, lines):
+        """
+        Appends a page or slide.
+        Args:
+            number (int): The page or slide number.
+            lines (iterable): (text, style) pairs, in reading order.
+        """
+        for text, style in lines:
+            self.add_line(text, style)
+        self._page_numbers.append(number)
+        self._page_ends.append(len(self._ends))
+
+    @property
+    def line_count(self):
+        return len(self._ends)
+
+    def add_reference(self, boilerplate_id):
+        """
+        Appends a reference to an entry of self.boilerplate in place of a line.
+        """
+        if self._refs is None:
+            self._refs = array("l", [-1]) * len(self._ends)
+        self.add_line("", None)
+        self._refs[-1] = boilerplate_id
+
+    def _ref(self, index):
+        return -1 if self._refs is None else self._refs[index]
+
+    def line(self, index):
+        """
+        Returns the (text, style) pair of the line at a document-wide index. References to boilerplate read
+        as empty lines.
+        """
+        start = self._ends[index - 1] if index else 0
+        return self._buffer[start:self._ends[index]].decode("utf-8"), self._styles[self._style_ids[index]]
+
+    def _page_range(self, index):
+        return range(self._page_ends[index - 1] if index else 0, self._page_ends[index])
+
+    def page_lines(self, index):
+        """
+        Returns the (text, style) pairs of the index-th stored page.
+        """
+        return [self.line(line) for line in self._page_range(index)]
+
+    def record(self, index):
+        """
+        Builds the record at an index in the list-of-dicts shape: a page dict, or a line dict for flat containers.
+        """
+        if self.page_key is None:
+            text, style = self.line(index)
+            return {"text": text, "style": style}
+        return {self.page_key: self._page_numbers[index], "content": [self._line_record(line)
+                                                                      for line in self._page_range(index)]}
+
+    def _line_record(self, index):
+        ref = self._ref(index)
+        if ref >= 0:
+            return {"boilerplate": ref}
+        text, style = self.line(index)
+        return {"text": text, "style": style}
+
+    def deduplicate_boilerplate(self, min_pages=3, edge_lines=2, max_length=160, drop=False):
+        """
+        Finds running headers, footers and page numbers: short lines among the first or last edge_lines of a
+        page whose normalized form (see normalize_boilerplate) recurs in the same place on at least min_pages pages.
+        Args:
+            min_pages (int): Pages a line must appear on to count as boilerplate.
+            edge_lines (int): Lines at the top and at the bottom of each page that are considered.
+            max_length (int): Longer lines (such as merged paragraphs) are never boilerplate.
+            drop (bool): Leave boilerplate out of the pages entirely instead of referencing it.
+        Returns:
+            TextColumns: A copy whose pages reference (or omit) the boilerplate lines, which are kept once in
+                its `boilerplate` list as (text of the first occurrence, style, 'header' or 'footer', page numbers).
+                Containers without pages are returned unchanged.
+        """
+        if self.page_key is None:
+            return self
+        candidates, pages_of = [], {}
+        for index, page_number in enumerate(self._page_numbers):
+            lines = self._page_range(index)
+            marks = {}
+            for line in list(lines[:edge_lines]) + list(lines[-edge_lines:]):
+                if line not in marks and self._ends[line] - (self._ends[line - 1] if line else 0) <= max_length:
+                    region = "header" if line - lines.start < edge_lines else "footer"
+                    key = marks[line] = (region, normalize_boilerplate(self.line(line)[0]))
+                    pages_of.setdefault(key, []).append(page_number)
+            candidates.append(marks)
+
+        deduplicated = TextColumns(self.page_key)
+        deduplicated.boilerplate, ids = [], {}
+        for index, page_number in enumerate(self._page_numbers):
+            for line in self._page_range(index):
+                key = candidates[index].get(line)
+                text, style = self.line(line)
+                if key is None or len(set(pages_of[key])) < min_pages or not text:
+                    deduplicated.add_line(text, style)
+                    continue
+                if key not in ids:
+                    ids[key] = len(deduplicated.boilerplate)
+                    deduplicated.boilerplate.append((text, style, key[0], sorted(set(pages_of[key]))))
+                if not drop:
+                    deduplicated.add_reference(ids[key])
+            deduplicated._page_numbers.append(page_number)
+            deduplicated._page_ends.append(len(deduplicated._ends))
+        return deduplicated
+
+    def boilerplate_records(self):
+        """
+        Exports the boilerplate found by deduplicate_boilerplate() as one record per distinct line.
+        """
+        return [{"page_number": pages[0], "boilerplate_id": index, "region": region, "style": style, "text": text,
+                 "pages": pages} for index, (text, style, region, pages) in enumerate(self.boilerplate or ())]
+
+    def iter_lines(self):
+        """
+        Yields (page_number, position, style, text) for every non-empty line, as Storage.storage.iter_text_lines
+        does for the list-of-dicts shape, without building any dicts.
+        """
+        if self.page_key is None:
+            for index in range(len(self._ends)):
+                text, style = self.line(index)
+                if text:
+                    yield None, index, style, text
+            return
+        for index, page_number in enumerate(self._page_numbers):
+            for position, line in enumerate(self._page_range(index)):
+                text, style = self.line(line)
+                if text:
+                    yield page_number, position, style, text
+
+    def to_records(self):
+        """
+        Exports the text in the original shape: a list of page (or slide) dicts, or of line dicts.
+        """
+        return [self.record(index) for index in range(len(self))]
+
+    def nbytes(self):
+        """
+        Approximate memory held by the container, in bytes.
+        """
+        return sum(sys.getsizeof(column) for column in (self._buffer, self._ends, self._style_ids,
+                                                         self._page_numbers, self._page_ends, self._refs)) + \
+            sum(sys.getsizeof(style) for style in self._styles)
+
+    def __len__(self):
+        return len(self._ends) if self.page_key is None else len(self._page_numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TextColumns index out of range")
+        return self.record(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def __eq__(self, other):
+        if isinstance(other, TextColumns):
+            other = other.to_records()
+        return isinstance(other, list) and self.to_records() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        unit = "lines" if self.page_key is None else "pages"
+        return f"<TextColumns {len(self)} {unit}, {self.line_count} lines, {len(self._styles)} styles>"
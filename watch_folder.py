@@ -0,0 +1,324 @@
+import os
+import sys
+import time
+import select
+import struct
+import sqlite3
+import argparse
+import ctypes
+import ctypes.util
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_extractor1 import DEFAULT_STAGES, detect_format
+from pipeline import Pipeline, SINKS, build_sinks
+from extraction_watchdog import ExtractionTimeout
+from loaders.file_loader import content_hash
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def is_candidate(filename):
+    """
+    Decides whether a directory entry should be picked up: supported formats only, skipping hidden files,
+    Office lock files (~$name.docx) and partial uploads.
+    """
+    name = os.path.basename(filename)
+    if name.startswith((".", "~$")) or name.endswith((".tmp", ".part", ".crdownload")):
+        return False
+    return detect_format(name) is not None
+
+
+class InotifyWatcher:
+    """
+    Minimal inotify wrapper (via ctypes, Linux only) reporting file names that were written, created or moved
+    into a single directory.
+    """
+
+    def __init__(self, directory):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout):
+        """
+        Waits up to `timeout` seconds for events.
+        Returns:
+            tuple: (set of file names that changed, True if the kernel queue overflowed and a rescan is needed)
+        """
+        names, overflow = set(), False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return names, overflow
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names, overflow
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif name:
+                names.add(os.fsdecode(name))
+        return names, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class WatchState:
+    """
+    Remembers which files were already processed (by size, mtime and content hash) in a SQLite database,
+    so the daemon picks up only new or changed files, including after a restart.
+    """
+
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS processed_files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            processed_at REAL NOT NULL
+        )
+        """)
+        self.connection.commit()
+
+    def get(self, path):
+        return self.connection.execute(
+            "SELECT size, mtime_ns, sha256 FROM processed_files WHERE path = ?", (path,)).fetchone()
+
+    def is_unchanged(self, path, stat):
+        """
+        Cheap check: True if the file has the same size and mtime as when it was last processed.
+        """
+        row = self.get(path)
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns
+
+    def record(self, path, stat, sha256):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO processed_files (path, size, mtime_ns, sha256, processed_at) VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, sha256, time.time()))
+        self.connection.commit()
+
+    def forget(self, path):
+        """
+        Drops a file that no longer exists, so a new file under the same path is processed.
+        """
+        self.connection.execute("DELETE FROM processed_files WHERE path = ?", (path,))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class FolderWatcher:
+    """
+    Watches an inbox directory and hands every new or changed document to a handler once it is fully written.
+
+    Change notifications come from inotify when available, otherwise from periodic directory scans. Either way,
+    a file is only considered complete once its size and mtime have stayed the same for `settle_seconds`.
+    Before running the handler the content hash is compared with the stored state, so a file that was merely
+    touched or re-copied with identical content is not processed again.
+    """
+
+    def __init__(self, directory, handler, state, settle_seconds=2.0, poll_interval=5.0, use_inotify=True):
+        """
+        Args:
+            directory (str): The inbox directory to watch.
+            handler (callable): Called as handler(path, file_format) for each ready file.
+            state (WatchState): Persistent record of processed files.
+            settle_seconds (float): How long a file must stay unchanged before it is considered fully written.
+            poll_interval (float): Seconds between directory scans when polling.
+            use_inotify (bool): Try inotify first; falls back to polling if it is unavailable.
+        """
+        self.directory = os.path.abspath(directory)
+        self.handler = handler
+        self.state = state
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.pending = {}  # path -> (size, mtime_ns, time the current size/mtime was first seen)
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = InotifyWatcher(self.directory)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable ({e}); falling back to polling every {poll_interval}s")
+
+    def scan(self):
+        """
+        Marks every candidate file whose size or mtime differs from the stored state as pending.
+        """
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and is_candidate(entry.name):
+                    self._touch(entry.path)
+
+    def _touch(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.pending.pop(path, None)
+            return
+        if path not in self.pending and self.state.is_unchanged(path, stat):
+            return
+        size, mtime_ns, _ = self.pending.get(path, (None, None, None))
+        if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            self.pending[path] = (stat.st_size, stat.st_mtime_ns, time.monotonic())
+
+    def process_ready(self):
+        """
+        Runs the handler on pending files that have settled. Returns the number of files handled.
+        """
+        handled = 0
+        now = time.monotonic()
+        for path in list(self.pending):
+            self._touch(path)  # Re-stat: a file still being written resets its settle timer
+            if path not in self.pending or now - self.pending[path][2] < self.settle_seconds:
+                continue
+            del self.pending[path]
+            try:
+                stat = os.stat(path)
+                sha256 = content_hash(path)
+            except FileNotFoundError:
+                self.state.forget(path)  # Moved or deleted since it settled, e.g. a temporary file renamed upstream
+                continue
+            except PermissionError as e:
+                print(f"Cannot read {path}: {e}")
+                continue  # Picked up again when it changes
+            previous = self.state.get(path)
+            if previous is not None and previous[2] == sha256:
+                self.state.record(path, stat, sha256)  # Same content, new mtime: remember it and move on
+                continue
+            try:
+                self.handler(path, detect_format(path))
+            except BaseException as e:  # Loaders stop with SystemExit on unreadable files
+                if isinstance(e, KeyboardInterrupt):
+                    raise
+                print(f"Failed to process {path}: {e}")
+                continue  # Not recorded, so it is retried when it changes or the daemon restarts
+            self.state.record(path, stat, sha256)
+            handled += 1
+        return handled
+
+    def run(self, once=False):
+        """
+        Watches the directory until interrupted. With once=True, processes what is currently in the inbox and returns.
+        """
+        self.scan()
+        last_scan = time.monotonic()
+        while True:
+            timeout = min(self.settle_seconds, self.poll_interval) if self.pending else self.poll_interval
+            if self.inotify is not None:
+                names, overflow = self.inotify.read(timeout)
+                for name in names:
+                    if is_candidate(name):
+                        self._touch(os.path.join(self.directory, name))
+                if overflow:
+                    self.scan()
+            else:
+                if not once:
+                    time.sleep(timeout)
+                if time.monotonic() - last_scan >= self.poll_interval:
+                    self.scan()
+                    last_scan = time.monotonic()
+            self.process_ready()
+            if once and not self.pending:
+                return
+            if once:
+                time.sleep(min(self.settle_seconds, 0.5))
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+
+
+def extract_with(pipeline):
+    """
+    Builds a handler that runs each ready file through an extraction Pipeline in-process.
+    A file that runs over the pipeline's time budget counts as processed: its partial result is stored.
+    """
+    def handler(path, file_format):
+        try:
+            pipeline.run(path, file_format)
+        except ExtractionTimeout as e:
+            print(f"Partially processed {path}: {e.reason}")
+            return
+        print(f"Processed {path}")
+    return handler
+
+
+def enqueue_to(queue_path, stages, priority):
+    """
+    Builds a handler that hands files to the durable job queue instead of extracting them in-process.
+    """
+    from job_queue import JobQueue
+
+    queue = JobQueue(queue_path)
+
+    def handler(path, file_format):
+        job_id = queue.enqueue(path, file_format, stages, priority)
+        print(f"Queued job {job_id}: {path}")
+    return handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch an inbox directory and extract new or changed documents.")
+    parser.add_argument("inbox", help="Directory to watch")
+    parser.add_argument("--state", default="watch_state.db", help="Database that records processed files")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES))
+    parser.add_argument("--sinks", default="json", help=f"Sinks for in-process extraction: {','.join(SINKS)}")
+    parser.add_argument("--output", default="output", help="Output folder, with one subfolder per document")
+    parser.add_argument("--sqlite", default="extracted_data.db", help="Database file for the sqlite sink")
+    parser.add_argument("--index", default="search_index.db", help="Database file for the index sink")
+    parser.add_argument("--queue", help="Enqueue files into this job queue database instead of extracting in-process")
+    parser.add_argument("--priority", default="normal", help="Priority class for queued jobs")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds a file must stay unchanged before pickup")
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--poll", action="store_true", help="Disable inotify and always poll")
+    parser.add_argument("--once", action="store_true", help="Process the current inbox contents and exit")
+    parser.add_argument("--page-timeout", type=float, help="Seconds a stage may spend on one page of a document")
+    parser.add_argument("--document-timeout", type=float, help="Seconds a document may take")
+    args = parser.parse_args()
+
+    stages = args.stages.split(",")
+    if args.queue:
+        handler = enqueue_to(args.queue, stages, args.priority)
+    else:
+        sinks = build_sinks(args.sinks.split(","), args.output, args.sqlite, args.index, per_document=True)
+        pipeline = Pipeline(stages, sinks, output_root=args.output, per_document=True,
+                            page_timeout=args.page_timeout, document_timeout=args.document_timeout)
+        handler = extract_with(pipeline)
+    watcher = FolderWatcher(args.inbox, handler, WatchState(args.state), args.settle, args.poll_interval,
+                            use_inotify=not args.poll)
+    print(f"Watching {watcher.directory} ({'inotify' if watcher.inotify else 'polling'})")
+    try:
+        watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        print("Watcher stopped.")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()